@@ -0,0 +1,68 @@
+"""
+Button, Select, Modalのコールバック呼び出し1回あたりのオーバーヘッドを計測する
+
+    python benchmarks/dispatch.py [--iterations 100000]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dpy_bot_utils import ViewGenerator, Button, Select, SelectOption, Modal  # noqa: E402
+
+
+async def async_handler(*args):
+    pass
+
+
+def sync_handler(*args):
+    pass
+
+
+async def run(callback, iterations: int) -> float:
+    """
+    callbackをiterations回呼び出し、1回あたりのナノ秒を返す
+    """
+    start = time.perf_counter_ns()
+    for _ in range(iterations):
+        await callback(None)
+    return (time.perf_counter_ns() - start) / iterations
+
+
+def build_button(handler) -> Button:
+    button = Button(label="button").on_click(handler)
+    ViewGenerator(components=[button])
+    return button
+
+
+def build_select(handler) -> Select:
+    select = Select(placeholder="select").on_select(handler)
+    select.add_options([SelectOption(label=f"option {i}", value=f"option {i}", func=handler) for i in range(25)])
+    ViewGenerator(components=[select])
+    select._values = [select.options[-1].value]
+    return select
+
+
+def build_modal(handler) -> Modal:
+    return Modal(title="modal").on_modal_submit(handler)
+
+
+async def main(iterations: int):
+    results = {}
+    for kind, handler in (("async", async_handler), ("sync", sync_handler)):
+        results[f"button_{kind}"] = await run(build_button(handler).callback, iterations)
+        results[f"select_{kind}"] = await run(build_select(handler).callback, iterations)
+        results[f"modal_{kind}"] = await run(build_modal(handler).on_submit, iterations)
+
+    for name, ns in results.items():
+        print(f"{name}: {ns:.0f} ns/interaction")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--iterations", type=int, default=100000)
+    asyncio.run(main(parser.parse_args().iterations))
@@ -0,0 +1,195 @@
+"""
+ネットワークに接続せずにベンチマークとテストを実行するためのInteraction、Message、Botの代用品
+"""
+import asyncio
+import contextvars
+import datetime
+import itertools
+import types
+from typing import List, Optional
+
+import discord
+from discord.ui.view import ViewStore
+
+_ids = itertools.count(1)
+_dispatched: "contextvars.ContextVar[Optional[List[asyncio.Task]]]" = contextvars.ContextVar("dispatched", default=None)
+
+
+class FakeUser:
+
+    def __init__(self, user_id: int = None):
+        self.id = user_id or next(_ids)
+
+    def __eq__(self, other):
+        return isinstance(other, FakeUser) and other.id == self.id
+
+    def __hash__(self):
+        return hash(self.id)
+
+
+class FakeGuild:
+
+    def __init__(self, guild_id: int = None):
+        self.id = guild_id or next(_ids)
+
+
+class FakeRole:
+
+    def __init__(self, role_id: int = None):
+        self.id = role_id or next(_ids)
+
+
+class FakeMember(FakeUser):
+
+    def __init__(self,
+                 user_id: int = None,
+                 guild: FakeGuild = None,
+                 role_ids: List[int] = (),
+                 permissions: discord.Permissions = None,
+                 ):
+        super().__init__(user_id)
+        self.guild = guild or FakeGuild()
+        self.roles = [FakeRole(role_id) for role_id in role_ids]
+        self.guild_permissions = permissions or discord.Permissions.none()
+
+
+class FakeChannel:
+
+    def __init__(self, channel_id: int = None):
+        self.id = channel_id or next(_ids)
+        self.sent = []
+
+    async def send(self, content: str = None, **kwargs):
+        message = FakeMessage(channel=self)
+        view = kwargs.get("view")
+        message.components = None if view is None else view.to_components()
+        self.sent.append(message)
+        return message
+
+
+class FakeMessage:
+
+    def __init__(self, channel: FakeChannel = None, delay: float = 0):
+        """
+        :param channel: メッセージを送信したチャンネル
+        :param delay: 編集にかかる時間(秒)
+        """
+        self.id = next(_ids)
+        self.channel = channel or FakeChannel()
+        self.delay = delay
+        self.edit_count = 0
+        self.components = None
+        self.deleted = False
+
+    async def edit(self, **kwargs):
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        view = kwargs.get("view")
+        self.components = None if view is None else view.to_components()
+        self.edit_count += 1
+        return self
+
+    async def delete(self):
+        self.deleted = True
+
+
+class FakeResponse:
+
+    def __init__(self):
+        self._done = False
+        self.messages = []
+
+    def is_done(self) -> bool:
+        return self._done
+
+    async def defer(self, **kwargs):
+        self._done = True
+
+    async def send_message(self, content=None, **kwargs):
+        self.messages.append(content)
+        self._done = True
+
+    async def edit_message(self, **kwargs):
+        view = kwargs.get("view")
+        if view is not None:
+            view.to_components()
+        self._done = True
+
+    async def send_modal(self, modal):
+        self._done = True
+
+
+class FakeInteraction:
+
+    def __init__(self,
+                 user: FakeUser = None,
+                 message: FakeMessage = None,
+                 custom_id: str = None,
+                 values: list = None,
+                 component_type: int = 2,
+                 ):
+        self.id = next(_ids)
+        self.type = discord.InteractionType.component
+        self.user = user or FakeUser()
+        self.message = message or FakeMessage()
+        self.channel_id = self.message.channel.id
+        self.created_at = datetime.datetime.now(datetime.timezone.utc)
+        self.data = {"component_type": component_type, "custom_id": custom_id, "values": values or []}
+        self._cs_response = FakeResponse()
+
+    @property
+    def response(self) -> FakeResponse:
+        return self._cs_response
+
+    async def edit_original_response(self, **kwargs):
+        return await self.message.edit(**kwargs)
+
+    async def delete_message(self):
+        await self.message.delete()
+
+
+class FakeViewStore(ViewStore):
+
+    def add_task(self, task: asyncio.Task):
+        tasks = _dispatched.get()
+        if tasks is not None:
+            tasks.append(task)
+        super().add_task(task)
+
+
+class FakeBot:
+
+    def __init__(self):
+        """
+        Viewの登録とインタラクションの配信だけを行うBotの代用品
+        """
+        view_store = FakeViewStore(None)
+        self._connection = types.SimpleNamespace(_view_store=view_store, store_view=view_store.add_view)
+        self.listeners = {}
+
+    def add_listener(self, func, name: str):
+        self.listeners[name] = func
+
+    def remove_listener(self, func, name: str):
+        self.listeners.pop(name, None)
+
+    def add_view(self, view, message_id: int = None):
+        self._connection.store_view(view, message_id)
+
+    async def dispatch(self, interaction: FakeInteraction):
+        """
+        discord.pyと同じ経路でインタラクションを配信し、このインタラクションで開始したコールバックの終了を待つ
+        :param interaction: 配信するインタラクション
+        """
+        tasks = []
+        token = _dispatched.set(tasks)
+        try:
+            data = interaction.data
+            self._connection._view_store.dispatch_view(data["component_type"], data["custom_id"], interaction)
+            listener = self.listeners.get("on_interaction")
+            if listener is not None:
+                await listener(interaction)
+        finally:
+            _dispatched.reset(token)
+        if tasks:
+            await asyncio.gather(*tasks)
@@ -0,0 +1,77 @@
+"""
+公開されている名前ごとに、新しいPythonプロセスでimportしたときの時間を -X importtime で計測する
+
+    python benchmarks/importtime.py [--repeat 5] [--output importtime.json]
+
+各項目は "from dpy_bot_utils import <名前>" で読み込まれた全モジュールの累積時間(マイクロ秒)の最小値と、
+読み込まれたモジュールの数を出力する
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def import_time(statement: str) -> dict:
+    """
+    statementを新しいプロセスで実行し、トップレベルのimportの累積時間とモジュール数を返す
+    """
+    env = dict(os.environ, PYTHONPATH=ROOT + os.pathsep + os.environ.get("PYTHONPATH", ""))
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        env=env, capture_output=True, text=True, check=True,
+    )
+    total = 0
+    modules = 0
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|", 2)
+        modules += 1
+        # インデントのない行がトップレベルのimport
+        if not name[1:].startswith(" "):
+            total += int(cumulative)
+    return {"us": total, "modules": modules}
+
+
+def measure(statement: str, repeat: int) -> dict:
+    results = [import_time(statement) for _ in range(repeat)]
+    return min(results, key=lambda r: r["us"])
+
+
+def main(repeat: int) -> dict:
+    sys.path.insert(0, ROOT)
+    import dpy_bot_utils
+
+    baseline = measure("pass", repeat)
+    results = {"dpy_bot_utils": measure("import dpy_bot_utils", repeat)}
+    for name in dpy_bot_utils.__all__:
+        results[name] = measure(f"from dpy_bot_utils import {name}", repeat)
+    for result in results.values():
+        result["us"] -= baseline["us"]
+        result["modules"] -= baseline["modules"]
+
+    return {
+        "python": platform.python_version(),
+        "repeat": repeat,
+        "results": {name: {"value": r["us"], "unit": "us", "modules": r["modules"]} for name, r in results.items()},
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", type=str, default=None)
+    args = parser.parse_args()
+
+    report = main(args.repeat)
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
@@ -0,0 +1,112 @@
+"""
+ViewGeneratorを保持し続けたときの1Viewあたりのメモリ使用量を計測する
+
+    python benchmarks/memory.py [--views 2000]
+
+同じ構成のdiscord.py標準のView(discord.ui.View)を同じ条件で計測して基準にする
+基準に対する比率がBUDGETを超えた項目がある場合は終了コード1で終了する
+"""
+import argparse
+import asyncio
+import gc
+import os
+import sys
+import tracemalloc
+
+import discord
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dpy_bot_utils import ViewGenerator, Button, Select, SelectOption  # noqa: E402
+
+# 1Viewあたりのメモリの上限 同じ構成のdiscord.ui.Viewに対する比率
+# ViewGeneratorのインスタンスの属性が30個を超えると、キー共有辞書が使われなくなり上限を大きく超える
+BUDGET = {
+    "5_button_view": 1.08,
+    "25_option_select_view": 1.2,
+}
+
+
+async def on_click(interaction, view):
+    pass
+
+
+async def on_reference_click(interaction):
+    pass
+
+
+def build_button_view() -> ViewGenerator:
+    return ViewGenerator(components=[Button(label=f"button {i}", func=on_click) for i in range(5)])
+
+
+def build_select_view() -> ViewGenerator:
+    select = Select(placeholder="select", func=on_click)
+    select.add_options([SelectOption(label=f"option {i}", func=on_click) for i in range(25)])
+    return ViewGenerator(components=[select])
+
+
+def build_reference_button_view() -> discord.ui.View:
+    view = discord.ui.View()
+    for i in range(5):
+        button = discord.ui.Button(label=f"button {i}")
+        button.callback = on_reference_click
+        view.add_item(button)
+    return view
+
+
+def build_reference_select_view() -> discord.ui.View:
+    select = discord.ui.Select(placeholder="select", options=[discord.SelectOption(label=f"option {i}") for i in range(25)])
+    select.callback = on_reference_click
+    return discord.ui.View().add_item(select)
+
+
+CASES = {
+    "5_button_view": (build_button_view, build_reference_button_view),
+    "25_option_select_view": (build_select_view, build_reference_select_view),
+}
+
+
+def measure(builder, count: int) -> float:
+    """
+    builderで生成したViewをcount個保持し、1Viewあたりの確保バイト数を返す
+    """
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    views = [builder() for _ in range(count)]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    size = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    del views
+    return size / count
+
+
+def measure_all(count: int) -> dict:
+    """
+    CASESの各項目について、ViewGeneratorと基準のdiscord.ui.Viewの1Viewあたりのバイト数を計測する
+    :return: 項目名と(ViewGeneratorのバイト数, 基準のバイト数)の辞書
+    """
+    return {name: (measure(builder, count), measure(reference, count)) for name, (builder, reference) in CASES.items()}
+
+
+def regressions(results: dict) -> list:
+    """
+    基準に対する比率がBUDGETを超えた項目の名前を返す
+    :param results: measure_allの結果
+    """
+    return [name for name, (size, baseline) in results.items() if size > baseline * BUDGET[name]]
+
+
+async def main(count: int):
+    results = measure_all(count)
+    for name, (size, baseline) in results.items():
+        print(f"{name}: {size:.0f} bytes/view (discord.ui.View {baseline:.0f}, x{size / baseline:.3f}, budget x{BUDGET[name]})")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--views", type=int, default=2000)
+    failed = regressions(asyncio.run(main(parser.parse_args().views)))
+    if failed:
+        sys.exit(f"メモリの上限を超えました: {', '.join(failed)}")
@@ -0,0 +1,268 @@
+"""
+ネットワークに接続せずにViewGeneratorの主要な処理を計測し、結果をJSONで出力する
+
+    python benchmarks/run.py [--iterations 20000] [--output results.json]
+
+リリース間で結果を比較できるよう、各項目は1回あたりのナノ秒(ns/op)またはバイト数で出力する
+1Viewあたりのバイトがmemory.BUDGETを超えた場合は終了コード1で終了する
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import discord  # noqa: E402
+
+import dispatch  # noqa: E402
+import memory  # noqa: E402
+from fakes import FakeInteraction, FakeMessage, FakeUser  # noqa: E402
+from dpy_bot_utils import ViewGenerator, Button, Select, SelectOption, Modal, TextInput, SearchableSelect, LengthValidator, ComponentRouter, compile_view, ClickThrottle  # noqa: E402
+
+
+
+async def handler(*args):
+    pass
+
+
+async def measure(op, iterations: int, setup=None) -> float:
+    """
+    opをiterations回実行し、1回あたりのナノ秒を返す
+    setupを指定した場合はその戻り値をopに渡し、setupの時間は含めない
+    """
+    total = 0
+    for _ in range(iterations):
+        arg = setup() if setup else None
+        start = time.perf_counter_ns()
+        await op(arg)
+        total += time.perf_counter_ns() - start
+    return total / iterations
+
+
+def buttons(count: int = 5):
+    return [Button(label=f"button {i}", func=handler) for i in range(count)]
+
+
+async def bench_view_construction(iterations: int) -> float:
+    async def op(_):
+        ViewGenerator()
+
+    return await measure(op, iterations)
+
+
+async def bench_add_components(iterations: int, prefix: str = None) -> float:
+    async def op(view_and_buttons):
+        view, items = view_and_buttons
+        view._add_components(items)
+
+    return await measure(op, iterations, setup=lambda: (ViewGenerator(prefix=prefix), buttons()))
+
+
+async def bench_button_dispatch(iterations: int) -> float:
+    user = FakeUser()
+    button = Button(label="button").on_click(handler)
+    view = ViewGenerator(components=[button], author=user)
+    interaction = FakeInteraction(user=user)
+
+    async def op(_):
+        if await view.interaction_check(interaction):
+            await button.callback(interaction)
+
+    return await measure(op, iterations)
+
+
+async def bench_throttled_dispatch(iterations: int, users: int = 1000) -> float:
+    """
+    1000人のユーザーが同じViewを連打したときの1回あたりの処理時間 制限を超えたクリックはコールバックを実行しない
+    """
+    button = Button(label="button").on_click(handler)
+    throttle = ClickThrottle(per_user=1, burst=3)
+    view = ViewGenerator(components=[button], click_throttle=throttle)
+    interactions = [FakeInteraction(user=FakeUser(i % users + 1)) for i in range(iterations)]
+
+    async def op(interaction):
+        if await view.interaction_check(interaction):
+            await button.callback(interaction)
+
+    return await measure(op, iterations, setup=iter(interactions).__next__)
+
+
+async def bench_select_dispatch(iterations: int) -> float:
+    user = FakeUser()
+    select = dispatch.build_select(handler)
+    view = select.parent_view
+    view.set_author(user)
+    interaction = FakeInteraction(user=user)
+
+    async def op(_):
+        if await view.interaction_check(interaction):
+            await select.callback(interaction)
+
+    return await measure(op, iterations)
+
+
+async def bench_all_disable(iterations: int) -> float:
+    async def op(view):
+        await view.all_disable()
+
+    return await measure(op, iterations, setup=lambda: ViewGenerator(components=buttons(), message=FakeMessage()))
+
+
+async def bench_all_disable_noop(iterations: int) -> float:
+    view = ViewGenerator(components=buttons(), message=FakeMessage())
+    await view.all_disable()
+
+    async def op(_):
+        await view.all_disable()
+
+    return await measure(op, iterations)
+
+
+async def bench_close_view(iterations: int) -> float:
+    async def op(view):
+        await view.close_view()
+
+    return await measure(op, iterations, setup=lambda: ViewGenerator(components=buttons(), message=FakeMessage()))
+
+
+async def bench_modal_submit(iterations: int) -> float:
+    view = ViewGenerator()
+    modal = Modal(title="modal").on_modal_submit(handler).set_parent_view(view)
+    interaction = FakeInteraction()
+
+    async def op(_):
+        await modal.on_submit(interaction)
+
+    return await measure(op, iterations)
+
+
+async def bench_modal_submit_validated(iterations: int, inputs: int = 5, length: int = 4000) -> float:
+    view = ViewGenerator()
+    modal = Modal(title="modal").on_modal_submit(handler).set_parent_view(view)
+    for i in range(inputs):
+        text_input = TextInput(label=f"input {i}", max_length=length)
+        text_input.add_validator(LengthValidator(max_length=length)).set_pattern(r"[a-z0-9 ]+")
+        text_input._value = ("abc 123 " * length)[:length]
+        modal.add_component(text_input)
+    interaction = FakeInteraction()
+
+    async def op(_):
+        await modal.on_submit(interaction)
+
+    return await measure(op, iterations)
+
+
+MENU_DEFINITION = {
+    "prefix": "menu",
+    "components": [
+        *({"type": "button", "label": f"button {i}", "on_click": "handler"} for i in range(4)),
+        {"type": "select", "placeholder": "select", "on_select": "handler",
+         "options": [{"label": f"option {i}", "on_select": "handler"} for i in range(25)]},
+    ],
+}
+
+
+async def bench_builder_chain(iterations: int) -> float:
+    async def op(_):
+        select = Select(placeholder="select").on_select(handler)
+        select.add_options([SelectOption(label=f"option {i}", func=handler) for i in range(25)])
+        ViewGenerator(components=[*buttons(4), select], prefix="menu")
+
+    return await measure(op, iterations)
+
+
+async def bench_compiled_definition(iterations: int) -> float:
+    template = compile_view(MENU_DEFINITION, {"handler": handler})
+
+    async def op(_):
+        template.create()
+
+    return await measure(op, iterations)
+
+
+async def bench_router_resolve(iterations: int, routes: int = 10000) -> float:
+    router = ComponentRouter()
+    for i in range(routes):
+        router.add_route(f"app{i % 10}:group{i % 100}:action{i}", handler)
+    custom_ids = [f"app{i % 10}:group{i % 100}:action{i}-state{i}" for i in range(0, routes, 7)]
+    queries = [custom_ids[i % len(custom_ids)] for i in range(iterations)]
+
+    async def op(custom_id):
+        router.resolve(custom_id)
+
+    return await measure(op, iterations, setup=iter(queries).__next__)
+
+
+async def bench_searchable_select(iterations: int, count: int = 100000) -> float:
+    select = SearchableSelect(options=[SelectOption(label=f"item {i} tag{i % 1000}") for i in range(count)])
+    select.search("tag")
+    queries = [f"tag{i % 1000}" for i in range(iterations)]
+
+    async def op(query):
+        select.search(query)
+
+    return await measure(op, iterations, setup=iter(queries).__next__)
+
+
+async def main(iterations: int, memory_views: int) -> dict:
+    results = {
+        "view_construction": await bench_view_construction(iterations),
+        "add_components_5_buttons": await bench_add_components(iterations),
+        "add_components_5_buttons_prefixed": await bench_add_components(iterations, prefix="bench"),
+        "button_dispatch": await bench_button_dispatch(iterations),
+        "select_dispatch": await bench_select_dispatch(iterations),
+        "all_disable_edit": await bench_all_disable(iterations),
+        "button_dispatch_throttled_1k_users_spam": await bench_throttled_dispatch(iterations),
+        "all_disable_noop_skipped": await bench_all_disable_noop(iterations),
+        "close_view_edit": await bench_close_view(iterations),
+        "modal_submit": await bench_modal_submit(iterations),
+        "modal_submit_validated_5x4000_chars": await bench_modal_submit_validated(iterations),
+        "searchable_select_100k_search": await bench_searchable_select(iterations),
+        "router_resolve_10k_routes": await bench_router_resolve(iterations),
+        "menu_builder_chain": await bench_builder_chain(iterations),
+        "menu_compiled_definition": await bench_compiled_definition(iterations),
+    }
+    report = {
+        "python": platform.python_version(),
+        "discord.py": discord.__version__,
+        "iterations": iterations,
+        "results": {name: {"value": round(value, 1), "unit": "ns/op"} for name, value in results.items()},
+    }
+    for name, (size, baseline) in memory.measure_all(memory_views).items():
+        report["results"][f"memory_{name}"] = {"value": round(size, 1), "unit": "bytes/view", "baseline": round(baseline, 1)}
+    return report
+
+
+def over_budget(report: dict) -> list:
+    """
+    memory.BUDGETを超えた項目の名前を返す
+    """
+    results = {
+        name: (report["results"][f"memory_{name}"]["value"], report["results"][f"memory_{name}"]["baseline"])
+        for name in memory.BUDGET
+    }
+    return [f"memory_{name}" for name in memory.regressions(results)]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--iterations", type=int, default=20000)
+    parser.add_argument("--memory-views", type=int, default=2000)
+    parser.add_argument("--output", type=str, default=None)
+    args = parser.parse_args()
+
+    report = asyncio.run(main(args.iterations, args.memory_views))
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+    failed = over_budget(report)
+    if failed:
+        sys.exit(f"メモリの上限を超えました: {', '.join(failed)}")
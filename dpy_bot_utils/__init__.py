@@ -1 +1,31 @@
-from .components import *
+import importlib
+from typing import TYPE_CHECKING, Any, List
+
+from .components import _exports as _component_exports
+
+if TYPE_CHECKING:
+    from .components import *  # noqa: F401,F403
+    from .paginator import *  # noqa: F401,F403
+
+# components・paginatorの名前は初めて参照されたときに読み込む
+_exports = {name: ".components" for name in _component_exports}
+_exports["Paginator"] = ".paginator"
+
+_submodules = {"components", "paginator"}
+
+__all__ = list(_exports)
+
+
+def __getattr__(name: str) -> Any:
+    module = _exports.get(name)
+    if module is None:
+        if name in _submodules:
+            return importlib.import_module(f".{name}", __name__)
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(_exports))
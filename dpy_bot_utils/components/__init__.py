@@ -1,2 +1,93 @@
-from .ui_components import Modal, TextInput
-from .view import ViewGenerator, Button, Select, SelectOption, SelectTriggerType, ViewUsedBehaviorType, RespondTargetType, ComponentsUtils, ButtonStyle
+import importlib
+from typing import TYPE_CHECKING, Any, Dict, List
+
+if TYPE_CHECKING:
+    from .ui_components import Modal, TextInput
+    from .view import ViewGenerator, Button, Select, SelectOption, ComponentsUtils, ButtonStyle
+    from .flags import SelectTriggerType, ViewUsedBehaviorType, RespondTargetType
+    from .router import ComponentRouter, RouteGroup
+    from .scheduler import EditScheduler, EditPriority
+    from .template import ViewTemplate, SendResult
+    from .executor import set_thread_pool_size, set_process_pool_size, run_in_process
+    from .metrics import InteractionMetrics
+    from .codec import CustomIdCodec
+    from .timeouts import TimeoutWheel
+    from .state import StateStore, MemoryStateStore, SQLiteStateStore
+    from .hydration import StateHydrator
+    from .search import OptionIndex, SearchableSelect
+    from .access import AccessRule
+    from .watchdog import DeferWatchdog
+    from .limiter import ConcurrencyLimiter, DropPolicyType
+    from .throttle import ClickThrottle
+    from .definition import compile_view, compile_modal, ModalFactory, DefinitionError
+    from .validation import Validator, RegexValidator, RangeValidator, LengthValidator, ChoiceValidator
+
+# 公開する名前と定義しているモジュール
+# 名前が初めて参照されたときにモジュールを読み込み、discord.pyを必要としない名前は軽量に読み込めるようにする
+_exports: Dict[str, str] = {
+    "Modal": ".ui_components",
+    "TextInput": ".ui_components",
+    "ViewGenerator": ".view",
+    "Button": ".view",
+    "Select": ".view",
+    "SelectOption": ".view",
+    "ComponentsUtils": ".view",
+    "ButtonStyle": ".view",
+    "SelectTriggerType": ".flags",
+    "ViewUsedBehaviorType": ".flags",
+    "RespondTargetType": ".flags",
+    "ComponentRouter": ".router",
+    "RouteGroup": ".router",
+    "EditScheduler": ".scheduler",
+    "EditPriority": ".scheduler",
+    "ViewTemplate": ".template",
+    "SendResult": ".template",
+    "set_thread_pool_size": ".executor",
+    "set_process_pool_size": ".executor",
+    "run_in_process": ".executor",
+    "InteractionMetrics": ".metrics",
+    "CustomIdCodec": ".codec",
+    "TimeoutWheel": ".timeouts",
+    "StateStore": ".state",
+    "MemoryStateStore": ".state",
+    "SQLiteStateStore": ".state",
+    "StateHydrator": ".hydration",
+    "OptionIndex": ".search",
+    "SearchableSelect": ".search",
+    "AccessRule": ".access",
+    "DeferWatchdog": ".watchdog",
+    "ConcurrencyLimiter": ".limiter",
+    "DropPolicyType": ".limiter",
+    "ClickThrottle": ".throttle",
+    "compile_view": ".definition",
+    "compile_modal": ".definition",
+    "ModalFactory": ".definition",
+    "DefinitionError": ".definition",
+    "Validator": ".validation",
+    "RegexValidator": ".validation",
+    "RangeValidator": ".validation",
+    "LengthValidator": ".validation",
+    "ChoiceValidator": ".validation",
+}
+
+_submodules = {
+    "access", "codec", "definition", "executor", "flags", "hydration", "limiter", "metrics", "router", "scheduler",
+    "search", "state", "template", "throttle", "timeouts", "ui_components", "validation", "view", "watchdog",
+}
+
+__all__ = list(_exports)
+
+
+def __getattr__(name: str) -> Any:
+    module = _exports.get(name)
+    if module is None:
+        if name in _submodules:
+            return importlib.import_module(f".{name}", __name__)
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(_exports))
@@ -0,0 +1,143 @@
+import time
+import weakref
+from collections import OrderedDict
+from typing import Iterable, Optional, Tuple, Union
+
+import discord
+from discord.ext import commands
+
+
+class AccessRule:
+    _rules: "weakref.WeakSet[AccessRule]" = weakref.WeakSet()
+    _registered_bots: "weakref.WeakSet[commands.Bot]" = weakref.WeakSet()
+
+    def __init__(self,
+                 user_ids: Iterable[int] = None,
+                 role_ids: Iterable[int] = None,
+                 permissions: Union[int, discord.Permissions] = 0,
+                 deny_user_ids: Iterable[int] = None,
+                 cache_size: int = 4096,
+                 cache_ttl: Optional[float] = 60.0,
+                 ):
+        """
+        インタラクションを受け付けるユーザーを判断するルール 複数のViewで共有できる
+        いずれかの条件(ユーザー・ロール・権限)を満たすユーザーを許可する
+        条件を指定しない場合は拒否リスト以外の全てのユーザーを許可する
+        :param user_ids: 許可するユーザーのID
+        :param role_ids: 許可するロールのID いずれかを持っていれば許可する
+        :param permissions: 許可する権限 全ての権限を持っていれば許可する チャンネルごとの権限の上書きも反映する
+        :param deny_user_ids: 常に拒否するユーザーのID
+        :param cache_size: ユーザーごとの判定結果を保持する最大数
+        :param cache_ttl: 判定結果を保持する秒数 メンバーのインテントがなくロールの変更を受け取れない場合も、この秒数で反映される
+        """
+        self.user_ids = frozenset(user_ids or ())
+        self.role_ids = frozenset(role_ids or ())
+        self.permissions = permissions.value if isinstance(permissions, discord.Permissions) else permissions
+        self.deny_user_ids = frozenset(deny_user_ids or ())
+        self.cache_size = cache_size
+        self.cache_ttl = cache_ttl
+        self.cache: "OrderedDict[Tuple[Optional[int], int], Tuple[Optional[bool], Optional[float]]]" = OrderedDict()
+        self._rules.add(self)
+
+    @property
+    def allow_all(self) -> bool:
+        """
+        拒否リスト以外の全てのユーザーを許可するかどうか
+        """
+        return not (self.user_ids or self.role_ids or self.permissions)
+
+    def _evaluate(self, user: discord.abc.User) -> Optional[bool]:
+        """
+        :protected:
+        キャッシュを使わずにユーザーとロールの条件を判断する
+        :param user: 判断するユーザー
+        :return: 許可・拒否が決まった場合はTrue・False 権限で判断する場合はNone
+        """
+        if user.id in self.deny_user_ids:
+            return False
+        if self.allow_all or user.id in self.user_ids:
+            return True
+        if self.role_ids:
+            roles = getattr(user, "roles", None)
+            if roles and not self.role_ids.isdisjoint(role.id for role in roles):
+                return True
+        return None if self.permissions else False
+
+    def _has_permissions(self, user: discord.abc.User, permissions: Optional[discord.Permissions]) -> bool:
+        """
+        :protected:
+        ユーザーが必要な権限を全て持っているかどうかを判断する
+        :param user: 判断するユーザー
+        :param permissions: チャンネルの権限の上書きを反映したユーザーの権限 指定しない場合はサーバー全体の権限を使用する
+        """
+        if permissions is None:
+            permissions = getattr(user, "guild_permissions", None)
+        return permissions is not None and permissions.value & self.permissions == self.permissions
+
+    def allows(self, user: discord.abc.User, permissions: discord.Permissions = None) -> bool:
+        """
+        ユーザーを許可するかどうかを判断する ユーザーとロールの判定結果はcache_ttlの間キャッシュする
+        権限はチャンネルごとに異なるためキャッシュせず、渡された権限で毎回判断する
+        :param user: 判断するユーザー
+        :param permissions: interaction.permissions チャンネルの権限の上書きを反映するために渡す
+        """
+        guild = getattr(user, "guild", None)
+        key = (guild.id if guild is not None else None, user.id)
+        cache = self.cache
+        entry = cache.get(key)
+        if entry is not None and (entry[1] is None or entry[1] > time.monotonic()):
+            cache.move_to_end(key)
+            result = entry[0]
+        else:
+            result = self._evaluate(user)
+            cache[key] = (result, time.monotonic() + self.cache_ttl if self.cache_ttl else None)
+            cache.move_to_end(key)
+            if len(cache) > self.cache_size:
+                cache.popitem(last=False)
+
+        if result is None:
+            return self._has_permissions(user, permissions)
+        return result
+
+    def invalidate(self, user_id: int = None, guild_id: int = None):
+        """
+        判定結果のキャッシュを破棄する
+        :param user_id: 破棄するユーザーのID 指定しない場合は全て破棄する
+        :param guild_id: 破棄するサーバーのID
+        """
+        if user_id is None:
+            self.cache.clear()
+            return self
+        self.cache.pop((guild_id, user_id), None)
+        return self
+
+    @classmethod
+    def invalidate_all(cls, user_id: int = None, guild_id: int = None):
+        """
+        全てのルールの判定結果のキャッシュを破棄する
+        :param user_id: 破棄するユーザーのID 指定しない場合は全て破棄する
+        :param guild_id: 破棄するサーバーのID
+        """
+        for rule in list(cls._rules):
+            rule.invalidate(user_id=user_id, guild_id=guild_id)
+
+    @classmethod
+    def register_listeners(cls, bot: commands.Bot):
+        """
+        ロールの変更時にキャッシュを破棄するリスナーをBotに登録する 同じBotには1度だけ登録する
+        :param bot: リスナーを登録するBot
+        """
+        if bot in cls._registered_bots:
+            return
+        cls._registered_bots.add(bot)
+
+        async def on_member_update(before: discord.Member, after: discord.Member):
+            if before.roles != after.roles:
+                cls.invalidate_all(user_id=after.id, guild_id=after.guild.id)
+
+        async def on_guild_role_change(*args):
+            cls.invalidate_all()
+
+        bot.add_listener(on_member_update, "on_member_update")
+        bot.add_listener(on_guild_role_change, "on_guild_role_update")
+        bot.add_listener(on_guild_role_change, "on_guild_role_delete")
@@ -0,0 +1,185 @@
+import base64
+import hashlib
+import hmac
+import struct
+from typing import Any, Tuple, Union
+
+CUSTOM_ID_MAX_LENGTH = 100
+
+_TAG_NONE = 0
+_TAG_FALSE = 1
+_TAG_TRUE = 2
+_TAG_INT = 3
+_TAG_STR = 4
+_TAG_BYTES = 5
+_TAG_FLOAT = 6
+
+
+def _write_varint(buffer: bytearray, value: int):
+    while value > 0x7F:
+        buffer.append((value & 0x7F) | 0x80)
+        value >>= 7
+    buffer.append(value)
+
+
+def _read_varint(data: bytes, index: int) -> Tuple[int, int]:
+    value = 0
+    shift = 0
+    while True:
+        if index >= len(data):
+            raise ValueError("custom_idの状態が途中で終わっています")
+        byte = data[index]
+        index += 1
+        value |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return value, index
+        shift += 7
+
+
+class CustomIdCodec:
+
+    def __init__(self,
+                 secret: Union[bytes, str] = None,
+                 mac_size: int = 8,
+                 version: int = 1,
+                 separator: str = "-",
+                 ):
+        """
+        小さな状態をcustom_idに埋め込むエンコーダー
+        状態をサーバーのメモリに保持せず、インタラクションだけから復元できるようにする
+        :param secret: 改ざん検知用のHMACの鍵 指定しない場合はHMACを付けない
+        :param mac_size: HMACのバイト数
+        :param version: 状態の形式のバージョン 異なるバージョンのcustom_idは復元できない
+        :param separator: Prefixと状態を区切る文字列
+        """
+        if isinstance(secret, str):
+            secret = secret.encode()
+        if not 0 <= version <= 0xFF:
+            raise ValueError("バージョンは0から255の範囲で指定してください")
+        self.secret = secret
+        self.mac_size = mac_size if secret else 0
+        self.version = version
+        self.separator = separator
+
+    def _mac(self, prefix: str, body: bytes) -> bytes:
+        """
+        :protected:
+        Prefixと状態からHMACを計算する
+        """
+        return hmac.new(self.secret, prefix.encode() + b"\0" + body, hashlib.sha256).digest()[:self.mac_size]
+
+    @staticmethod
+    def pack(values: Tuple[Any, ...]) -> bytes:
+        """
+        値をバイト列に変換する
+        対応する型: None, bool, int, str, bytes, float
+        :param values: 変換する値
+        """
+        buffer = bytearray()
+        for value in values:
+            if value is None:
+                buffer.append(_TAG_NONE)
+            elif value is True:
+                buffer.append(_TAG_TRUE)
+            elif value is False:
+                buffer.append(_TAG_FALSE)
+            elif isinstance(value, int):
+                buffer.append(_TAG_INT)
+                _write_varint(buffer, (value << 1) ^ -1 if value < 0 else value << 1)
+            elif isinstance(value, str):
+                data = value.encode()
+                buffer.append(_TAG_STR)
+                _write_varint(buffer, len(data))
+                buffer += data
+            elif isinstance(value, bytes):
+                buffer.append(_TAG_BYTES)
+                _write_varint(buffer, len(value))
+                buffer += value
+            elif isinstance(value, float):
+                buffer.append(_TAG_FLOAT)
+                buffer += struct.pack(">d", value)
+            else:
+                raise TypeError(f"custom_idに埋め込めない型です: {type(value).__name__}")
+        return bytes(buffer)
+
+    @staticmethod
+    def unpack(data: bytes) -> Tuple[Any, ...]:
+        """
+        バイト列を値に戻す
+        :param data: packで変換したバイト列
+        """
+        values = []
+        index = 0
+        while index < len(data):
+            tag = data[index]
+            index += 1
+            if tag == _TAG_NONE:
+                values.append(None)
+            elif tag == _TAG_TRUE:
+                values.append(True)
+            elif tag == _TAG_FALSE:
+                values.append(False)
+            elif tag == _TAG_INT:
+                raw, index = _read_varint(data, index)
+                values.append((raw >> 1) ^ -(raw & 1))
+            elif tag in (_TAG_STR, _TAG_BYTES):
+                length, index = _read_varint(data, index)
+                if index + length > len(data):
+                    raise ValueError("custom_idの状態が途中で終わっています")
+                chunk = data[index:index + length]
+                index += length
+                values.append(chunk.decode() if tag == _TAG_STR else bytes(chunk))
+            elif tag == _TAG_FLOAT:
+                if index + 8 > len(data):
+                    raise ValueError("custom_idの状態が途中で終わっています")
+                values.append(struct.unpack(">d", data[index:index + 8])[0])
+                index += 8
+            else:
+                raise ValueError(f"custom_idの状態に不明な型が含まれています: {tag}")
+        return tuple(values)
+
+    def encode(self, prefix: str, *values) -> str:
+        """
+        Prefixと状態からcustom_idを生成する
+        :param prefix: custom_idのPrefix
+        :param values: 埋め込む値
+        """
+        body = bytes([self.version]) + self.pack(values)
+        if self.mac_size:
+            body += self._mac(prefix, body)
+        custom_id = f"{prefix}{self.separator}{base64.b64encode(body).rstrip(b'=').decode()}"
+        if len(custom_id) > CUSTOM_ID_MAX_LENGTH:
+            raise ValueError(f"custom_idが{CUSTOM_ID_MAX_LENGTH}文字を超えています: {len(custom_id)}")
+        return custom_id
+
+    def decode_payload(self, prefix: str, payload: str) -> Tuple[Any, ...]:
+        """
+        Prefixを除いたcustom_idから状態を復元する
+        :param prefix: custom_idのPrefix
+        :param payload: Prefixと区切り文字を除いたcustom_id
+        """
+        try:
+            body = base64.b64decode(payload + "=" * (-len(payload) % 4), validate=True)
+        except ValueError:
+            raise ValueError("custom_idの状態を読み取れません")
+
+        if len(body) < 1 + self.mac_size:
+            raise ValueError("custom_idの状態が短すぎます")
+        if self.mac_size:
+            body, mac = body[:-self.mac_size], body[-self.mac_size:]
+            if not hmac.compare_digest(mac, self._mac(prefix, body)):
+                raise ValueError("custom_idの署名が一致しません")
+        if body[0] != self.version:
+            raise ValueError(f"custom_idの状態のバージョンが異なります: {body[0]}")
+        return self.unpack(body[1:])
+
+    def decode(self, custom_id: str) -> Tuple[str, Tuple[Any, ...]]:
+        """
+        custom_idからPrefixと状態を復元する
+        :param custom_id: encodeで生成したcustom_id
+        :return: (Prefix, 状態)
+        """
+        prefix, separator, payload = custom_id.rpartition(self.separator)
+        if not separator:
+            raise ValueError("custom_idに状態が含まれていません")
+        return prefix, self.decode_payload(prefix, payload)
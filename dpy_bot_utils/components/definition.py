@@ -0,0 +1,271 @@
+import json
+from typing import Any, Callable, Dict, List, Mapping, Optional, Union
+
+import discord
+from discord import TextStyle
+
+from .template import ViewTemplate
+from .ui_components import Modal, TextInput
+from .validation import RegexValidator, RangeValidator, ChoiceValidator, Validator
+from .view import (
+    ViewGenerator, Button, ButtonStyle, Select, SelectOption,
+    SelectTriggerType, ViewUsedBehaviorType, RespondTargetType,
+)
+
+Definition = Union[Dict[str, Any], str]
+
+_VIEW_KEYS = {"prefix", "timeout", "only_one_respond", "used_flag", "respond_flag", "components"}
+_BUTTON_KEYS = {"type", "label", "style", "url", "emoji", "disabled", "custom_id", "on_click"}
+_SELECT_KEYS = {"type", "placeholder", "min_values", "max_values", "disabled", "custom_id", "trigger_type",
+                "on_select", "options"}
+_OPTION_KEYS = {"label", "value", "description", "default", "on_select"}
+_MODAL_KEYS = {"title", "on_submit", "on_validation_error", "inputs"}
+_INPUT_KEYS = {"label", "style", "placeholder", "min_length", "max_length", "required", "default",
+               "pattern", "pattern_message", "min_value", "max_value", "integer", "choices"}
+
+
+class DefinitionError(ValueError):
+    """
+    Viewやモーダルウィンドウの定義が正しくない場合に発生する例外
+    """
+    pass
+
+
+class _Compiler:
+
+    def __init__(self, handlers: Optional[Mapping[str, Callable]]):
+        self.handlers = handlers or {}
+
+    @staticmethod
+    def load(definition: Definition) -> Dict[str, Any]:
+        if isinstance(definition, str):
+            try:
+                definition = json.loads(definition)
+            except json.JSONDecodeError as e:
+                raise DefinitionError(f"JSONを読み込めません: {e}")
+        if not isinstance(definition, dict):
+            raise DefinitionError("定義は辞書で指定してください")
+        return definition
+
+    @staticmethod
+    def check_keys(spec: Dict[str, Any], allowed: set, path: str):
+        if not isinstance(spec, dict):
+            raise DefinitionError(f"{path}: 辞書で指定してください")
+        unknown = spec.keys() - allowed
+        if unknown:
+            raise DefinitionError(f"{path}: 不明なキーがあります: {', '.join(sorted(unknown))}")
+
+    def handler(self, spec: Dict[str, Any], key: str, path: str) -> Optional[Callable]:
+        name = spec.get(key)
+        if name is None:
+            return None
+        if callable(name):
+            return name
+        handler = self.handlers.get(name)
+        if handler is None:
+            raise DefinitionError(f"{path}.{key}: ハンドラ '{name}' が登録されていません")
+        return handler
+
+    @staticmethod
+    def flag(flag_type: type, spec: Dict[str, Any], key: str, path: str):
+        name = spec.get(key)
+        if name is None:
+            return None
+        value = getattr(flag_type, str(name).upper(), None)
+        if value is None:
+            raise DefinitionError(f"{path}.{key}: '{name}' は{flag_type.__name__}にありません")
+        return value
+
+    @staticmethod
+    def enum(enum_type: type, spec: Dict[str, Any], key: str, path: str):
+        name = spec.get(key)
+        if name is None:
+            return None
+        try:
+            return enum_type[str(name).lower()]
+        except KeyError:
+            raise DefinitionError(f"{path}.{key}: '{name}' は{enum_type.__name__}にありません")
+
+    def button(self, spec: Dict[str, Any], path: str) -> Button:
+        self.check_keys(spec, _BUTTON_KEYS, path)
+        button = Button(
+            url=spec.get("url"),
+            label=spec.get("label"),
+            button_style=self.enum(discord.ButtonStyle, spec, "style", path) or
+            (ButtonStyle.link if spec.get("url") else None),
+            func=self.handler(spec, "on_click", path),
+            disabled=spec.get("disabled", False),
+            emoji=spec.get("emoji"),
+        )
+        if spec.get("custom_id"):
+            button.set_custom_id(spec["custom_id"])
+        return button
+
+    def option(self, spec: Dict[str, Any], path: str) -> SelectOption:
+        self.check_keys(spec, _OPTION_KEYS, path)
+        if not spec.get("label"):
+            raise DefinitionError(f"{path}.label: ラベルが指定されていません")
+        option = SelectOption(
+            label=spec["label"],
+            func=self.handler(spec, "on_select", path),
+            description=spec.get("description"),
+            default=spec.get("default", False),
+        )
+        option.value = str(spec.get("value", spec["label"]))
+        return option
+
+    def select(self, spec: Dict[str, Any], path: str) -> Select:
+        self.check_keys(spec, _SELECT_KEYS, path)
+        options = spec.get("options") or []
+        if not 1 <= len(options) <= 25:
+            raise DefinitionError(f"{path}.options: オプションは1から25個の範囲で指定してください")
+        select = Select(
+            placeholder=spec.get("placeholder"),
+            disabled=spec.get("disabled", False),
+            func=self.handler(spec, "on_select", path),
+            min_values=spec.get("min_values", 1),
+            max_values=spec.get("max_values", 1),
+        )
+        select.add_options([self.option(option, f"{path}.options[{i}]") for i, option in enumerate(options)])
+        trigger_type = self.flag(SelectTriggerType, spec, "trigger_type", path)
+        if trigger_type is not None:
+            select.trigger_type = trigger_type
+        if spec.get("custom_id"):
+            select.custom_id = spec["custom_id"]
+        return select
+
+    def view(self, spec: Dict[str, Any]) -> ViewGenerator:
+        self.check_keys(spec, _VIEW_KEYS, "view")
+        components: List[Union[Button, Select]] = []
+        for i, component in enumerate(spec.get("components") or []):
+            path = f"view.components[{i}]"
+            kind = component.get("type") if isinstance(component, dict) else None
+            if kind == "button":
+                components.append(self.button(component, path))
+            elif kind == "select":
+                components.append(self.select(component, path))
+            else:
+                raise DefinitionError(f"{path}.type: 'button'または'select'を指定してください")
+        if len(components) > 25:
+            raise DefinitionError("view.components: コンポーネントは25個以下で指定してください")
+
+        return ViewGenerator(
+            components=components,
+            timeout=spec.get("timeout"),
+            used_flag=self.flag(ViewUsedBehaviorType, spec, "used_flag", "view"),
+            respond_flag=self.flag(RespondTargetType, spec, "respond_flag", "view"),
+            only_one_respond=spec.get("only_one_respond", False),
+            prefix=spec.get("prefix"),
+        )
+
+    def text_input(self, spec: Dict[str, Any], path: str) -> Dict[str, Any]:
+        self.check_keys(spec, _INPUT_KEYS, path)
+        validators: List[Validator] = []
+        if spec.get("pattern"):
+            try:
+                validators.append(RegexValidator(spec["pattern"], message=spec.get("pattern_message")))
+            except Exception as e:
+                raise DefinitionError(f"{path}.pattern: 正規表現が正しくありません: {e}")
+        if spec.get("min_value") is not None or spec.get("max_value") is not None or spec.get("integer"):
+            validators.append(RangeValidator(spec.get("min_value"), spec.get("max_value"),
+                                             integer=spec.get("integer", False)))
+        if spec.get("choices"):
+            validators.append(ChoiceValidator(spec["choices"]))
+        style = spec.get("style", "short")
+        if style not in ("short", "long", "paragraph"):
+            raise DefinitionError(f"{path}.style: 'short'または'paragraph'を指定してください")
+        return {
+            "label": spec.get("label", "Input"),
+            "style": TextStyle.short if style == "short" else TextStyle.paragraph,
+            "placeholder": spec.get("placeholder"),
+            "min_length": spec.get("min_length"),
+            "max_length": spec.get("max_length"),
+            "required": spec.get("required", True),
+            "default": spec.get("default"),
+            "validators": tuple(validators),
+        }
+
+
+class ModalFactory:
+
+    def __init__(self,
+                 title: str,
+                 func: Optional[Callable],
+                 on_validation_error: Optional[Callable],
+                 inputs: List[Dict[str, Any]],
+                 ):
+        """
+        検証済みの定義からモーダルウィンドウを生成するファクトリ compile_modalで生成する
+        :param title: モーダルウィンドウのタイトル
+        :param func: モーダルウィンドウが閉じられたときに呼ばれる関数
+        :param on_validation_error: 入力値の検証に失敗したときに呼ばれる関数
+        :param inputs: TextInputの設定
+        """
+        self.title = title
+        self.func = func
+        self.on_validation_error = on_validation_error
+        self.inputs = inputs
+
+    def create(self,
+               author: discord.User = None,
+               message: discord.Message = None,
+               parent_view: ViewGenerator = None,
+               ) -> Modal:
+        """
+        モーダルウィンドウを生成する
+        :param author: モーダルウィンドウの作成者
+        :param message: モーダルウィンドウを開いたメッセージ
+        :param parent_view: モーダルウィンドウを開いたView
+        """
+        modal = Modal(title=self.title, func=self.func, author=author, message=message,
+                      on_validation_error=self.on_validation_error)
+        for spec in self.inputs:
+            text_input = TextInput(
+                style=spec["style"],
+                label=spec["label"],
+                placeholder=spec["placeholder"],
+                min_length=spec["min_length"],
+                max_length=spec["max_length"],
+                required=spec["required"],
+                validators=spec["validators"],
+            )
+            if spec["default"] is not None:
+                text_input.set_pre_fill_value(spec["default"])
+            modal.add_item(text_input)
+        if parent_view is not None:
+            modal.set_parent_view(parent_view)
+        return modal
+
+
+def compile_view(definition: Definition, handlers: Mapping[str, Callable] = None) -> ViewTemplate:
+    """
+    辞書またはJSONのView定義を検証し、Viewを生成するテンプレートに変換する
+    起動時に1度だけ呼び出し、コマンドごとにはcreate()でViewを生成する
+    使用例: compile_view({"components": [{"type": "button", "label": "OK", "on_click": "ok"}]}, {"ok": ok})
+    :param definition: View定義
+    :param handlers: 定義から名前で参照するハンドラ
+    """
+    compiler = _Compiler(handlers)
+    return ViewTemplate(compiler.view(compiler.load(definition)))
+
+
+def compile_modal(definition: Definition, handlers: Mapping[str, Callable] = None) -> ModalFactory:
+    """
+    辞書またはJSONのモーダルウィンドウ定義を検証し、モーダルウィンドウを生成するファクトリに変換する
+    :param definition: モーダルウィンドウ定義
+    :param handlers: 定義から名前で参照するハンドラ
+    """
+    compiler = _Compiler(handlers)
+    spec = compiler.load(definition)
+    compiler.check_keys(spec, _MODAL_KEYS, "modal")
+    if not spec.get("title"):
+        raise DefinitionError("modal.title: タイトルが指定されていません")
+    inputs = spec.get("inputs") or []
+    if not 1 <= len(inputs) <= 5:
+        raise DefinitionError("modal.inputs: 入力欄は1から5個の範囲で指定してください")
+    return ModalFactory(
+        title=spec["title"],
+        func=compiler.handler(spec, "on_submit", "modal"),
+        on_validation_error=compiler.handler(spec, "on_validation_error", "modal"),
+        inputs=[compiler.text_input(i, f"modal.inputs[{n}]") for n, i in enumerate(inputs)],
+    )
@@ -0,0 +1,78 @@
+import asyncio
+import functools
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+_thread_pool: Optional[ThreadPoolExecutor] = None
+_thread_pool_size: Optional[int] = None
+_process_pool: Optional[ProcessPoolExecutor] = None
+_process_pool_size: Optional[int] = None
+
+
+def set_thread_pool_size(max_workers: int):
+    """
+    同期関数のコールバックを実行する共有スレッドプールの大きさを設定する
+    :param max_workers: スレッドの最大数
+    """
+    global _thread_pool, _thread_pool_size
+    if _thread_pool:
+        _thread_pool.shutdown(wait=False)
+        _thread_pool = None
+    _thread_pool_size = max_workers
+
+
+def set_process_pool_size(max_workers: int):
+    """
+    run_in_processで使用する共有プロセスプールの大きさを設定する
+    :param max_workers: プロセスの最大数
+    """
+    global _process_pool, _process_pool_size
+    if _process_pool:
+        _process_pool.shutdown(wait=False)
+        _process_pool = None
+    _process_pool_size = max_workers
+
+
+def get_thread_pool() -> ThreadPoolExecutor:
+    """
+    共有スレッドプールを取得する。初めて呼ばれたときに生成する
+    """
+    global _thread_pool
+    if _thread_pool is None:
+        _thread_pool = ThreadPoolExecutor(max_workers=_thread_pool_size, thread_name_prefix="dpy-bot-utils")
+    return _thread_pool
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """
+    共有プロセスプールを取得する。初めて呼ばれたときに生成する
+    """
+    global _process_pool
+    if _process_pool is None:
+        _process_pool = ProcessPoolExecutor(max_workers=_process_pool_size)
+    return _process_pool
+
+
+async def call_sync_handler(owner: Any, func: Callable, *args):
+    """
+    同期関数のコールバックを実行する
+    ownerがExecutorモードの場合はスレッドプールで実行し、イベントループを止めない
+    :param owner: コールバックを持つViewGeneratorまたはModal
+    :param func: 実行する同期関数
+    """
+    if not getattr(owner, "run_sync_in_executor", False):
+        return func(*args)
+
+    executor: Executor = owner.executor or get_thread_pool()
+    return await asyncio.get_running_loop().run_in_executor(executor, functools.partial(func, *args))
+
+
+async def run_in_process(func: Callable, *args, executor: Executor = None):
+    """
+    CPUを多く使う処理をプロセスプールで実行する
+    プロセス間で受け渡すため、funcと引数はpickleできる必要がある
+    :param func: 実行する関数
+    :param executor: 使用するExecutor 指定しない場合は共有プロセスプールを使用する
+    """
+    executor = executor or get_process_pool()
+    return await asyncio.get_running_loop().run_in_executor(executor, functools.partial(func, *args))
@@ -0,0 +1,28 @@
+from enum import auto
+
+
+class SelectTriggerType:
+    """
+    セレクターのトリガータイプ
+    """
+    ALWAYS = auto()
+    ONLY_MAX = auto()
+    MIN_AND_MAX = auto()
+
+
+class ViewUsedBehaviorType:
+    """
+    Viewの使用方法
+    """
+    VIEW_CLOSE = auto()
+    MESSAGE_DELETE = auto()
+    NOTHING = auto()
+    DISABLE_ITEMS = auto()
+
+
+class RespondTargetType:
+    """
+    レスポンスするターゲットタイプ
+    """
+    ONLY_AUTHOR = auto()
+    ALL_USERS = auto()
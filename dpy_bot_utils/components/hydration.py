@@ -0,0 +1,132 @@
+from typing import Callable, Dict, Optional
+
+import discord
+from discord.ext import commands
+from discord.interactions import Interaction
+
+from .state import StateStore
+from .view import ViewGenerator
+
+
+class StateHydrator:
+
+    def __init__(self,
+                 state_store: StateStore,
+                 bot: commands.Bot = None,
+                 separator: str = "-",
+                 ):
+        """
+        再起動後に届いたインタラクションから、保存された状態を使ってViewを復元するリスナー
+        discord.pyが処理できなかったインタラクションのメッセージに状態が保存されていれば、
+        custom_idのPrefixに登録した関数でViewを生成して状態を反映し、そのインタラクションから処理を再開する
+        :param state_store: 状態を読み込むStateStore
+        :param bot: インタラクションを受け取るBotオブジェクト
+        :param separator: Prefixとcustom_idを区切る文字列
+        """
+        self.state_store = state_store
+        self.separator = separator
+        self.factories: Dict[str, Callable[[], ViewGenerator]] = {}
+        self.bot: Optional[commands.Bot] = None
+        if bot:
+            self.set_bot(bot)
+
+    def set_bot(self, bot: commands.Bot):
+        """
+        Botオブジェクトを設定し、インタラクションの受信を開始する
+        :param bot: Botオブジェクト
+        """
+        if self.bot:
+            self.bot.remove_listener(self.on_interaction, "on_interaction")
+        self.bot = bot
+        bot.add_listener(self.on_interaction, "on_interaction")
+        return self
+
+    def add_factory(self, prefix: str, factory: Callable[[], ViewGenerator]):
+        """
+        Prefixのcustom_idを持つViewを生成する関数を登録する
+        生成するViewは送信したときと同じPrefixとcustom_idを持つ必要がある
+        :param prefix: ViewのPrefix
+        :param factory: 引数なしでViewを生成する関数 ViewTemplate.createも指定できる
+        """
+        self.factories[prefix] = factory
+        return self
+
+    def remove_factory(self, prefix: str):
+        """
+        登録した関数を削除する
+        :param prefix: ViewのPrefix
+        """
+        self.factories.pop(prefix, None)
+        return self
+
+    def _resolve_factory(self, custom_id: str) -> Optional[Callable[[], ViewGenerator]]:
+        """
+        :protected:
+        custom_idのPrefixに登録された関数を最も長く一致するものから探す
+        :param custom_id: インタラクションのcustom_id
+        """
+        end = len(custom_id)
+        while True:
+            end = custom_id.rfind(self.separator, 0, end)
+            if end <= 0:
+                return None
+            factory = self.factories.get(custom_id[:end])
+            if factory is not None:
+                return factory
+
+    def _find_item(self, interaction: Interaction):
+        """
+        :protected:
+        discord.pyに登録済みのViewからインタラクションを処理するコンポーネントを探す
+        """
+        views = self.bot._connection._view_store._views
+        key = (interaction.data["component_type"], interaction.data["custom_id"])
+        item = views.get(interaction.message.id, {}).get(key)
+        if item is None:
+            item = views.get(None, {}).get(key)
+        return item
+
+    async def restore(self, interaction: Interaction) -> Optional[ViewGenerator]:
+        """
+        インタラクションのメッセージのViewを復元し、そのインタラクションを処理させる
+        :param interaction: discord.pyが処理できなかったインタラクション
+        :return: 復元したView 復元しなかった場合はNone
+        """
+        if interaction.type != discord.InteractionType.component or not interaction.data:
+            return None
+        if interaction.message is None or self.bot is None:
+            return None
+        custom_id = interaction.data.get("custom_id")
+        factory = self._resolve_factory(custom_id) if custom_id else None
+        if factory is None or self._find_item(interaction) is not None:
+            return None
+
+        state = await self.state_store.load_async(str(interaction.message.id))
+        if state is None:
+            return None
+
+        view = None
+        item = self._find_item(interaction)
+        if item is None:
+            # 読み込みを待つ間に同じメッセージの別のインタラクションが復元していない場合のみ生成する
+            view = factory()
+            if not any(getattr(i, "custom_id", None) == custom_id for i in view.children):
+                return None
+            view.message = interaction.message
+            view.state_store = self.state_store
+            view.apply_state(state)
+            self.bot._connection.store_view(view, interaction.message.id)
+            item = self._find_item(interaction)
+
+        task = item.view._dispatch_item(item, interaction)
+        if task is not None:
+            self.bot._connection._view_store.add_task(task)
+        return view
+
+    async def on_interaction(self, interaction: Interaction):
+        """
+        :protected:
+        Botから受け取ったインタラクションのViewを必要に応じて復元する
+        :param interaction: 受け取ったインタラクション
+        """
+        await self.restore(interaction)
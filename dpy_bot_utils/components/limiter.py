@@ -0,0 +1,189 @@
+import asyncio
+import time
+from enum import auto
+from typing import TYPE_CHECKING, Any, Dict, Hashable, List, Optional, Tuple
+
+import discord
+
+from .metrics import InteractionMetrics
+
+if TYPE_CHECKING:
+    from discord.interactions import Interaction
+
+
+class DropPolicyType:
+    """
+    待機数の上限を超えたインタラクションへの応答方法
+    """
+    IGNORE = auto()
+    DEFER = auto()
+    NOTICE = auto()
+
+
+class _Slot:
+    __slots__ = ("semaphore", "users", "waiting")
+
+    def __init__(self, limit: int):
+        self.semaphore = asyncio.Semaphore(limit)
+        self.users = 0
+        self.waiting = 0
+
+
+class _KeyedSlots:
+
+    def __init__(self, limit: int):
+        """
+        キーごとの同時実行数の制限 使われていないキーのセマフォは破棄する
+        :param limit: キーごとの同時実行数
+        """
+        self.limit = limit
+        self.slots: Dict[Hashable, _Slot] = {}
+
+    def get(self, key: Hashable) -> _Slot:
+        slot = self.slots.get(key)
+        if slot is None:
+            slot = self.slots[key] = _Slot(self.limit)
+        slot.users += 1
+        return slot
+
+    def put(self, key: Hashable, slot: _Slot):
+        slot.users -= 1
+        if slot.users == 0 and self.slots.get(key) is slot:
+            del self.slots[key]
+
+
+class _Permit:
+    __slots__ = ("slots",)
+
+    def __init__(self, slots: List[Tuple[Optional[_KeyedSlots], Hashable, _Slot]]):
+        self.slots = slots
+
+
+class ConcurrencyLimiter:
+
+    def __init__(self,
+                 max_concurrency: int = None,
+                 per_view: int = None,
+                 per_user: int = None,
+                 max_queue: int = None,
+                 drop_policy: "DropPolicyType" = DropPolicyType.NOTICE,
+                 drop_message: str = "混み合っています。しばらくしてからもう一度お試しください。",
+                 metrics: InteractionMetrics = None,
+                 ):
+        """
+        コールバックの同時実行数を制限する 複数のViewで共有できる
+        上限に達したインタラクションは順番に待機し、待機数がmax_queueを超えたものはdrop_policyに従って破棄する
+        :param max_concurrency: 全体の同時実行数 指定しない場合は制限しない
+        :param per_view: Viewごとの同時実行数 1の場合はViewごとに1つずつ実行する
+        :param per_user: ユーザーごとの同時実行数 1の場合はユーザーごとに1つずつ実行する
+        :param max_queue: 1つの制限で待機できるインタラクションの最大数 指定しない場合は制限しない
+        :param drop_policy: 破棄したインタラクションへの応答方法
+        :param drop_message: DropPolicyType.NOTICEのときに本人にのみ表示するメッセージ
+        :param metrics: 待機数と待機時間を記録するInteractionMetrics
+        """
+        self.max_concurrency = max_concurrency
+        self.per_view = per_view
+        self.per_user = per_user
+        self.max_queue = max_queue
+        self.drop_policy = drop_policy
+        self.drop_message = drop_message
+        self.metrics = metrics
+        self._global = _Slot(max_concurrency) if max_concurrency else None
+        self._views = _KeyedSlots(per_view) if per_view else None
+        self._users = _KeyedSlots(per_user) if per_user else None
+        self.waiting = 0
+        self.dropped = 0
+
+    def _slots(self, view: Any, interaction: "Interaction") -> List[Tuple[Optional[_KeyedSlots], Hashable, _Slot]]:
+        """
+        :protected:
+        インタラクションが取得する制限をユーザー、View、全体の順に取得する
+        """
+        slots = []
+        if self._users is not None:
+            key = interaction.user.id
+            slots.append((self._users, key, self._users.get(key)))
+        if self._views is not None:
+            key = view.id
+            slots.append((self._views, key, self._views.get(key)))
+        if self._global is not None:
+            slots.append((None, None, self._global))
+        return slots
+
+    @staticmethod
+    def _put(slots: List[Tuple[Optional[_KeyedSlots], Hashable, _Slot]]):
+        for keyed, key, slot in slots:
+            if keyed is not None:
+                keyed.put(key, slot)
+
+    def _set_depth(self):
+        if self.metrics is not None:
+            self.metrics.set_gauge(InteractionMetrics.QUEUE_DEPTH, None, self.waiting)
+
+    async def acquire(self, view: Any, interaction: "Interaction") -> Optional[_Permit]:
+        """
+        コールバックを実行できるまで待機する
+        :param view: インタラクションを受け取ったView
+        :param interaction: 処理するインタラクション
+        :return: releaseに渡す値 待機数の上限を超えて破棄した場合はNone
+        """
+        slots = self._slots(view, interaction)
+        if self.max_queue is not None:
+            for _, _, slot in slots:
+                if slot.semaphore.locked() and slot.waiting >= self.max_queue:
+                    self._put(slots)
+                    await self._drop(view, interaction)
+                    return None
+
+        prefix = getattr(view, "custom_id_prefix", None)
+        started = time.perf_counter()
+        acquired = 0
+        try:
+            for _, _, slot in slots:
+                if slot.semaphore.locked():
+                    slot.waiting += 1
+                    self.waiting += 1
+                    self._set_depth()
+                    try:
+                        await slot.semaphore.acquire()
+                    finally:
+                        slot.waiting -= 1
+                        self.waiting -= 1
+                        self._set_depth()
+                else:
+                    await slot.semaphore.acquire()
+                acquired += 1
+        except BaseException:
+            for _, _, slot in slots[:acquired]:
+                slot.semaphore.release()
+            self._put(slots)
+            raise
+
+        if self.metrics is not None:
+            self.metrics.observe(InteractionMetrics.QUEUE_WAIT, prefix, time.perf_counter() - started)
+        return _Permit(slots)
+
+    def release(self, permit: _Permit):
+        """
+        コールバックの実行が終わったことを通知する
+        :param permit: acquireで取得した値
+        """
+        for _, _, slot in reversed(permit.slots):
+            slot.semaphore.release()
+        self._put(permit.slots)
+
+    async def _drop(self, view: Any, interaction: "Interaction"):
+        """
+        :protected:
+        待機数の上限を超えたインタラクションをdrop_policyに従って破棄する
+        """
+        self.dropped += 1
+        if self.metrics is not None:
+            self.metrics.increment(InteractionMetrics.DROPPED_INTERACTIONS, getattr(view, "custom_id_prefix", None))
+        try:
+            if self.drop_policy == DropPolicyType.DEFER:
+                await interaction.response.defer()
+            elif self.drop_policy == DropPolicyType.NOTICE:
+                await interaction.response.send_message(self.drop_message, ephemeral=True)
+        except (discord.InteractionResponded, discord.HTTPException):
+            pass
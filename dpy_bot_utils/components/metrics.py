@@ -0,0 +1,208 @@
+import time
+from bisect import bisect_left
+from typing import TYPE_CHECKING, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+if TYPE_CHECKING:
+    from discord.interactions import Interaction
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        """
+        固定の境界値で値を数えるヒストグラム
+        :param buckets: 境界値(秒) 昇順で指定する
+        """
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        """
+        値を記録する
+        :param value: 記録する値(秒)
+        """
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class InteractionMetrics:
+    INTERACTION_LATENCY = "interaction_latency"
+    INTERACTION_CHECK_DURATION = "interaction_check_duration"
+    CALLBACK_DURATION = "callback_duration"
+    SYNC_MESSAGE_DURATION = "sync_message_duration"
+    SKIPPED_EDITS = "skipped_edits"
+    LATE_CALLBACKS = "late_callbacks"
+    DEFERRED_INTERACTIONS = "deferred_interactions"
+    QUEUE_WAIT = "queue_wait"
+    QUEUE_DEPTH = "queue_depth"
+    DROPPED_INTERACTIONS = "dropped_interactions"
+    THROTTLED_INTERACTIONS = "throttled_interactions"
+
+    def __init__(self,
+                 buckets: Sequence[float] = DEFAULT_BUCKETS,
+                 namespace: str = "dpy_bot_utils",
+                 ):
+        """
+        custom_idのPrefixごとにインタラクションの処理時間を記録する
+        :param buckets: ヒストグラムの境界値(秒)
+        :param namespace: Prometheus形式で出力するときのメトリクス名の接頭辞
+        """
+        self.buckets = tuple(sorted(buckets))
+        self.namespace = namespace
+        self.histograms: Dict[Tuple[str, Optional[str]], Histogram] = {}
+        self.counters: Dict[Tuple[str, Optional[str]], int] = {}
+        self.gauges: Dict[Tuple[str, Optional[str]], float] = {}
+        self.hooks: List[Callable[[str, Optional[str], float], None]] = []
+
+    def add_hook(self, func: Callable[[str, Optional[str], float], None]):
+        """
+        値が記録されるたびに呼ばれる関数を追加する
+        :param func: メトリクス名、Prefix、値(秒)を受け取る関数
+        """
+        self.hooks.append(func)
+        return self
+
+    def remove_hook(self, func: Callable[[str, Optional[str], float], None]):
+        """
+        値が記録されるたびに呼ばれる関数を削除する
+        :param func: 削除する関数
+        """
+        self.hooks.remove(func)
+        return self
+
+    def observe(self, name: str, prefix: Optional[str], value: float):
+        """
+        値を記録する
+        :param name: メトリクス名
+        :param prefix: custom_idのPrefix
+        :param value: 記録する値(秒)
+        """
+        histogram = self.histograms.get((name, prefix))
+        if histogram is None:
+            histogram = self.histograms[(name, prefix)] = Histogram(self.buckets)
+        histogram.observe(value)
+        for hook in self.hooks:
+            hook(name, prefix, value)
+
+    def increment(self, name: str, prefix: Optional[str], amount: int = 1):
+        """
+        回数を記録する
+        :param name: メトリクス名
+        :param prefix: custom_idのPrefix
+        :param amount: 加算する回数
+        """
+        key = (name, prefix)
+        self.counters[key] = self.counters.get(key, 0) + amount
+
+    def get_count(self, name: str, prefix: Optional[str] = None) -> int:
+        """
+        記録した回数を取得する
+        :param name: メトリクス名
+        :param prefix: custom_idのPrefix
+        """
+        return self.counters.get((name, prefix), 0)
+
+    def set_gauge(self, name: str, prefix: Optional[str], value: float):
+        """
+        現在の値を記録する
+        :param name: メトリクス名
+        :param prefix: custom_idのPrefix
+        :param value: 現在の値
+        """
+        self.gauges[(name, prefix)] = value
+
+    def get_gauge(self, name: str, prefix: Optional[str] = None) -> float:
+        """
+        記録した現在の値を取得する
+        :param name: メトリクス名
+        :param prefix: custom_idのPrefix
+        """
+        return self.gauges.get((name, prefix), 0)
+
+    async def measure(self, name: str, prefix: Optional[str], func: Callable[..., Awaitable], *args):
+        """
+        コルーチン関数の実行時間を記録する
+        :param name: メトリクス名
+        :param prefix: custom_idのPrefix
+        :param func: 実行するコルーチン関数
+        """
+        started = time.perf_counter()
+        try:
+            return await func(*args)
+        finally:
+            self.observe(name, prefix, time.perf_counter() - started)
+
+    def start_callback(self, prefix: Optional[str], interaction: "Interaction") -> float:
+        """
+        インタラクションの作成からコールバック開始までの時間を記録し、計測の開始時刻を返す
+        :param prefix: custom_idのPrefix
+        :param interaction: 処理するインタラクション
+        """
+        created_at = getattr(interaction, "created_at", None)
+        if created_at is not None:
+            self.observe(self.INTERACTION_LATENCY, prefix, max(time.time() - created_at.timestamp(), 0.0))
+        return time.perf_counter()
+
+    def finish(self, name: str, prefix: Optional[str], started: float):
+        """
+        開始時刻からの経過時間を記録する
+        :param name: メトリクス名
+        :param prefix: custom_idのPrefix
+        :param started: time.perf_counterで取得した開始時刻
+        """
+        self.observe(name, prefix, time.perf_counter() - started)
+
+    def reset(self):
+        """
+        記録した値を全て破棄する
+        """
+        self.histograms.clear()
+        self.counters.clear()
+        self.gauges.clear()
+        return self
+
+    def to_prometheus(self) -> str:
+        """
+        記録した値をPrometheusのテキスト形式で出力する
+        """
+        lines = []
+        names = sorted({name for name, _ in self.histograms})
+        for name in names:
+            metric = f"{self.namespace}_{name}_seconds"
+            lines.append(f"# TYPE {metric} histogram")
+            for (histogram_name, prefix), histogram in sorted(self.histograms.items(),
+                                                              key=lambda i: (i[0][0], i[0][1] or "")):
+                if histogram_name != name:
+                    continue
+                escaped = (prefix or "").replace("\\", "\\\\").replace('"', '\\"')
+                label = f'prefix="{escaped}"'
+                cumulative = 0
+                for bound, count in zip(histogram.buckets, histogram.counts):
+                    cumulative += count
+                    lines.append(f'{metric}_bucket{{{label},le="{bound}"}} {cumulative}')
+                lines.append(f'{metric}_bucket{{{label},le="+Inf"}} {histogram.count}')
+                lines.append(f"{metric}_sum{{{label}}} {histogram.sum}")
+                lines.append(f"{metric}_count{{{label}}} {histogram.count}")
+        for name in sorted({name for name, _ in self.counters}):
+            metric = f"{self.namespace}_{name}_total"
+            lines.append(f"# TYPE {metric} counter")
+            for (counter_name, prefix), count in sorted(self.counters.items(), key=lambda i: (i[0][0], i[0][1] or "")):
+                if counter_name != name:
+                    continue
+                escaped = (prefix or "").replace("\\", "\\\\").replace('"', '\\"')
+                lines.append(f'{metric}{{prefix="{escaped}"}} {count}')
+        for name in sorted({name for name, _ in self.gauges}):
+            metric = f"{self.namespace}_{name}"
+            lines.append(f"# TYPE {metric} gauge")
+            for (gauge_name, prefix), value in sorted(self.gauges.items(), key=lambda i: (i[0][0], i[0][1] or "")):
+                if gauge_name != name:
+                    continue
+                escaped = (prefix or "").replace("\\", "\\\\").replace('"', '\\"')
+                lines.append(f'{metric}{{prefix="{escaped}"}} {value}')
+        return "\n".join(lines) + "\n"
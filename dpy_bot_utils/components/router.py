@@ -0,0 +1,282 @@
+import asyncio
+from typing import Callable, Dict, Optional, Tuple, Any
+
+import discord
+from discord.ext import commands
+from discord.interactions import Interaction
+from discord.ui.view import View
+
+from .codec import CustomIdCodec
+from .view import ViewGenerator
+
+
+class _Route:
+    __slots__ = ("prefix", "func", "is_coroutine", "codec")
+
+    def __init__(self, prefix: str, func: Callable, codec: Optional[CustomIdCodec]):
+        self.prefix = prefix
+        self.func = func
+        self.is_coroutine = asyncio.iscoroutinefunction(func)
+        self.codec = codec
+
+
+class _RouteNode:
+    __slots__ = ("children", "terminals")
+
+    def __init__(self):
+        self.children: Dict[str, "_RouteNode"] = {}
+        self.terminals: Dict[str, _Route] = {}
+
+
+class RouteGroup:
+
+    def __init__(self, router: "ComponentRouter", namespace: str):
+        """
+        名前空間の下にハンドラを登録するためのグループ ComponentRouter.groupで生成する
+        :param router: ハンドラを登録するルーター
+        :param namespace: グループの名前空間
+        """
+        self.router = router
+        self.namespace = namespace
+
+    def _join(self, name: str) -> str:
+        """
+        :protected:
+        名前空間と名前を連結する
+        """
+        return f"{self.namespace}{self.router.namespace_separator}{name}"
+
+    def group(self, name: str) -> "RouteGroup":
+        """
+        このグループの下に名前空間を作成する
+        :param name: 名前空間の名前
+        """
+        return RouteGroup(self.router, self._join(name))
+
+    def add_route(self, name: str, func: Callable[[Interaction, Any], Any], codec: CustomIdCodec = None):
+        """
+        名前空間の下にハンドラを登録する
+        :param name: 名前空間を除いたPrefix
+        :param func: インタラクションとPrefixを除いたcustom_idを受け取る関数
+        :param codec: 指定した場合はcustom_idから復元した状態のタプルをfuncに渡す
+        """
+        self.router.add_route(self._join(name), func, codec=codec)
+        return self
+
+    def route(self, name: str, codec: CustomIdCodec = None):
+        """
+        名前空間の下にハンドラを登録するデコレータ
+        :param name: 名前空間を除いたPrefix
+        :param codec: 指定した場合はcustom_idから復元した状態のタプルをハンドラに渡す
+        """
+        return self.router.route(self._join(name), codec=codec)
+
+
+class ComponentRouter:
+
+    def __init__(self,
+                 bot: commands.Bot = None,
+                 separator: str = "-",
+                 namespace_separator: str = ":",
+                 ):
+        """
+        custom_idのPrefixを元にインタラクションを振り分けるルーター
+        メッセージごとにViewを生成せず、Prefixごとに1度だけハンドラを登録する
+        Prefixは shop:cart:add のように名前空間で階層化でき、
+        登録数に関わらずcustom_idの長さに比例する時間でハンドラを探す
+        :param bot: インタラクションを受け取るBotオブジェクト
+        :param separator: Prefixとcustom_idを区切る文字列
+        :param namespace_separator: Prefixの名前空間を区切る文字列
+        """
+        if not separator or not namespace_separator:
+            raise ValueError("区切り文字が指定されていません")
+        if separator in namespace_separator or namespace_separator in separator:
+            raise ValueError("区切り文字と名前空間の区切り文字には異なる文字列を指定してください")
+        self.routes: Dict[str, Callable] = {}
+        self.codecs: Dict[str, CustomIdCodec] = {}
+        self.separator = separator
+        self.namespace_separator = namespace_separator
+        self._root = _RouteNode()
+        self.bot: Optional[commands.Bot] = None
+        if bot:
+            self.set_bot(bot)
+
+    def set_bot(self, bot: commands.Bot):
+        """
+        Botオブジェクトを設定し、インタラクションの受信を開始する
+        :param bot: Botオブジェクト
+        """
+        if self.bot:
+            self.bot.remove_listener(self.on_interaction, "on_interaction")
+        self.bot = bot
+        bot.add_listener(self.on_interaction, "on_interaction")
+        return self
+
+    def add_route(self, prefix: str, func: Callable[[Interaction, Any], Any], codec: CustomIdCodec = None):
+        """
+        Prefixに対するハンドラを登録する
+        :param prefix: ViewGeneratorに設定したcustom_idのPrefix
+        :param func: インタラクションとPrefixを除いたcustom_idを受け取る関数
+        :param codec: 指定した場合はcustom_idから復元した状態のタプルをfuncに渡す
+        """
+        if not prefix:
+            raise ValueError("Prefixが指定されていません")
+        self.routes[prefix] = func
+        if codec:
+            self.codecs[prefix] = codec
+        else:
+            self.codecs.pop(prefix, None)
+
+        *namespaces, name = prefix.split(self.namespace_separator)
+        node = self._root
+        for namespace in namespaces:
+            child = node.children.get(namespace)
+            if child is None:
+                child = node.children[namespace] = _RouteNode()
+            node = child
+        node.terminals[name] = _Route(prefix, func, codec)
+        return self
+
+    def route(self, prefix: str, codec: CustomIdCodec = None):
+        """
+        Prefixに対するハンドラを登録するデコレータ
+        :param prefix: ViewGeneratorに設定したcustom_idのPrefix
+        :param codec: 指定した場合はcustom_idから復元した状態のタプルをハンドラに渡す
+        """
+        def decorator(func: Callable[[Interaction, Any], Any]):
+            self.add_route(prefix=prefix, func=func, codec=codec)
+            return func
+
+        return decorator
+
+    def group(self, namespace: str) -> RouteGroup:
+        """
+        名前空間の下にハンドラを登録するためのグループを作成する
+        使用例: router.group("shop").group("cart").add_route("add", func) は shop:cart:add に登録する
+        :param namespace: 名前空間
+        """
+        return RouteGroup(self, namespace)
+
+    def remove_route(self, prefix: str):
+        """
+        Prefixに対するハンドラを削除する
+        :param prefix: 削除するPrefix
+        """
+        self.routes.pop(prefix, None)
+        self.codecs.pop(prefix, None)
+
+        *namespaces, name = prefix.split(self.namespace_separator)
+        path = [self._root]
+        for namespace in namespaces:
+            node = path[-1].children.get(namespace)
+            if node is None:
+                return self
+            path.append(node)
+        path[-1].terminals.pop(name, None)
+        for namespace, parent, node in zip(reversed(namespaces), reversed(path[:-1]), reversed(path)):
+            if node.terminals or node.children:
+                break
+            del parent.children[namespace]
+        return self
+
+    def _resolve_route(self, custom_id: str) -> Optional[Tuple[_Route, str]]:
+        """
+        :protected:
+        custom_idに最も長く一致するPrefixのルートを取得する
+        :return: (ルート, Prefixを除いたcustom_id) 一致しない場合はNone
+        """
+        separator = self.separator
+        parts = custom_id.split(self.namespace_separator)
+        last = len(parts) - 1
+        node = self._root
+        position = 0
+        matched = None
+        for depth, part in enumerate(parts):
+            terminals = node.terminals
+            if terminals:
+                if depth == last:
+                    route = terminals.get(part)
+                    if route is not None:
+                        return route, ""
+                index = part.rfind(separator)
+                while index > 0:
+                    route = terminals.get(part[:index])
+                    if route is not None:
+                        matched = (route, position + index + len(separator))
+                        break
+                    index = part.rfind(separator, 0, index)
+            node = node.children.get(part)
+            if node is None:
+                break
+            position += len(part) + len(self.namespace_separator)
+
+        if matched is None:
+            return None
+        route, position = matched
+        return route, custom_id[position:]
+
+    def resolve(self, custom_id: str) -> Optional[Tuple[Callable, str, str]]:
+        """
+        custom_idに一致するハンドラを取得する
+        一致するPrefixが複数ある場合は最も長く一致するものを優先する
+        :param custom_id: インタラクションのcustom_id
+        :return: (ハンドラ, Prefix, Prefixを除いたcustom_id) 一致しない場合はNone
+        """
+        resolved = self._resolve_route(custom_id)
+        if resolved is None:
+            return None
+        route, key = resolved
+        return route.func, route.prefix, key
+
+    async def dispatch(self, interaction: Interaction) -> bool:
+        """
+        インタラクションを登録済みのハンドラに振り分ける
+        :param interaction: 振り分けるインタラクション
+        :return: ハンドラが実行されたかどうか
+        """
+        if interaction.type != discord.InteractionType.component or not interaction.data:
+            return False
+
+        custom_id = interaction.data.get("custom_id")
+        if not custom_id:
+            return False
+
+        resolved = self._resolve_route(custom_id)
+        if not resolved:
+            return False
+
+        route, key = resolved
+        if route.codec:
+            try:
+                key = route.codec.decode_payload(route.prefix, key)
+            except ValueError:
+                return False
+
+        if route.is_coroutine:
+            await route.func(interaction, key)
+        else:
+            route.func(interaction, key)
+        return True
+
+    async def on_interaction(self, interaction: Interaction):
+        """
+        :protected:
+        Botから受け取ったインタラクションを振り分ける
+        :param interaction: 受け取ったインタラクション
+        """
+        await self.dispatch(interaction=interaction)
+
+    @staticmethod
+    def detach_view(view: View, delete_state: bool = False):
+        """
+        送信済みのViewをメモリから解放する
+        メッセージ上のコンポーネントは残り、以降のインタラクションはルーターが処理する
+        StateStoreに保存した状態は既定では残すため、後からStateHydratorで復元できる
+        :param view: 解放するView
+        :param delete_state: 保存した状態も削除するかどうか
+        """
+        if isinstance(view, ViewGenerator):
+            view.stop(delete_state=delete_state)
+        else:
+            view.stop()
+        return view
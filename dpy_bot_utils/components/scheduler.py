@@ -0,0 +1,157 @@
+import asyncio
+import time
+from collections import deque
+from enum import auto
+from typing import Any, Awaitable, Callable, Deque, Dict, Hashable, Optional
+
+
+class EditPriority:
+    """
+    メッセージ編集の優先度
+    """
+    USER = auto()
+    CLEANUP = auto()
+
+
+class _EditEntry:
+
+    def __init__(self, func: Callable[[], Awaitable[Any]], priority: "EditPriority", future: asyncio.Future):
+        self.func = func
+        self.priority = priority
+        self.future = future
+
+
+class _EditBucket:
+
+    def __init__(self):
+        self.user_queue: Deque[Hashable] = deque()
+        self.cleanup_queue: Deque[Hashable] = deque()
+        self.entries: Dict[Hashable, _EditEntry] = {}
+        self.sent_at: Deque[float] = deque()
+        self.worker: Optional[asyncio.Task] = None
+        self.wakeup = asyncio.Event()
+
+    def pop(self) -> Optional[_EditEntry]:
+        """
+        優先度の高い順に次の編集を取り出す。上書き済みで送信済みの編集は読み飛ばす
+        """
+        for queue in (self.user_queue, self.cleanup_queue):
+            while queue:
+                entry = self.entries.pop(queue.popleft(), None)
+                if entry:
+                    return entry
+        return None
+
+
+class EditScheduler:
+
+    def __init__(self,
+                 rate: int = 5,
+                 per: float = 5.0,
+                 ):
+        """
+        チャンネルごとのレート制限に合わせてメッセージの編集を順番に実行するスケジューラー
+        同じメッセージへの未送信の編集は最新のものだけが送信される
+        :param rate: per秒あたりに送信できる編集の数
+        :param per: レート制限の単位時間(秒)
+        """
+        self.rate = rate
+        self.per = per
+        self.buckets: Dict[Hashable, _EditBucket] = {}
+        self.superseded_count = 0
+
+    def set_rate(self, rate: int, per: float):
+        """
+        レート制限を設定する
+        :param rate: per秒あたりに送信できる編集の数
+        :param per: レート制限の単位時間(秒)
+        """
+        self.rate = rate
+        self.per = per
+        return self
+
+    def pending_count(self) -> int:
+        """
+        送信待ちの編集の数を取得する
+        """
+        return sum(len(bucket.entries) for bucket in self.buckets.values())
+
+    def submit(self,
+               bucket_key: Hashable,
+               edit_key: Hashable,
+               func: Callable[[], Awaitable[Any]],
+               priority: "EditPriority" = EditPriority.USER,
+               ) -> asyncio.Future:
+        """
+        メッセージの編集を予約する
+        :param bucket_key: レート制限を共有する単位(チャンネルID)
+        :param edit_key: 編集対象を表すキー 同じキーの未送信の編集は上書きされる
+        :param func: 編集を実行するコルーチン関数
+        :param priority: 編集の優先度
+        :return: 編集結果を受け取るFuture
+        """
+        bucket = self.buckets.get(bucket_key)
+        if bucket is None:
+            bucket = self.buckets[bucket_key] = _EditBucket()
+
+        entry = bucket.entries.get(edit_key)
+        if entry:
+            self.superseded_count += 1
+            entry.func = func
+            if priority == EditPriority.USER and entry.priority != EditPriority.USER:
+                entry.priority = priority
+                bucket.user_queue.append(edit_key)
+            return entry.future
+
+        future = asyncio.get_running_loop().create_future()
+        bucket.entries[edit_key] = _EditEntry(func=func, priority=priority, future=future)
+        if priority == EditPriority.USER:
+            bucket.user_queue.append(edit_key)
+        else:
+            bucket.cleanup_queue.append(edit_key)
+
+        bucket.wakeup.set()
+        if bucket.worker is None:
+            bucket.worker = asyncio.ensure_future(self._drain(bucket_key, bucket))
+        return future
+
+    async def _drain(self, bucket_key: Hashable, bucket: _EditBucket):
+        """
+        :protected:
+        レート制限の範囲内でバケットの編集を順番に実行する
+        :param bucket_key: バケットのキー
+        :param bucket: 実行するバケット
+        """
+        try:
+            while True:
+                now = time.monotonic()
+                while bucket.sent_at and now - bucket.sent_at[0] >= self.per:
+                    bucket.sent_at.popleft()
+
+                if not bucket.entries:
+                    if not bucket.sent_at:
+                        break
+                    # レート制限の記録が消えるまではバケットを残し、新しい編集を待つ
+                    bucket.wakeup.clear()
+                    try:
+                        await asyncio.wait_for(bucket.wakeup.wait(), self.per - (now - bucket.sent_at[0]))
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+
+                if len(bucket.sent_at) >= self.rate:
+                    await asyncio.sleep(self.per - (now - bucket.sent_at[0]))
+                    continue
+
+                entry = bucket.pop()
+                if entry is None:
+                    continue
+                bucket.sent_at.append(time.monotonic())
+                try:
+                    entry.future.set_result(await entry.func())
+                except Exception as e:
+                    entry.future.set_exception(e)
+        finally:
+            bucket.worker = None
+            if not bucket.entries:
+                self.buckets.pop(bucket_key, None)
@@ -0,0 +1,275 @@
+from bisect import bisect_left
+from typing import Callable, List, Tuple
+
+import discord
+from discord.interactions import Interaction
+
+from .ui_components import Modal, TextInput
+from .view import ViewGenerator, Button, ButtonStyle, Select, SelectOption
+
+SELECT_MAX_OPTIONS = 25
+
+
+class OptionIndex:
+
+    def __init__(self):
+        """
+        オプションのラベルと値を前方一致で検索するためのインデックス
+        ラベル全体とラベル中の単語それぞれを検索対象にする
+        """
+        self.keys: List[str] = []
+        self.positions: List[int] = []
+        self._pending: List[Tuple[str, int]] = []
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        """
+        検索用に文字列を正規化する
+        :param text: 正規化する文字列
+        """
+        return text.casefold().strip()
+
+    def add(self, position: int, *texts: str):
+        """
+        インデックスに文字列を追加する。インデックスは次の検索時にまとめて構築する
+        :param position: 検索結果として返す位置
+        :param texts: 検索対象の文字列
+        """
+        tokens = set()
+        for text in texts:
+            if not text:
+                continue
+            normalized = self.normalize(text)
+            tokens.add(normalized)
+            tokens.update(normalized.split())
+        self._pending.extend((token, position) for token in tokens)
+
+    def _build(self):
+        """
+        :protected:
+        追加された文字列をインデックスに反映する
+        """
+        entries = sorted(list(zip(self.keys, self.positions)) + self._pending)
+        self.keys = [key for key, _ in entries]
+        self.positions = [position for _, position in entries]
+        self._pending = []
+
+    def search(self, query: str, offset: int = 0, limit: int = SELECT_MAX_OPTIONS) -> Tuple[List[int], bool]:
+        """
+        前方一致で検索する
+        :param query: 検索する文字列
+        :param offset: 読み飛ばす件数
+        :param limit: 取得する件数
+        :return: (一致した位置, 続きがあるかどうか)
+        """
+        if self._pending:
+            self._build()
+
+        query = self.normalize(query)
+        keys = self.keys
+        index = bisect_left(keys, query)
+        seen = set()
+        result = []
+        while index < len(keys) and keys[index].startswith(query):
+            position = self.positions[index]
+            index += 1
+            if position in seen:
+                continue
+            seen.add(position)
+            if len(seen) > offset:
+                result.append(position)
+                if len(result) > limit:
+                    break
+        return result[:limit], len(result) > limit
+
+
+class SearchableSelect(Select):
+
+    def __init__(self,
+                 placeholder: str = None,
+                 options: List[SelectOption] = None,
+                 disabled: bool = False,
+                 func: Callable = None,
+                 min_values: int = 1,
+                 max_values: int = 1,
+                 page_size: int = SELECT_MAX_OPTIONS,
+                 search_title: str = "検索",
+                 search_label: str = "キーワード",
+                 no_result_label: str = "見つかりませんでした",
+                 ):
+        """
+        25件を超えるオプションをページ切り替えと検索で選択できるセレクター
+        controls()で取得したボタンを同じViewに追加して使用する
+        :param placeholder: セレクターのプレースホルダー
+        :param options: セレクターのオプション
+        :param disabled: セレクターを無効化するかどうか
+        :param func: セレクターを選択したときに実行する関数
+        :param min_values: セレクターの最小選択数
+        :param max_values: セレクターの最大選択数
+        :param page_size: 1ページに表示するオプションの数(最大25)
+        :param search_title: 検索用モーダルウィンドウのタイトル
+        :param search_label: 検索用の入力欄のラベル
+        :param no_result_label: 検索結果がないときに表示するラベル
+        """
+        super().__init__(placeholder=placeholder, disabled=disabled, func=func,
+                         min_values=min_values, max_values=max_values)
+        self.all_options: List[SelectOption] = []
+        self.index = OptionIndex()
+        self.page_size = min(page_size, SELECT_MAX_OPTIONS)
+        self.search_title = search_title
+        self.search_label = search_label
+        self.no_result_label = no_result_label
+        self.query = ""
+        self.page = 0
+        self.has_next_page = False
+        self.enabled = not disabled
+        self._min_values_setting = min_values
+        self._max_values_setting = max_values
+
+        self.previous_button = Button(label="<", button_style=ButtonStyle.secondary).on_click(self._on_previous)
+        self.search_button = Button(label="検索", button_style=ButtonStyle.secondary).on_click(self._on_search)
+        self.next_button = Button(label=">", button_style=ButtonStyle.secondary).on_click(self._on_next)
+        if options:
+            self.add_options(options)
+        else:
+            self._refresh()
+
+    def controls(self) -> List[Button]:
+        """
+        ページ切り替えと検索のボタンを取得する
+        """
+        return [self.previous_button, self.search_button, self.next_button]
+
+    def add_option(self, option: SelectOption, **kwargs):
+        """
+        セレクターのオプションを追加する
+        :param option: セレクターのオプション
+        """
+        self.index.add(len(self.all_options), option.label, option.value)
+        self.all_options.append(option)
+        if option.func:
+            self.event_handlers[option.value] = option
+        if kwargs.get("refresh", True):
+            self._refresh()
+        return self
+
+    def add_options(self, options: List[SelectOption]):
+        """
+        セレクターのオプションを一括で追加する
+        :param options: セレクターのオプション
+        """
+        for i in options:
+            self.add_option(option=i, refresh=False)
+        self._refresh()
+        return self
+
+    def set_disabled(self, disabled: bool):
+        """
+        セレクターを無効化するかどうかを設定する
+        :param disabled: セレクターを無効化するかどうか
+        """
+        self.enabled = not disabled
+        self._refresh()
+        return self
+
+    def search(self, query: str):
+        """
+        オプションを検索し、最初のページを表示する
+        :param query: 検索する文字列 空の場合は全てのオプションを表示する
+        """
+        self.query = query or ""
+        self.page = 0
+        self._refresh()
+        return self
+
+    def set_page(self, page: int):
+        """
+        表示するページを設定する
+        :param page: ページ番号(0から)
+        """
+        self.page = max(page, 0)
+        self._refresh()
+        return self
+
+    def _current_options(self) -> List[SelectOption]:
+        """
+        :protected:
+        現在のページに表示するオプションを取得する
+        """
+        offset = self.page * self.page_size
+        if not self.query.strip():
+            self.has_next_page = offset + self.page_size < len(self.all_options)
+            return self.all_options[offset:offset + self.page_size]
+
+        positions, self.has_next_page = self.index.search(self.query, offset=offset, limit=self.page_size)
+        return [self.all_options[i] for i in positions]
+
+    def _refresh(self):
+        """
+        :protected:
+        現在のページと検索条件に合わせてオプションとボタンを更新する
+        """
+        options = self._current_options()
+        if options:
+            self.options = options
+            self.disabled = not self.enabled
+        else:
+            self.options = [discord.SelectOption(label=self.no_result_label)]
+            self.disabled = True
+        self.max_values = min(self._max_values_setting, len(self.options))
+        self.min_values = min(self._min_values_setting, self.max_values)
+
+        self.previous_button.disabled = self.page <= 0
+        self.next_button.disabled = not self.has_next_page
+        if self.parent_view is not None:
+            self.parent_view.invalidate_components()
+
+    def set_min_values(self, min_values: int):
+        """
+        セレクターの最小選択数を設定する
+        """
+        self._min_values_setting = min_values
+        self._refresh()
+        return self
+
+    def set_max_values(self, max_values: int):
+        """
+        セレクターの最大選択数を設定する
+        """
+        self._max_values_setting = max_values
+        self._refresh()
+        return self
+
+    async def _on_previous(self, interaction: Interaction, view: ViewGenerator):
+        """
+        :protected:
+        前のページを表示する
+        """
+        self.set_page(self.page - 1)
+        await interaction.response.edit_message(view=view)
+
+    async def _on_next(self, interaction: Interaction, view: ViewGenerator):
+        """
+        :protected:
+        次のページを表示する
+        """
+        self.set_page(self.page + 1)
+        await interaction.response.edit_message(view=view)
+
+    async def _on_search(self, interaction: Interaction, view: ViewGenerator):
+        """
+        :protected:
+        検索用のモーダルウィンドウを表示する
+        """
+        text_input = TextInput(label=self.search_label, required=False)
+        modal = Modal(title=self.search_title, func=self._on_search_submit).add_component(text_input)
+        modal.set_parent_view(view)
+        await interaction.response.send_modal(modal)
+
+    async def _on_search_submit(self, interaction: Interaction, view: ViewGenerator, modal: Modal):
+        """
+        :protected:
+        入力された文字列で検索し、結果を表示する
+        """
+        self.search(modal.children[0].value)
+        await interaction.response.edit_message(view=view)
@@ -0,0 +1,286 @@
+import asyncio
+import json
+import logging
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from concurrent.futures import Executor
+from typing import Any, Dict, Optional, Tuple
+
+from .executor import get_thread_pool
+
+ViewState = Dict[str, Any]
+
+_log = logging.getLogger(__name__)
+
+
+class StateStore(ABC):
+    """
+    Viewの状態を保存するストアの基底クラス
+    """
+
+    @abstractmethod
+    def load(self, key: str) -> Optional[ViewState]:
+        """
+        状態を読み込む
+        :param key: Viewを表すキー(メッセージID)
+        :return: 保存されている状態 ない場合はNone
+        """
+
+    async def load_async(self, key: str) -> Optional[ViewState]:
+        """
+        イベントループを止めずに状態を読み込む 既定ではloadを呼び出す
+        :param key: Viewを表すキー(メッセージID)
+        :return: 保存されている状態 ない場合はNone
+        """
+        return self.load(key)
+
+    @abstractmethod
+    def save(self, key: str, state: ViewState):
+        """
+        状態を保存する
+        :param key: Viewを表すキー(メッセージID)
+        :param state: 保存する状態
+        """
+
+    @abstractmethod
+    def delete(self, key: str):
+        """
+        状態を削除する
+        :param key: Viewを表すキー(メッセージID)
+        """
+
+    def flush(self):
+        """
+        書き込み待ちの状態を保存先に反映する
+        """
+        pass
+
+
+class MemoryStateStore(StateStore):
+
+    def __init__(self,
+                 max_size: int = 10000,
+                 ttl: float = None,
+                 ):
+        """
+        メモリ上に状態を保存するストア 最大数と有効期限を超えたものから破棄する
+        :param max_size: 保存する状態の最大数
+        :param ttl: 状態の有効期限(秒) 指定しない場合は期限なし
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self.states: "OrderedDict[str, Tuple[ViewState, Optional[float]]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self.states)
+
+    def load(self, key: str) -> Optional[ViewState]:
+        entry = self.states.get(key)
+        if entry is None:
+            return None
+        state, expires_at = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self.states[key]
+            return None
+        self.states.move_to_end(key)
+        return state
+
+    def save(self, key: str, state: ViewState):
+        states = self.states
+        if self.ttl:
+            # 読み込まれないまま期限が切れた状態も残らないよう、古いものから期限切れを破棄する
+            now = time.monotonic()
+            while states:
+                _, expires_at = next(iter(states.values()))
+                if expires_at is not None and expires_at > now:
+                    break
+                states.popitem(last=False)
+            expires_at = now + self.ttl
+        else:
+            expires_at = None
+        states[key] = (state, expires_at)
+        states.move_to_end(key)
+        while len(states) > self.max_size:
+            states.popitem(last=False)
+
+    def delete(self, key: str):
+        self.states.pop(key, None)
+
+
+class SQLiteStateStore(StateStore):
+
+    def __init__(self,
+                 path: str = "view_state.sqlite3",
+                 batch_size: int = 100,
+                 flush_interval: float = 1.0,
+                 table: str = "view_state",
+                 executor: Executor = None,
+                 ):
+        """
+        SQLiteに状態を保存するストア Botを再起動しても状態が残る
+        書き込みはbatch_size件またはflush_interval秒ごとにまとめて行う
+        イベントループの実行中はデータベースの読み書きをスレッドプールで行い、イベントループを止めない
+        :param path: データベースファイルのパス
+        :param batch_size: まとめて書き込む件数
+        :param flush_interval: 書き込み待ちの状態を反映するまでの最大秒数
+        :param table: 使用するテーブル名
+        :param executor: 読み書きを実行するExecutor 指定しない場合は共有スレッドプールを使用する
+        """
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.table = table
+        self.executor = executor
+        self.pending: Dict[str, Optional[str]] = {}
+        self._writing: Dict[str, Optional[str]] = {}
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._flush_future: Optional[asyncio.Future] = None
+        self._lock = threading.Lock()
+        self._idle = threading.Event()
+        self._idle.set()
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute(
+            f"CREATE TABLE IF NOT EXISTS {table} (key TEXT PRIMARY KEY, state TEXT NOT NULL)"
+        )
+        self.connection.commit()
+
+    def _buffered(self, key: str) -> Tuple[bool, Optional[str]]:
+        """
+        :protected:
+        データベースに書き込む前の状態を取得する
+        :return: 書き込み前の状態があるかどうかと、その状態
+        """
+        if key in self.pending:
+            return True, self.pending[key]
+        if key in self._writing:
+            return True, self._writing[key]
+        return False, None
+
+    def _read(self, key: str) -> Optional[str]:
+        """
+        :protected:
+        データベースから状態を読み込む
+        """
+        with self._lock:
+            row = self.connection.execute(f"SELECT state FROM {self.table} WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def load(self, key: str) -> Optional[ViewState]:
+        found, data = self._buffered(key)
+        if not found:
+            data = self._read(key)
+        return json.loads(data) if data is not None else None
+
+    async def load_async(self, key: str) -> Optional[ViewState]:
+        found, data = self._buffered(key)
+        if not found:
+            loop = asyncio.get_running_loop()
+            data = await loop.run_in_executor(self.executor or get_thread_pool(), self._read, key)
+            # 読み込み中に保存された状態があればそちらを優先する
+            found, newer = self._buffered(key)
+            if found:
+                data = newer
+        return json.loads(data) if data is not None else None
+
+    def save(self, key: str, state: ViewState):
+        self.pending[key] = json.dumps(state, separators=(",", ":"))
+        self._schedule_flush()
+
+    def delete(self, key: str):
+        self.pending[key] = None
+        self._schedule_flush()
+
+    def _schedule_flush(self):
+        """
+        :protected:
+        書き込み待ちの件数に応じて書き込みを実行または予約する
+        """
+        if len(self.pending) >= self.batch_size:
+            self._flush_in_background()
+            return
+        if self._flush_handle is None:
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                return
+            self._flush_handle = loop.call_later(self.flush_interval, self._flush_in_background)
+
+    def _flush_in_background(self):
+        """
+        :protected:
+        書き込み待ちの状態をスレッドプールで反映する 書き込み中の場合は終わってから次を書き込む
+        """
+        if self._flush_handle:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self.flush()
+            return
+        if self._flush_future is not None or not self.pending:
+            return
+
+        self._writing, self.pending = self.pending, {}
+        self._idle.clear()
+        self._flush_future = loop.run_in_executor(self.executor or get_thread_pool(), self._write, self._writing)
+        self._flush_future.add_done_callback(self._on_flushed)
+
+    def _on_flushed(self, future: asyncio.Future):
+        """
+        :protected:
+        書き込みが終わったときに呼ばれる 失敗した状態は書き込み待ちに戻す
+        """
+        self._flush_future = None
+        writing, self._writing = self._writing, {}
+        if future.cancelled() or future.exception() is not None:
+            for key, data in writing.items():
+                self.pending.setdefault(key, data)
+            if not future.cancelled():
+                _log.error("状態の書き込みに失敗しました", exc_info=future.exception())
+        if self.pending:
+            self._schedule_flush()
+
+    def _write(self, pending: Dict[str, Optional[str]]):
+        """
+        :protected:
+        状態をデータベースに書き込む
+        """
+        try:
+            with self._lock, self.connection:
+                self.connection.executemany(
+                    f"INSERT OR REPLACE INTO {self.table} (key, state) VALUES (?, ?)",
+                    [(key, data) for key, data in pending.items() if data is not None],
+                )
+                self.connection.executemany(
+                    f"DELETE FROM {self.table} WHERE key = ?",
+                    [(key,) for key, data in pending.items() if data is None],
+                )
+        finally:
+            self._idle.set()
+
+    def flush(self):
+        """
+        書き込み待ちの状態をすぐにデータベースに反映する
+        スレッドプールで書き込み中の場合は、古い状態で上書きしないよう終わるまで待機する
+        """
+        if self._flush_handle:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        self._idle.wait()
+        if not self.pending:
+            return
+
+        pending, self.pending = self.pending, {}
+        self._idle.clear()
+        self._write(pending)
+
+    def close(self):
+        """
+        書き込み待ちの状態を反映してデータベースを閉じる
+        """
+        self.flush()
+        self.connection.close()
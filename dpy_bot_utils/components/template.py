@@ -0,0 +1,264 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Tuple
+
+import discord
+from discord.interactions import Interaction
+from discord.ui.item import Item
+from discord.ui.select import Select as BaseSelect
+from discord.ui.view import View
+
+from .view import ViewGenerator
+
+_slot_descriptors: Dict[type, Tuple[Any, ...]] = {}
+
+# メッセージごとに異なる値はテンプレートから複製しない
+# 先頭が_の属性はdiscord.pyやViewGeneratorがViewごとに管理するため、同様に複製しない
+_PER_VIEW_ATTRIBUTES = frozenset({
+    "id", "author", "message", "interaction", "used", "custom_id_prefix", "auto_custom_id", "skipped_edits", "state_key",
+})
+
+
+def _shallow_copy(obj: Any) -> Any:
+    """
+    copy.copyと同じ浅いコピーを行う
+    クラスごとの__slots__をキャッシュし、__reduce_ex__を経由しない分だけ高速に複製する
+    :param obj: 複製するオブジェクト
+    """
+    cls = type(obj)
+    descriptors = _slot_descriptors.get(cls)
+    if descriptors is None:
+        descriptors = []
+        for klass in cls.__mro__:
+            slots = klass.__dict__.get("__slots__", ())
+            for name in (slots,) if isinstance(slots, str) else slots:
+                descriptor = klass.__dict__.get(name if not name.startswith("__") or name.endswith("__")
+                                                else f"_{klass.__name__.lstrip('_')}{name}")
+                if descriptor is not None and hasattr(descriptor, "__set__") and descriptor not in descriptors:
+                    descriptors.append(descriptor)
+        descriptors = _slot_descriptors[cls] = tuple(descriptors)
+
+    new = cls.__new__(cls)
+    state = getattr(obj, "__dict__", None)
+    if state:
+        new.__dict__.update(state)
+    for descriptor in descriptors:
+        try:
+            descriptor.__set__(new, descriptor.__get__(obj, cls))
+        except AttributeError:
+            pass
+    return new
+
+
+class SendResult:
+    __slots__ = ("destination", "index", "message", "view", "error", "completed", "total")
+
+    def __init__(self,
+                 destination: discord.abc.Messageable,
+                 index: int,
+                 message: Optional[discord.Message],
+                 view: Optional[ViewGenerator],
+                 error: Optional[Exception],
+                 completed: int,
+                 total: int,
+                 ):
+        """
+        ViewTemplate.send_manyの送信先ごとの結果
+        :param destination: 送信先
+        :param index: 送信先の順番
+        :param message: 送信したメッセージ 失敗した場合はNone
+        :param view: メッセージに紐付けたView 失敗した場合はNone
+        :param error: 送信に失敗したときの例外
+        :param completed: この結果までに完了した送信数
+        :param total: 送信先の総数
+        """
+        self.destination = destination
+        self.index = index
+        self.message = message
+        self.view = view
+        self.error = error
+        self.completed = completed
+        self.total = total
+
+    @property
+    def ok(self) -> bool:
+        """
+        送信に成功したかどうか
+        """
+        return self.error is None
+
+
+class ViewTemplate:
+
+    def __init__(self,
+                 view: ViewGenerator,
+                 payload_cache_size: int = 128,
+                 ):
+        """
+        ViewGeneratorのレイアウトを1度だけ構築し、メッセージごとのViewを安価に複製するテンプレート
+        :param view: テンプレートにするViewGenerator
+        :param payload_cache_size: Prefixごとに保持する送信用データの最大数
+        """
+        self.view = view
+        self.payload_cache_size = payload_cache_size
+        self.base_custom_ids: List[Optional[str]] = [
+            None if getattr(i, "url", None) else self._strip_prefix(getattr(i, "custom_id", None))
+            for i in view.children
+        ]
+        self.payload_cache: "OrderedDict[Optional[str], List[Dict[str, Any]]]" = OrderedDict()
+        self.payload_cache[view.custom_id_prefix] = View.to_components(view)
+
+    def _strip_prefix(self, custom_id: Optional[str]) -> Optional[str]:
+        """
+        :protected:
+        テンプレートのPrefixを取り除いたcustom_idを取得する
+        :param custom_id: custom_id
+        """
+        prefix = self.view.custom_id_prefix
+        if custom_id and prefix and custom_id.startswith(f"{prefix}-"):
+            return custom_id[len(prefix) + 1:]
+        return custom_id
+
+    @staticmethod
+    def _clone_item(item: Item) -> Item:
+        """
+        :protected:
+        コンポーネントを複製する。関数やオプションなどの変更されない値は共有する
+        :param item: 複製するコンポーネント
+        """
+        new = _shallow_copy(item)
+        new._underlying = _shallow_copy(item._underlying)
+        if isinstance(item, BaseSelect):
+            new._underlying.options = list(item._underlying.options)
+            new._values = []
+            event_handlers = getattr(item, "event_handlers", None)
+            if event_handlers is not None:
+                new.event_handlers = dict(event_handlers)
+        return new
+
+    @staticmethod
+    def _copy_settings(base: ViewGenerator, view: ViewGenerator):
+        """
+        :protected:
+        テンプレートのViewの設定を生成したViewに複製する
+        既定値と異なる設定だけがインスタンスに設定されているため、インスタンスの属性をそのまま複製する
+        :param base: テンプレートのView
+        :param view: 設定を複製するView
+        """
+        settings = view.__dict__
+        for name, value in base.__dict__.items():
+            if not name.startswith("_") and name not in _PER_VIEW_ATTRIBUTES:
+                settings[name] = value
+        view.timeout = base.timeout
+        if base.serialize_callbacks:
+            view.set_serialize_callbacks(True)
+
+    def to_components(self, prefix: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        キャッシュ済みの送信用データを取得する
+        :param prefix: custom_idのPrefix 指定しない場合はテンプレートのPrefixを使用する
+        """
+        prefix = prefix if prefix is not None else self.view.custom_id_prefix
+        if prefix not in self.payload_cache:
+            self.create(prefix=prefix)
+        self.payload_cache.move_to_end(prefix)
+        return self.payload_cache[prefix]
+
+    def create(self,
+               author: discord.User = None,
+               message: discord.Message = None,
+               prefix: Optional[str] = None,
+               interaction: Interaction = None,
+               ) -> ViewGenerator:
+        """
+        テンプレートからViewGeneratorを生成する
+        :param author: インタラクションを操作できるユーザー
+        :param message: Viewを表示するメッセージ
+        :param prefix: custom_idのPrefix 指定しない場合はテンプレートのPrefixを使用する
+        :param interaction: インタラクション
+        """
+        base = self.view
+        prefix = prefix if prefix is not None else base.custom_id_prefix
+        view = ViewGenerator(author=author if author is not None else base.author, prefix=prefix)
+        self._copy_settings(base, view)
+
+        for item, custom_id in zip(base.children, self.base_custom_ids):
+            new = self._clone_item(item)
+            if custom_id is not None:
+                new.custom_id = f"{prefix}-{custom_id}" if prefix else custom_id
+            new.set_parent_view(view)
+            view.add_item(new)
+
+        payload = self.payload_cache.get(prefix)
+        if payload is None:
+            payload = self.payload_cache[prefix] = View.to_components(view)
+            while len(self.payload_cache) > max(self.payload_cache_size, 1):
+                self.payload_cache.popitem(last=False)
+        view.set_cached_components(payload)
+        if interaction is not None:
+            view.set_interaction(interaction)
+        if message is not None:
+            view.set_message(message)
+        return view
+
+    async def send_many(self,
+                        destinations: Iterable[discord.abc.Messageable],
+                        content: str = None,
+                        concurrency: int = 8,
+                        max_per_second: float = None,
+                        prefix: Optional[str] = None,
+                        **kwargs,
+                        ) -> AsyncIterator[SendResult]:
+        """
+        同じレイアウトのViewを複数の送信先へ並行して送信する
+        送信用データは1度だけ生成し、メッセージごとに軽量なViewを紐付ける
+        結果は完了した順に返すため、進捗や失敗をその場で処理できる
+        使用例: async for result in template.send_many(channels, "お知らせ"): ...
+        :param destinations: 送信先
+        :param content: メッセージの内容
+        :param concurrency: 同時に送信する最大数
+        :param max_per_second: 1秒あたりに開始する送信の最大数 指定しない場合は制限しない
+        :param prefix: custom_idのPrefix 指定しない場合はテンプレートのPrefixを使用する
+        :param kwargs: send()に渡すその他の引数
+        """
+        destinations = list(destinations)
+        total = len(destinations)
+        if not total:
+            return
+
+        semaphore = asyncio.Semaphore(max(concurrency, 1))
+        interval = 1 / max_per_second if max_per_second else 0
+        next_start = [time.monotonic()]
+        results: "asyncio.Queue[SendResult]" = asyncio.Queue()
+        self.to_components(prefix)
+
+        async def send(index: int, destination: discord.abc.Messageable):
+            async with semaphore:
+                if interval:
+                    now = time.monotonic()
+                    start = max(next_start[0], now)
+                    next_start[0] = start + interval
+                    if start > now:
+                        await asyncio.sleep(start - now)
+                view = None
+                try:
+                    # 例外が起きても必ず結果を返し、受け取り側が待ち続けないようにする
+                    view = self.create(prefix=prefix)
+                    message = await destination.send(content, view=view, **kwargs)
+                    view.set_message(message)
+                except Exception as e:
+                    if view is not None:
+                        view.stop()
+                    results.put_nowait((index, destination, None, None, e))
+                    return
+                results.put_nowait((index, destination, message, view, None))
+
+        tasks = [asyncio.ensure_future(send(index, destination)) for index, destination in enumerate(destinations)]
+        try:
+            for completed in range(1, total + 1):
+                index, destination, message, view, error = await results.get()
+                yield SendResult(destination, index, message, view, error, completed, total)
+        finally:
+            for task in tasks:
+                task.cancel()
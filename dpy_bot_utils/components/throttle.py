@@ -0,0 +1,135 @@
+import time
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, Hashable, Optional
+
+import discord
+
+from .limiter import DropPolicyType
+from .metrics import InteractionMetrics
+
+if TYPE_CHECKING:
+    from discord.interactions import Interaction
+
+
+class _BucketTable:
+
+    def __init__(self, rate: float, burst: int, max_keys: int):
+        """
+        キーごとのトークンバケット トークンが満タンになる時刻だけを保持し、max_keysを超えた場合は最も古いキーを破棄する
+        破棄されるのは長く使われていないキーのため、ほとんどの場合は満タンのバケットを破棄するのと同じになる
+        :param rate: 1秒あたりに補充するトークン数
+        :param burst: バケットの容量
+        :param max_keys: 保持するキーの最大数
+        """
+        self.interval = 1.0 / rate
+        self.tolerance = self.interval * (burst - 1)
+        self.max_keys = max_keys
+        self.buckets: "OrderedDict[Hashable, float]" = OrderedDict()
+
+    def check(self, key: Hashable, now: float) -> float:
+        """
+        トークンを消費した後の時刻を返す 消費できない場合は次に消費できるまでの秒数を負の値で返す
+        """
+        full_at = self.buckets.get(key, now)
+        if full_at < now:
+            full_at = now
+        wait = full_at - self.tolerance - now
+        if wait > 0:
+            return -wait
+        return full_at + self.interval
+
+    def commit(self, key: Hashable, full_at: float):
+        buckets = self.buckets
+        buckets[key] = full_at
+        buckets.move_to_end(key)
+        if len(buckets) > self.max_keys:
+            buckets.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self.buckets)
+
+
+class ClickThrottle:
+
+    def __init__(self,
+                 per_user: float = None,
+                 per_view: float = None,
+                 burst: int = 3,
+                 max_keys: int = 100000,
+                 deny_policy: "DropPolicyType" = DropPolicyType.IGNORE,
+                 deny_message: str = "操作が速すぎます。{retry_after:.1f}秒後にもう一度お試しください。",
+                 metrics: InteractionMetrics = None,
+                 ):
+        """
+        トークンバケットでクリックの頻度を制限する 複数のViewで共有できる
+        制限を超えたインタラクションはinteraction_checkで拒否し、コールバックとメッセージの編集を実行しない
+        ConcurrencyLimiterより先に判定するため、拒否したインタラクションは待機数に含まれない
+        :param per_user: ユーザーごとに1秒あたり受け付けるクリック数 指定しない場合は制限しない
+        :param per_view: Viewごとに1秒あたり受け付けるクリック数 指定しない場合は制限しない
+        :param burst: 連続して受け付けるクリック数
+        :param max_keys: ユーザー・Viewごとに保持するバケットの最大数 超えた場合は最も古いものから破棄する
+        :param deny_policy: 拒否したインタラクションへの応答方法
+        :param deny_message: DropPolicyType.NOTICEのときに本人にのみ表示するメッセージ {retry_after}で待ち時間(秒)を表示できる
+        :param metrics: 拒否した回数を記録するInteractionMetrics
+        """
+        self.per_user = per_user
+        self.per_view = per_view
+        self.burst = burst
+        self.deny_policy = deny_policy
+        self.deny_message = deny_message
+        self.metrics = metrics
+        self._users = _BucketTable(per_user, burst, max_keys) if per_user else None
+        self._views = _BucketTable(per_view, burst, max_keys) if per_view else None
+        self.throttled = 0
+
+    def consume(self, view: Any, interaction: "Interaction") -> Optional[float]:
+        """
+        インタラクションのトークンを消費する ユーザーとViewの両方で消費できる場合のみ消費する
+        :param view: インタラクションを受け取ったView
+        :param interaction: 処理するインタラクション
+        :return: 拒否する場合は次に受け付けるまでの秒数 受け付ける場合はNone
+        """
+        now = time.monotonic()
+        users = self._users
+        views = self._views
+        if users is not None:
+            user_id = interaction.user.id
+            user_at = users.check(user_id, now)
+            if user_at < 0:
+                return -user_at
+        if views is not None:
+            view_at = views.check(view.id, now)
+            if view_at < 0:
+                return -view_at
+            views.commit(view.id, view_at)
+        if users is not None:
+            users.commit(user_id, user_at)
+        return None
+
+    async def deny(self, view: Any, interaction: "Interaction", retry_after: float):
+        """
+        制限を超えたインタラクションをdeny_policyに従って拒否する
+        :param view: インタラクションを受け取ったView
+        :param interaction: 拒否するインタラクション
+        :param retry_after: 次に受け付けるまでの秒数
+        """
+        self.throttled += 1
+        if self.metrics is not None:
+            self.metrics.increment(InteractionMetrics.THROTTLED_INTERACTIONS, getattr(view, "custom_id_prefix", None))
+        try:
+            if self.deny_policy == DropPolicyType.DEFER:
+                await interaction.response.defer()
+            elif self.deny_policy == DropPolicyType.NOTICE:
+                await interaction.response.send_message(self.deny_message.format(retry_after=retry_after), ephemeral=True)
+        except (discord.InteractionResponded, discord.HTTPException):
+            pass
+
+    def reset(self):
+        """
+        全てのバケットを破棄する
+        """
+        if self._users is not None:
+            self._users.buckets.clear()
+        if self._views is not None:
+            self._views.buckets.clear()
+        return self
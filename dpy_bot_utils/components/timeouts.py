@@ -0,0 +1,129 @@
+import asyncio
+import logging
+import math
+import time
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+_log = logging.getLogger(__name__)
+
+
+class TimeoutWheel:
+
+    def __init__(self,
+                 tick: float = 1.0,
+                 slots: int = 512,
+                 ):
+        """
+        多数のViewのタイムアウトを1つのタスクでまとめて管理するタイミングホイール
+        登録・延長・解除はViewの数に関わらずO(1)で行う
+        :param tick: タイムアウトを判定する間隔(秒) タイムアウトの精度になる
+        :param slots: ホイールの枠の数
+        """
+        self.tick = tick
+        self.slots: List[Dict[str, Tuple[Any, int, float]]] = [{} for _ in range(slots)]
+        self.locations: Dict[str, int] = {}
+        self.cursor = 0
+        self._origin = time.monotonic()
+        self._task: Optional[asyncio.Task] = None
+        self._expiring: Set[asyncio.Task] = set()
+
+    def __len__(self) -> int:
+        return len(self.locations)
+
+    def _current_tick(self) -> int:
+        """
+        :protected:
+        現在のtick数を取得する
+        """
+        return int((time.monotonic() - self._origin) / self.tick)
+
+    def arm(self, view: Any, timeout: float):
+        """
+        Viewのタイムアウトを登録する。登録済みの場合は登録し直す
+        :param view: タイムアウトさせるView タイムアウト時にexpire()が呼ばれる
+        :param timeout: タイムアウトまでの秒数
+        """
+        self.cancel(view)
+        if self._task is None and not self.locations:
+            self._origin = time.monotonic()
+            self.cursor = 0
+
+        target = self._current_tick() + max(math.ceil(timeout / self.tick), 1)
+        index = target % len(self.slots)
+        self.slots[index][view.id] = (view, target, timeout)
+        self.locations[view.id] = index
+
+        if self._task is None:
+            self._task = asyncio.ensure_future(self._run())
+        return self
+
+    def refresh(self, view: Any):
+        """
+        登録済みのViewのタイムアウトを最初の秒数で延長する
+        :param view: 延長するView
+        """
+        index = self.locations.get(view.id)
+        if index is not None:
+            self.arm(view, self.slots[index][view.id][2])
+        return self
+
+    def cancel(self, view: Any):
+        """
+        Viewのタイムアウトを解除する
+        :param view: 解除するView
+        """
+        index = self.locations.pop(view.id, None)
+        if index is not None:
+            self.slots[index].pop(view.id, None)
+        return self
+
+    def is_armed(self, view: Any) -> bool:
+        """
+        Viewのタイムアウトが登録されているかどうかを取得する
+        :param view: 確認するView
+        """
+        return view.id in self.locations
+
+    def _collect_expired(self) -> List[Any]:
+        """
+        :protected:
+        現在のtickまでにタイムアウトしたViewを取り出す
+        """
+        now = self._current_tick()
+        expired = []
+        for step in range(min(now - self.cursor, len(self.slots))):
+            slot = self.slots[(self.cursor + 1 + step) % len(self.slots)]
+            for view_id in [view_id for view_id, entry in slot.items() if entry[1] <= now]:
+                expired.append(slot.pop(view_id)[0])
+                del self.locations[view_id]
+        self.cursor = max(now, self.cursor)
+        return expired
+
+    async def _run(self):
+        """
+        :protected:
+        登録されたViewがなくなるまでtickごとにタイムアウトを判定する
+        """
+        try:
+            while self.locations:
+                next_tick = self._origin + (self.cursor + 1) * self.tick
+                await asyncio.sleep(max(next_tick - time.monotonic(), 0))
+                expired = self._collect_expired()
+                if expired:
+                    task = asyncio.ensure_future(self._expire(expired))
+                    self._expiring.add(task)
+                    task.add_done_callback(self._expiring.discard)
+        finally:
+            self._task = None
+
+    @staticmethod
+    async def _expire(views: List[Any]):
+        """
+        :protected:
+        タイムアウトしたViewをまとめて処理する 失敗したViewがあっても他のViewの処理は続ける
+        :param views: タイムアウトしたView
+        """
+        results = await asyncio.gather(*(view.expire() for view in views), return_exceptions=True)
+        for view, result in zip(views, results):
+            if isinstance(result, Exception):
+                _log.error("Viewのタイムアウト処理に失敗しました: %s", view.id, exc_info=result)
@@ -1,10 +1,16 @@
 import asyncio
-from typing import List, Optional
+from concurrent.futures import Executor
+from typing import Dict, List, Optional
 
 import discord
 from discord import Interaction, TextStyle
 from discord.ui import Modal as BaseModal, TextInput as BaseTextInput, View
 
+from .executor import call_sync_handler
+from .metrics import InteractionMetrics
+from .watchdog import DeferWatchdog
+from .validation import Validator, RegexValidator, RangeValidator, LengthValidator, ChoiceValidator
+
 
 class Modal(BaseModal):
 
@@ -12,7 +18,12 @@ class Modal(BaseModal):
                  title: str = None,
                  func: callable = None,
                  author: discord.User = None,
-                 message: discord.Message = None):
+                 message: discord.Message = None,
+                 run_sync_in_executor: bool = None,
+                 executor: Executor = None,
+                 metrics: InteractionMetrics = None,
+                 on_validation_error: callable = None,
+                 defer_watchdog: DeferWatchdog = None):
         """
         モーダルウィンドウを生成する
         Args:
@@ -20,6 +31,11 @@ class Modal(BaseModal):
             func: モーダルウィンドウが閉じられたときに呼ばれる関数
             author: モーダルウィンドウの作成者
             message: モーダルウィンドウを開いたメッセージ
+            run_sync_in_executor: 同期関数をスレッドプールで実行するかどうか 指定しない場合は親のViewの設定を使用する
+            executor: 同期関数を実行するExecutor 指定しない場合は共有スレッドプールを使用する
+            metrics: 処理時間を記録するInteractionMetrics 指定しない場合は親のViewの設定を使用する
+            on_validation_error: 入力値の検証に失敗したときに呼ばれる関数 指定しない場合はエラーを本人にのみ表示する
+            defer_watchdog: 応答が遅い場合に自動でdeferするDeferWatchdog 指定しない場合は親のViewの設定を使用する
         """
         super().__init__(title=title)
         self.title = title
@@ -28,6 +44,35 @@ class Modal(BaseModal):
         self.used = False
         self.message = message
         self.parent_view = None
+        self.run_sync_in_executor = run_sync_in_executor
+        self.executor = executor
+        self.metrics = metrics
+        self.on_validation_error = on_validation_error
+        self.defer_watchdog = defer_watchdog
+
+    @property
+    def func(self) -> callable:
+        """
+        モーダルウィンドウが閉じられたときに呼ばれる関数
+        """
+        return self._func
+
+    @func.setter
+    def func(self, func: callable):
+        self._func = func
+        self._func_is_coroutine = asyncio.iscoroutinefunction(func)
+
+    @property
+    def on_validation_error(self) -> callable:
+        """
+        入力値の検証に失敗したときに呼ばれる関数
+        """
+        return self._on_validation_error
+
+    @on_validation_error.setter
+    def on_validation_error(self, func: callable):
+        self._on_validation_error = func
+        self._on_validation_error_is_coroutine = asyncio.iscoroutinefunction(func)
 
     def _add_components(self, components: List[BaseTextInput]):
         """
@@ -93,6 +138,70 @@ class Modal(BaseModal):
         self.message = message
         return self
 
+    def set_metrics(self, metrics: InteractionMetrics):
+        """
+        処理時間を記録するInteractionMetricsを設定する
+        Args:
+            metrics: 使用するInteractionMetrics
+        """
+        self.metrics = metrics
+        return self
+
+    def set_defer_watchdog(self, defer_watchdog: Optional[DeferWatchdog]):
+        """
+        応答が遅い場合に自動でdeferするDeferWatchdogを設定する
+        Args:
+            defer_watchdog: 使用するDeferWatchdog
+        """
+        self.defer_watchdog = defer_watchdog
+        return self
+
+    def set_executor(self, executor: Executor = None, run_sync_in_executor: bool = True):
+        """
+        同期関数を実行するExecutorを設定する
+        Args:
+            executor: 使用するExecutor 指定しない場合は共有スレッドプールを使用する
+            run_sync_in_executor: 同期関数をExecutorで実行するかどうか
+        """
+        self.executor = executor
+        self.run_sync_in_executor = run_sync_in_executor
+        return self
+
+    def set_on_validation_error(self, func: callable):
+        """
+        入力値の検証に失敗したときに呼ばれる関数を設定する
+        関数には(interaction, parent_view, modal, errors)が渡される errorsはcustom_idとエラーメッセージの辞書
+        Args:
+            func: 入力値の検証に失敗したときに呼ばれる関数
+        """
+        self.on_validation_error = func
+        return self
+
+    def validate(self) -> Dict[str, str]:
+        """
+        全てのTextInputの入力値を検証する
+        Returns:
+            custom_idとエラーメッセージの辞書 問題がない場合は空の辞書
+        """
+        errors = {}
+        for item in self._children:
+            validators = getattr(item, "validators", None)
+            if validators:
+                error = item.validate()
+                if error is not None:
+                    errors[item.custom_id] = error
+        return errors
+
+    async def _send_validation_errors(self, interaction: Interaction, errors: Dict[str, str]):
+        """
+        :protected:
+        検証に失敗した入力値をまとめて本人にのみ表示する
+        """
+        # TextInput.labelは非推奨の警告を出すため、送信用のデータからラベルを取得する
+        labels = {item.custom_id: item._underlying.label for item in self._children if hasattr(item, "validators")}
+        lines = "\n".join(f"- {labels.get(custom_id) or custom_id}: {error}" for custom_id, error in errors.items())
+        await interaction.response.send_message(f"入力内容に誤りがあります\n{lines}", ephemeral=True)
+
     def set_used(self, used: bool):
         """
         モーダルウィンドウが使用されたかどうかを設定する
@@ -102,17 +211,53 @@ class Modal(BaseModal):
         self.used = used
         return self
 
+    def _executor_owner(self):
+        """
+        :protected:
+        同期関数を実行するExecutorの設定を持つオブジェクトを取得する
+        run_sync_in_executorを指定していない場合は親のViewの設定を使用する
+        """
+        if self.run_sync_in_executor is None and self.parent_view is not None:
+            return self.parent_view
+        return self
+
     async def on_submit(self, interaction: Interaction):
         """
         モーダルウィンドウが閉じられたときに呼ばれる関数を実行する
         Args:
             interaction: モーダルウィンドウが閉じられたときに呼ばれる関数
         """
-        if self.func:
-            if asyncio.iscoroutinefunction(self.func):
-                await self.func(interaction, self.parent_view, self)
-            else:
-                self.func(interaction, self.parent_view, self)
+        metrics = self.metrics or getattr(self.parent_view, "metrics", None)
+        if metrics is not None:
+            prefix = getattr(self.parent_view, "custom_id_prefix", None)
+            started = metrics.start_callback(prefix, interaction)
+        watchdog = self.defer_watchdog or getattr(self.parent_view, "defer_watchdog", None)
+        if watchdog is not None:
+            timer = watchdog.arm(interaction, self._func, getattr(self.parent_view, "custom_id_prefix", None))
+        try:
+            errors = self.validate()
+            if errors:
+                handler = self._on_validation_error
+                if handler:
+                    if self._on_validation_error_is_coroutine:
+                        await handler(interaction, self.parent_view, self, errors)
+                    else:
+                        await call_sync_handler(self._executor_owner(), handler, interaction, self.parent_view, self, errors)
+                else:
+                    await self._send_validation_errors(interaction, errors)
+                return
+
+            func = self._func
+            if func:
+                if self._func_is_coroutine:
+                    await func(interaction, self.parent_view, self)
+                else:
+                    await call_sync_handler(self._executor_owner(), func, interaction, self.parent_view, self)
+        finally:
+            if watchdog is not None:
+                watchdog.disarm(timer)
+            if metrics is not None:
+                metrics.finish(InteractionMetrics.CALLBACK_DURATION, prefix, started)
 
     def set_parent_view(self, parent_view: View):
         """
@@ -145,7 +290,8 @@ class TextInput(BaseTextInput):
                  max_length: Optional[int] = None,
                  required: Optional[bool] = True,
                  pre_fill_value: Optional[str] = None,
-                 parent_view: Optional[View] = None
+                 parent_view: Optional[View] = None,
+                 validators: Optional[List[Validator]] = None
                  ):
         """
         入力値を受け取るTextInputを作成する
@@ -159,6 +305,7 @@ class TextInput(BaseTextInput):
             max_length: 最大文字数
             required: 入力値が必須かどうか
             pre_fill_value: 事前に入力する値
+            validators: 入力値を検証するValidator
         """
         super().__init__(label=label)
         self.parent_view = parent_view
@@ -172,6 +319,63 @@ class TextInput(BaseTextInput):
         self.required = required
         self._value = pre_fill_value
         self.set_parent_view = None
+        self.validators: List[Validator] = list(validators) if validators else []
+
+    def add_validator(self, validator: Validator):
+        """
+        入力値を検証するValidatorを追加する
+        Args:
+            validator: 追加するValidator
+        """
+        self.validators.append(validator)
+        return self
+
+    def set_pattern(self, pattern: str, message: str = None, flags: int = 0):
+        """
+        入力値全体が一致する必要がある正規表現を設定する
+        Args:
+            pattern: 正規表現
+            message: 一致しなかったときのエラーメッセージ
+            flags: 正規表現のフラグ
+        """
+        return self.add_validator(RegexValidator(pattern, message=message, flags=flags))
+
+    def set_range(self, min_value: float = None, max_value: float = None, integer: bool = False, message: str = None):
+        """
+        入力値を範囲内の数値に制限する
+        Args:
+            min_value: 最小値
+            max_value: 最大値
+            integer: 整数のみを許可するかどうか
+            message: 範囲外のときのエラーメッセージ
+        """
+        return self.add_validator(RangeValidator(min_value, max_value, integer=integer, message=message))
+
+    def set_choices(self, choices: List[str], case_sensitive: bool = True, message: str = None):
+        """
+        入力値を選択肢のいずれかに制限する
+        Args:
+            choices: 選択肢
+            case_sensitive: 大文字と小文字を区別するかどうか
+            message: 一致しなかったときのエラーメッセージ
+        """
+        return self.add_validator(ChoiceValidator(choices, case_sensitive=case_sensitive, message=message))
+
+    def validate(self) -> Optional[str]:
+        """
+        入力値を検証する 最初に失敗したValidatorのエラーメッセージを返す
+        任意入力で未入力の場合は検証しない
+        Returns:
+            エラーメッセージ 問題がない場合はNone
+        """
+        value = self.value
+        if not value and not self.required:
+            return None
+        for validator in self.validators:
+            error = validator(value)
+            if error is not None:
+                return error
+        return None
 
     def set_title(self, title: str):
         """
@@ -0,0 +1,135 @@
+import re
+from abc import ABC, abstractmethod
+from typing import Iterable, Optional, Pattern, Union
+
+
+class Validator(ABC):
+    """
+    TextInputの入力値を検証するクラスの基底クラス
+    """
+    __slots__ = ("message",)
+
+    def __init__(self, message: str = None):
+        self.message = message
+
+    @abstractmethod
+    def __call__(self, value: str) -> Optional[str]:
+        """
+        入力値を検証する
+        :param value: 入力値
+        :return: エラーメッセージ 問題がない場合はNone
+        """
+
+
+class RegexValidator(Validator):
+    __slots__ = ("pattern",)
+
+    def __init__(self,
+                 pattern: Union[str, Pattern],
+                 message: str = None,
+                 flags: int = 0,
+                 ):
+        """
+        入力値全体が正規表現に一致するかを検証する
+        :param pattern: 正規表現 文字列の場合は作成時にコンパイルする
+        :param message: 一致しなかったときのエラーメッセージ
+        :param flags: 正規表現のフラグ
+        """
+        super().__init__(message or "形式が正しくありません")
+        self.pattern = re.compile(pattern, flags) if isinstance(pattern, str) else pattern
+
+    def __call__(self, value: str) -> Optional[str]:
+        if self.pattern.fullmatch(value) is None:
+            return self.message
+        return None
+
+
+class RangeValidator(Validator):
+    __slots__ = ("min_value", "max_value", "integer")
+
+    def __init__(self,
+                 min_value: float = None,
+                 max_value: float = None,
+                 integer: bool = False,
+                 message: str = None,
+                 ):
+        """
+        入力値が範囲内の数値かを検証する
+        :param min_value: 最小値 指定しない場合は下限なし
+        :param max_value: 最大値 指定しない場合は上限なし
+        :param integer: 整数のみを許可するかどうか
+        :param message: 範囲外のときのエラーメッセージ
+        """
+        super().__init__(message)
+        self.min_value = min_value
+        self.max_value = max_value
+        self.integer = integer
+
+    def __call__(self, value: str) -> Optional[str]:
+        try:
+            number = int(value) if self.integer else float(value)
+        except ValueError:
+            return "整数を入力してください" if self.integer else "数値を入力してください"
+        if number != number:
+            return "数値を入力してください"
+        if (self.min_value is not None and number < self.min_value) or \
+                (self.max_value is not None and number > self.max_value):
+            if self.message:
+                return self.message
+            if self.max_value is None:
+                return f"{self.min_value}以上の値を入力してください"
+            if self.min_value is None:
+                return f"{self.max_value}以下の値を入力してください"
+            return f"{self.min_value}から{self.max_value}の範囲で入力してください"
+        return None
+
+
+class LengthValidator(Validator):
+    __slots__ = ("min_length", "max_length")
+
+    def __init__(self,
+                 min_length: int = None,
+                 max_length: int = None,
+                 message: str = None,
+                 ):
+        """
+        入力値の文字数を検証する
+        :param min_length: 最小文字数
+        :param max_length: 最大文字数
+        :param message: 文字数が範囲外のときのエラーメッセージ
+        """
+        super().__init__(message)
+        self.min_length = min_length
+        self.max_length = max_length
+
+    def __call__(self, value: str) -> Optional[str]:
+        length = len(value)
+        if self.min_length is not None and length < self.min_length:
+            return self.message or f"{self.min_length}文字以上で入力してください"
+        if self.max_length is not None and length > self.max_length:
+            return self.message or f"{self.max_length}文字以下で入力してください"
+        return None
+
+
+class ChoiceValidator(Validator):
+    __slots__ = ("choices", "case_sensitive")
+
+    def __init__(self,
+                 choices: Iterable[str],
+                 case_sensitive: bool = True,
+                 message: str = None,
+                 ):
+        """
+        入力値が選択肢のいずれかと一致するかを検証する
+        :param choices: 選択肢
+        :param case_sensitive: 大文字と小文字を区別するかどうか
+        :param message: 一致しなかったときのエラーメッセージ
+        """
+        super().__init__(message or "選択肢のいずれかを入力してください")
+        self.case_sensitive = case_sensitive
+        self.choices = frozenset(choices if case_sensitive else (i.casefold() for i in choices))
+
+    def __call__(self, value: str) -> Optional[str]:
+        if (value if self.case_sensitive else value.casefold()) not in self.choices:
+            return self.message
+        return None
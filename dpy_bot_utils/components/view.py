@@ -1,6 +1,8 @@
 import asyncio
-from enum import auto
-from typing import List, Callable, Any, Union, overload
+import logging
+import time
+from concurrent.futures import Executor
+from typing import List, Callable, Any, Union, Optional, Set, overload
 
 import discord
 from discord.ext import commands
@@ -9,10 +11,51 @@ from discord.ui.button import Button as BaseButton
 from discord.ui.select import Select as BaseSelect, SelectOption as BaseSelectOption
 from discord.ui.view import View
 from discord import ButtonStyle as BaseButtonStyle
+from .access import AccessRule
+from .executor import call_sync_handler
+from .flags import SelectTriggerType, ViewUsedBehaviorType, RespondTargetType
+from .metrics import InteractionMetrics
+from .scheduler import EditScheduler, EditPriority
+from .state import StateStore, ViewState
+from .timeouts import TimeoutWheel
+from .watchdog import DeferWatchdog
+from .limiter import ConcurrencyLimiter
+from .throttle import ClickThrottle
 from .ui_components import Modal
 
+_log = logging.getLogger(__name__)
+
+# 予約した編集を実行するタスク 実行中にガベージコレクションされないよう参照を保持する
+_flush_tasks: Set[asyncio.Task] = set()
+
 
 class ViewGenerator(View):
+    # 任意の機能の設定はクラスの既定値を共有し、既定値と異なる場合のみインスタンスに設定する
+    # インスタンスの属性が30個を超えるとCPythonのキー共有辞書が使われなくなり、Viewごとのメモリが大きく増える
+    coalesce_edits: bool = False
+    coalesce_window: float = 0.0
+    edit_scheduler: Optional[EditScheduler] = None
+    run_sync_in_executor: bool = False
+    executor: Optional[Executor] = None
+    metrics: Optional[InteractionMetrics] = None
+    timeout_wheel: Optional[TimeoutWheel] = None
+    wheel_timeout: Optional[float] = None
+    state_store: Optional[StateStore] = None
+    state_key: Optional[str] = None
+    access_rule: Optional[AccessRule] = None
+    defer_watchdog: Optional[DeferWatchdog] = None
+    concurrency_limiter: Optional[ConcurrencyLimiter] = None
+    click_throttle: Optional[ClickThrottle] = None
+    skipped_edits: int = 0
+    _pending_edit: Optional[asyncio.Future] = None
+    _pending_edit_view: Optional[View] = None
+    _pending_edit_handle: Optional[asyncio.TimerHandle] = None
+    _pending_edit_priority: "EditPriority" = EditPriority.CLEANUP
+    _cached_components: Optional[List[dict]] = None
+    _synced_fingerprint: Optional[int] = None
+    _fingerprint_payload: Optional[List[dict]] = None
+    _fingerprint_value: Optional[int] = None
+    _callback_lock: Optional[asyncio.Lock] = None
 
     def __init__(self,
                  components: List[Union["Button", "Select"]] = None,
@@ -26,6 +69,19 @@ class ViewGenerator(View):
                  interaction: Interaction = None,
                  bot: commands.Bot = None,
                  prefix: str = None,
+                 coalesce_edits: bool = False,
+                 coalesce_window: float = 0.0,
+                 edit_scheduler: EditScheduler = None,
+                 run_sync_in_executor: bool = False,
+                 executor: Executor = None,
+                 metrics: InteractionMetrics = None,
+                 timeout_wheel: TimeoutWheel = None,
+                 state_store: StateStore = None,
+                 serialize_callbacks: bool = False,
+                 access_rule: AccessRule = None,
+                 defer_watchdog: DeferWatchdog = None,
+                 concurrency_limiter: ConcurrencyLimiter = None,
+                 click_throttle: ClickThrottle = None,
                  ):
         """
         :param components: Viewに追加するコンポーネント
@@ -36,6 +92,19 @@ class ViewGenerator(View):
         :param used_flag: Viewが使用済みかどうかを判断するフラグ
         :param respond_flag: インタラクションを受け付けるかどうかを判断するフラグ
         :param only_one_respond: 1度だけインタラクションを受け付けるかどうかを判断するフラグ
+        :param coalesce_edits: 短時間に発生したメッセージの編集を1回にまとめるかどうか
+        :param coalesce_window: 編集をまとめる待ち時間(秒) 0の場合は同じループ内の編集のみまとめる
+        :param edit_scheduler: メッセージの編集をレート制限に合わせて実行するスケジューラー
+        :param run_sync_in_executor: 同期関数のコールバックをスレッドプールで実行するかどうか
+        :param executor: 同期関数のコールバックを実行するExecutor 指定しない場合は共有スレッドプールを使用する
+        :param metrics: インタラクションの処理時間を記録するInteractionMetrics
+        :param timeout_wheel: タイムアウトを共有のタイミングホイールで管理する場合に指定する
+        :param state_store: Viewの状態を保存するStateStore
+        :param serialize_callbacks: コールバックを1つずつ順番に実行するかどうか
+        :param access_rule: インタラクションを受け付けるユーザーを判断するルール
+        :param defer_watchdog: 応答が遅いコールバックのインタラクションを自動でdeferするDeferWatchdog
+        :param concurrency_limiter: コールバックの同時実行数を制限するConcurrencyLimiter
+        :param click_throttle: クリックの頻度を制限するClickThrottle
         """
         super().__init__()
         self.custom_id_prefix = prefix
@@ -59,6 +128,28 @@ class ViewGenerator(View):
         self.auto_custom_id = 0
         self.interaction = interaction
         self.bot: commands.Bot = bot
+        if coalesce_edits:
+            self.set_edit_coalescing(coalesce_edits, coalesce_window)
+        if edit_scheduler is not None:
+            self.edit_scheduler = edit_scheduler
+        if run_sync_in_executor or executor is not None:
+            self.set_executor(executor, run_sync_in_executor)
+        if metrics is not None:
+            self.metrics = metrics
+        if timeout_wheel is not None:
+            self.set_timeout_wheel(timeout_wheel)
+        if state_store is not None:
+            self.set_state_store(state_store)
+        if serialize_callbacks:
+            self.set_serialize_callbacks(serialize_callbacks)
+        if access_rule is not None:
+            self.set_access_rule(access_rule)
+        if defer_watchdog is not None:
+            self.defer_watchdog = defer_watchdog
+        if concurrency_limiter is not None:
+            self.concurrency_limiter = concurrency_limiter
+        if click_throttle is not None:
+            self.click_throttle = click_throttle
 
     def set_bot(self, bot: commands.Bot):
         """
@@ -66,6 +157,8 @@ class ViewGenerator(View):
         :param bot: Botオブジェクト
         """
         self.bot = bot
+        if bot is not None and self.access_rule is not None:
+            AccessRule.register_listeners(bot)
 
     def set_interaction(self, interaction: Interaction):
         """
@@ -74,15 +167,289 @@ class ViewGenerator(View):
         :param interaction: インタラクション
         """
         self.interaction = interaction
+        self._arm_timeout()
 
     def set_timeout(self, timeout: int):
         """
         Viewを閉じるまでのタイムアウトを設定する
         :param timeout: Viewを閉じるまでのタイムアウト
         """
+        if self.timeout_wheel is not None:
+            self.set_timeout_wheel(self.timeout_wheel, timeout)
+            return self
         self.timeout = timeout
         return self
 
+    def set_timeout_wheel(self, timeout_wheel: Optional[TimeoutWheel], timeout: float = None):
+        """
+        タイムアウトを共有のタイミングホイールで管理する
+        discord.pyのView毎のタイムアウト処理は使用しなくなる
+        タイムアウトはViewを送信したとき(メッセージかインタラクションが設定されたとき)から計測する
+        :param timeout_wheel: 使用するTimeoutWheel Noneの場合はdiscord.pyのタイムアウト処理に戻す
+        :param timeout: Viewを閉じるまでのタイムアウト 指定しない場合は設定済みのタイムアウトを使用する
+        """
+        if timeout is None:
+            timeout = self.wheel_timeout if self.timeout_wheel is not None else self.timeout
+        if self.timeout_wheel is not None:
+            self.timeout_wheel.cancel(self)
+
+        self.timeout_wheel = timeout_wheel
+        if timeout_wheel is None:
+            self.wheel_timeout = None
+            self.timeout = timeout
+            return self
+
+        self.wheel_timeout = timeout
+        self.timeout = None
+        self._arm_timeout()
+        return self
+
+    def _arm_timeout(self):
+        """
+        :protected:
+        送信済みのViewのタイムアウトをTimeoutWheelに登録する
+        テンプレートなど送信されないViewが登録され、タイムアウトで無効化されるのを防ぐ
+        """
+        timeout_wheel = self.timeout_wheel
+        if timeout_wheel is None or not self.wheel_timeout or timeout_wheel.is_armed(self):
+            return
+        if self.message is not None or self.interaction is not None or self.is_dispatching():
+            timeout_wheel.arm(self, self.wheel_timeout)
+
+    def _start_listening_from_store(self, store):
+        """
+        :protected:
+        送信されたViewがdiscord.pyに登録されたときにタイムアウトの計測を開始する
+        """
+        super()._start_listening_from_store(store)
+        self._arm_timeout()
+
+    async def expire(self):
+        """
+        タイムアウトしたViewをused_flagに合わせて処理し、停止する
+        """
+        if self.used_flag == ViewUsedBehaviorType.DISABLE_ITEMS:
+            await self.all_disable(priority=EditPriority.CLEANUP)
+        elif self.used_flag == ViewUsedBehaviorType.VIEW_CLOSE:
+            await self.close_view(priority=EditPriority.CLEANUP)
+        elif self.used_flag == ViewUsedBehaviorType.MESSAGE_DELETE:
+            await self.close_view_and_delete()
+        self.stop()
+        await self.on_timeout()
+
+    def stop(self, delete_state: bool = True):
+        """
+        Viewを停止し、保存した状態を削除する
+        :param delete_state: 保存した状態を削除するかどうか 後でStateHydratorなどで復元する場合はFalseを指定する
+        """
+        if self.timeout_wheel is not None:
+            self.timeout_wheel.cancel(self)
+        if delete_state:
+            self._delete_state()
+        super().stop()
+
+    def _dispatch_timeout(self):
+        """
+        :protected:
+        discord.pyのタイムアウト処理でタイムアウトしたときに保存した状態を削除する
+        """
+        self._delete_state()
+        super()._dispatch_timeout()
+
+    @property
+    def serialize_callbacks(self) -> bool:
+        """
+        コールバックを1つずつ順番に実行するかどうか
+        """
+        return self._callback_lock is not None
+
+    def set_serialize_callbacks(self, serialize_callbacks: bool):
+        """
+        コールバックを1つずつ順番に実行するかどうかを設定する
+        有効にすると、同じViewへのインタラクションは前のコールバックが終わるまで待機する
+        :param serialize_callbacks: コールバックを1つずつ順番に実行するかどうか
+        """
+        if not serialize_callbacks:
+            if self._callback_lock is not None:
+                self._callback_lock = None
+        elif self._callback_lock is None:
+            self._callback_lock = asyncio.Lock()
+        return self
+
+    async def _scheduled_task(self, item, interaction: Interaction):
+        """
+        :protected:
+        インタラクションのチェックとコールバックを実行する
+        serialize_callbacksが有効な場合は1つずつ順番に実行し、
+        ConcurrencyLimiterが設定されている場合はチェックを通過したものだけがコールバックの実行を待機する
+        """
+        lock = self._callback_lock
+        if lock is None:
+            return await self._run_item(item, interaction)
+        async with lock:
+            return await self._run_item(item, interaction)
+
+    async def _run_item(self, item, interaction: Interaction):
+        """
+        :protected:
+        discord.pyのView._scheduled_taskと同じ順序でチェックとコールバックを実行する
+        """
+        try:
+            item._refresh_state(interaction, interaction.data)
+
+            allow = await item._run_checks(interaction) and await self.interaction_check(interaction)
+            if not allow:
+                return
+
+            if self.timeout:
+                # discord.pyのタイムアウト処理が動いている場合は期限を延長する
+                self.timeout = self.timeout
+
+            limiter = self.concurrency_limiter
+            if limiter is None:
+                return await item.callback(interaction)
+            permit = await limiter.acquire(self, interaction)
+            if permit is None:
+                return
+            try:
+                await item.callback(interaction)
+            finally:
+                limiter.release(permit)
+        except Exception as e:
+            return await self.on_error(interaction, e, item)
+
+    def set_metrics(self, metrics: InteractionMetrics):
+        """
+        インタラクションの処理時間を記録するInteractionMetricsを設定する
+        :param metrics: 使用するInteractionMetrics Noneの場合は記録しない
+        """
+        self.metrics = metrics
+        return self
+
+    def set_concurrency_limiter(self, concurrency_limiter: Optional[ConcurrencyLimiter]):
+        """
+        コールバックの同時実行数を制限するConcurrencyLimiterを設定する
+        :param concurrency_limiter: 使用するConcurrencyLimiter Noneの場合は制限しない
+        """
+        self.concurrency_limiter = concurrency_limiter
+        return self
+
+    def set_click_throttle(self, click_throttle: Optional[ClickThrottle]):
+        """
+        クリックの頻度を制限するClickThrottleを設定する
+        :param click_throttle: 使用するClickThrottle Noneの場合は制限しない
+        """
+        self.click_throttle = click_throttle
+        return self
+
+    def set_defer_watchdog(self, defer_watchdog: Optional[DeferWatchdog]):
+        """
+        応答が遅いコールバックのインタラクションを自動でdeferするDeferWatchdogを設定する
+        :param defer_watchdog: 使用するDeferWatchdog Noneの場合は監視しない
+        """
+        self.defer_watchdog = defer_watchdog
+        return self
+
+    def set_executor(self, executor: Executor = None, run_sync_in_executor: bool = True):
+        """
+        同期関数のコールバックを実行するExecutorを設定する
+        :param executor: 使用するExecutor 指定しない場合は共有スレッドプールを使用する
+        :param run_sync_in_executor: 同期関数のコールバックをExecutorで実行するかどうか
+        """
+        self.executor = executor
+        self.run_sync_in_executor = run_sync_in_executor
+        return self
+
+    def set_cached_components(self, components: Optional[List[dict]]):
+        """
+        :protected:
+        送信用に変換済みのコンポーネントを設定する
+        :param components: 変換済みのコンポーネント
+        """
+        self._cached_components = components
+        return self
+
+    def invalidate_components(self):
+        """
+        変換済みのコンポーネントを破棄する
+        コンポーネントの属性を直接変更した場合に呼び出す
+        """
+        if self._cached_components is not None:
+            self._cached_components = None
+        return self
+
+    def add_item(self, item):
+        """
+        コンポーネントを追加し、変換済みのコンポーネントを破棄する
+        :param item: 追加するコンポーネント
+        """
+        self.invalidate_components()
+        return super().add_item(item)
+
+    def remove_item(self, item):
+        """
+        コンポーネントを削除し、変換済みのコンポーネントを破棄する
+        :param item: 削除するコンポーネント
+        """
+        self.invalidate_components()
+        return super().remove_item(item)
+
+    def clear_items(self):
+        """
+        全てのコンポーネントを削除し、変換済みのコンポーネントを破棄する
+        """
+        self.invalidate_components()
+        return super().clear_items()
+
+    def _build_components(self) -> List[dict]:
+        """
+        :protected:
+        コンポーネントを送信用に変換する。変換済みのものがあればそれを返す
+        """
+        if self._cached_components is not None:
+            return self._cached_components
+        return super().to_components()
+
+    def to_components(self) -> List[dict]:
+        """
+        :protected:
+        コンポーネントを送信用に変換する。変換済みのものがあればそれを返す
+        送信・編集のたびにdiscord.pyから呼ばれるため、送信した内容の指紋として記録する
+        """
+        components = self._build_components()
+        self._synced_fingerprint = self._fingerprint(components)
+        return components
+
+    def _fingerprint(self, components: List[dict]) -> int:
+        """
+        :protected:
+        送信用に変換したコンポーネントの指紋を取得する
+        :param components: 送信用に変換したコンポーネント
+        """
+        if components is self._fingerprint_payload:
+            return self._fingerprint_value
+        value = hash(repr(components))
+        self._fingerprint_payload = components
+        self._fingerprint_value = value
+        return value
+
+    def _current_fingerprint(self, close: bool = False) -> int:
+        """
+        :protected:
+        現在の状態の指紋を取得する 変換済みのコンポーネントが古い可能性があるため、必ず変換し直す
+        :param close: コンポーネントを削除した状態の指紋を取得するかどうか
+        """
+        return self._fingerprint([] if close else View.to_components(self))
+
+    def is_synced(self, close: bool = False) -> bool:
+        """
+        メッセージに最後に送信・予約したコンポーネントと現在の状態が同じかどうかを判断する
+        :param close: コンポーネントを削除した状態と比較するかどうか
+        """
+        if self._synced_fingerprint is None:
+            return False
+        return self._current_fingerprint(close) == self._synced_fingerprint
+
     def get_auto_custom_id(self) -> str:
         """
         自動生成されるIDを取得する
@@ -91,40 +458,73 @@ class ViewGenerator(View):
         self.auto_custom_id += 1
         return str(_id)
 
-    def check_author(self, user: discord.User) -> bool:
+    def set_access_rule(self, access_rule: Optional[AccessRule]):
+        """
+        インタラクションを受け付けるユーザーを判断するルールを設定する
+        Botが設定されている場合はロールの変更時にルールのキャッシュを破棄するリスナーを登録する
+        :param access_rule: 使用するAccessRule Noneの場合はルールを使用しない
+        """
+        self.access_rule = access_rule
+        if access_rule is not None and self.bot is not None:
+            AccessRule.register_listeners(self.bot)
+        return self
+
+    def check_author(self, user: discord.User, permissions: discord.Permissions = None) -> bool:
         """
         インタラクションを受け付ける対象ユーザーかどうかを判断する
         :param user: チェックするユーザー
+        :param permissions: チャンネルの権限の上書きを反映したユーザーの権限 AccessRuleの判断に使用する
         """
+        access_rule = self.access_rule
+        if access_rule is not None and not access_rule.allows(user, permissions):
+            return False
         if self.author is None:
             return True
         if self.respond_flag == RespondTargetType.ONLY_AUTHOR:
-            return user == self.author
+            return user.id == self.author.id
+        return True
 
     async def interaction_check(self, interaction: Interaction) -> bool:
         """
         インタラクションを受け付けるかどうかを判断する
         :param interaction: チェックするインタラクション
         """
-        if not self.check_author(user=interaction.user):
-            return False
-
-        if self.only_one_respond and self.used_flag == ViewUsedBehaviorType.VIEW_CLOSE:
-            await self.close_view()
-            self.used = True
-            return True
-
-        if self.only_one_respond and self.used_flag == ViewUsedBehaviorType.DISABLE_ITEMS:
-            await self.all_disable()
-            self.used = True
-            return True
+        metrics = self.metrics
+        if metrics is not None:
+            started = time.perf_counter()
+        try:
+            self.invalidate_components()
+            if not self.check_author(user=interaction.user, permissions=getattr(interaction, "permissions", None)):
+                return False
+
+            throttle = self.click_throttle
+            if throttle is not None:
+                retry_after = throttle.consume(self, interaction)
+                if retry_after is not None:
+                    await throttle.deny(self, interaction, retry_after)
+                    return False
+
+            if self.timeout_wheel is not None:
+                self.timeout_wheel.refresh(self)
+
+            if self.only_one_respond:
+                # awaitより前に使用済みにすることで、同時に届いたインタラクションのうち1つだけを受け付ける
+                if self.used:
+                    return False
+                self.used = True
+                self._save_state()
+
+                if self.used_flag == ViewUsedBehaviorType.VIEW_CLOSE:
+                    await self.close_view()
+                elif self.used_flag == ViewUsedBehaviorType.DISABLE_ITEMS:
+                    await self.all_disable()
+                elif self.used_flag == ViewUsedBehaviorType.MESSAGE_DELETE:
+                    await self.message.delete()
 
-        if self.only_one_respond and self.used_flag == ViewUsedBehaviorType.MESSAGE_DELETE:
-            await self.message.delete()
-            self.used = True
             return True
-
-        return True
+        finally:
+            if metrics is not None:
+                metrics.finish(InteractionMetrics.INTERACTION_CHECK_DURATION, self.custom_id_prefix, started)
 
     def _add_components(self, components: List[Union["Button", "Select"]]):
         """
@@ -132,6 +532,8 @@ class ViewGenerator(View):
         コンポーネントを追加する
         :param components: Viewに追加するコンポーネント
         """
+        self.invalidate_components()
+
         def check_generated_custom_id(custom_id: str):
             if len(custom_id) == 32:
                 return True
@@ -139,15 +541,15 @@ class ViewGenerator(View):
 
         for i in components:
             i.set_parent_view(self)
-            if not i.url:
+            if not getattr(i, "url", None):
                 if check_generated_custom_id(i.custom_id) and self.custom_id_prefix:
-                    if type(i) == Button:
+                    if isinstance(i, Button):
                         if not i.style == ButtonStyle.link:
                             i.custom_id = f"{self.custom_id_prefix}-{i.custom_id}"
                         else:
                             i.custom_id = None
 
-                    if type(i) == Select:
+                    if isinstance(i, Select):
                         i.custom_id = f"{self.custom_id_prefix}-{i.custom_id}"
 
                 elif not check_generated_custom_id(i.custom_id) and self.custom_id_prefix:
@@ -181,6 +583,7 @@ class ViewGenerator(View):
         self.author = author
         if set_only_author:
             self.respond_flag = RespondTargetType.ONLY_AUTHOR
+        self._save_state()
         return self
 
     def set_used(self, used: bool):
@@ -189,6 +592,7 @@ class ViewGenerator(View):
         :param used: Viewが使用済みかどうか
         """
         self.used = used
+        self._save_state()
         return self
 
     def set_message(self, message: discord.Message):
@@ -197,49 +601,317 @@ class ViewGenerator(View):
         :param message: Viewを表示するメッセージ
         """
         self.message = message
+        self._save_state()
+        self._arm_timeout()
+        return self
+
+    def set_state_store(self, state_store: Optional[StateStore], state_key: str = None):
+        """
+        Viewの状態を保存するStateStoreを設定する
+        :param state_store: 使用するStateStore Noneの場合は保存しない
+        :param state_key: 状態を保存するキー 指定しない場合はメッセージIDを使用する
+        """
+        self.state_store = state_store
+        if state_key is not None:
+            self.state_key = state_key
+        self._save_state()
         return self
 
-    async def all_disable(self, sync_message: bool = True):
+    def get_state_key(self) -> Optional[str]:
+        """
+        状態を保存するキーを取得する
+        """
+        if self.state_key is not None:
+            return self.state_key
+        if self.message is not None:
+            return str(self.message.id)
+        return None
+
+    def to_state(self) -> ViewState:
+        """
+        Viewの状態を保存できる形式に変換する
+        """
+        return {
+            "author_id": self.author.id if self.author is not None else None,
+            "used": self.used,
+            "only_one_respond": self.only_one_respond,
+            "used_flag": _flag_name(ViewUsedBehaviorType, self.used_flag),
+            "respond_flag": _flag_name(RespondTargetType, self.respond_flag),
+        }
+
+    def apply_state(self, state: ViewState):
+        """
+        保存された状態をViewに反映する
+        :param state: to_stateで変換した状態
+        """
+        author_id = state.get("author_id")
+        if author_id is None:
+            self.author = None
+        elif self.author is None or self.author.id != author_id:
+            self.author = discord.Object(id=author_id)
+        self.used = state.get("used", False)
+        self.only_one_respond = state.get("only_one_respond", False)
+        self.used_flag = getattr(ViewUsedBehaviorType, state.get("used_flag") or "NOTHING")
+        self.respond_flag = getattr(RespondTargetType, state.get("respond_flag") or "ONLY_AUTHOR")
+        return self
+
+    def _save_state(self):
+        """
+        :protected:
+        StateStoreが設定されている場合は現在の状態を保存する
+        """
+        if self.state_store is None:
+            return
+        key = self.get_state_key()
+        if key is not None:
+            self.state_store.save(key, self.to_state())
+
+    def _delete_state(self):
+        """
+        :protected:
+        StateStoreが設定されている場合は保存した状態を削除する
+        """
+        if self.state_store is None:
+            return
+        key = self.get_state_key()
+        if key is not None:
+            self.state_store.delete(key)
+
+    def hydrate(self, state_store: StateStore = None) -> bool:
+        """
+        保存された状態を読み込んでViewに反映する
+        :param state_store: 読み込むStateStore 指定しない場合は設定済みのものを使用する
+        :return: 状態が見つかったかどうか
+        """
+        state_store = state_store or self.state_store
+        key = self.get_state_key()
+        if state_store is None or key is None:
+            return False
+        state = state_store.load(key)
+        if state is None:
+            return False
+        self.apply_state(state)
+        return True
+
+    @classmethod
+    def from_store(cls, state_store: StateStore, message: discord.Message, **kwargs) -> Optional["ViewGenerator"]:
+        """
+        保存された状態からViewを復元する
+        再起動後に届いたインタラクションのメッセージから呼び出す
+        インタラクションが届いたときに自動で復元する場合はStateHydratorを使用する
+        :param state_store: 読み込むStateStore
+        :param message: Viewを表示しているメッセージ
+        :param kwargs: コンストラクタに渡す引数
+        :return: 状態が見つからない場合はNone
+        """
+        view = cls(message=message, **kwargs)
+        if not view.hydrate(state_store):
+            return None
+        view.state_store = state_store
+        return view
+
+    def set_edit_coalescing(self, coalesce_edits: bool, coalesce_window: float = 0.0):
+        """
+        短時間に発生したメッセージの編集を1回にまとめるかどうかを設定する
+        :param coalesce_edits: 編集をまとめるかどうか
+        :param coalesce_window: 編集をまとめる待ち時間(秒)
+        """
+        self.coalesce_edits = coalesce_edits
+        self.coalesce_window = coalesce_window
+        return self
+
+    def set_edit_scheduler(self, edit_scheduler: EditScheduler):
+        """
+        メッセージの編集をレート制限に合わせて実行するスケジューラーを設定する
+        :param edit_scheduler: 使用するスケジューラー Noneの場合はすぐに編集する
+        """
+        self.edit_scheduler = edit_scheduler
+        return self
+
+    async def _edit_message(self, view: Optional[View]):
+        """
+        :protected:
+        Viewを表示するメッセージを編集する
+        :param view: メッセージに設定するView
+        """
+        if self.metrics is not None:
+            return await self.metrics.measure(
+                InteractionMetrics.SYNC_MESSAGE_DURATION, self.custom_id_prefix, self._send_edit, view
+            )
+        return await self._send_edit(view)
+
+    async def _send_edit(self, view: Optional[View]):
+        """
+        :protected:
+        Viewを表示するメッセージを編集するリクエストを送信する
+        :param view: メッセージに設定するView
+        """
+        # 編集では常に現在の状態を送信する
+        self.invalidate_components()
+        if self.message:
+            return await self.message.edit(view=view)
+
+        elif self.interaction:
+            return await self.interaction.edit_original_response(view=view)
+
+    async def _dispatch_edit(self, view: Optional[View], priority: "EditPriority"):
+        """
+        :protected:
+        スケジューラーが設定されている場合はスケジューラーを経由してメッセージを編集する
+        最後に送信・予約した内容から変化していない場合は編集を省略する
+        :param view: メッセージに設定するView
+        :param priority: 編集の優先度
+        """
+        fingerprint = self._current_fingerprint(close=view is None)
+        if fingerprint == self._synced_fingerprint:
+            self.skipped_edits += 1
+            if self.metrics is not None:
+                self.metrics.increment(InteractionMetrics.SKIPPED_EDITS, self.custom_id_prefix)
+            return self.message
+
+        # 編集の実行を待つ間に別の状態への編集が来ても比較できるよう、予約した時点で指紋を記録する
+        previous = self._synced_fingerprint
+        self._synced_fingerprint = fingerprint
+        try:
+            if not self.edit_scheduler:
+                return await self._edit_message(view)
+
+            if self.message:
+                bucket_key = self.message.channel.id
+            else:
+                bucket_key = self.interaction.channel_id
+            return await self.edit_scheduler.submit(
+                bucket_key=bucket_key,
+                edit_key=self.id,
+                func=lambda: self._edit_message(view),
+                priority=priority,
+            )
+        except BaseException:
+            if self._synced_fingerprint == fingerprint:
+                self._synced_fingerprint = previous
+            raise
+
+    def _schedule_edit(self, view: Optional[View], priority: "EditPriority") -> asyncio.Future:
+        """
+        :protected:
+        メッセージの編集を予約する。予約済みの編集がある場合は最後の状態で上書きする
+        :param view: メッセージに設定するView
+        :param priority: 編集の優先度
+        """
+        self._pending_edit_view = view
+        if priority == EditPriority.USER:
+            self._pending_edit_priority = priority
+        if self._pending_edit is None:
+            loop = asyncio.get_running_loop()
+            self._pending_edit = loop.create_future()
+            self._pending_edit.add_done_callback(self._on_pending_edit_done)
+            self._pending_edit_handle = loop.call_later(self.coalesce_window, self._start_flush)
+        return self._pending_edit
+
+    def _start_flush(self):
+        """
+        :protected:
+        予約済みの編集を実行するタスクを開始する
+        """
+        self._pending_edit_handle = None
+        task = asyncio.ensure_future(self._flush_pending_edit())
+        _flush_tasks.add(task)
+        task.add_done_callback(_flush_tasks.discard)
+
+    @staticmethod
+    def _on_pending_edit_done(future: asyncio.Future):
+        """
+        :protected:
+        予約した編集が失敗した場合は記録する
+        all_disableなどは結果を待たないため、ここで記録しないと失敗が分からなくなる
+        """
+        if not future.cancelled() and future.exception() is not None:
+            _log.error("メッセージの編集に失敗しました", exc_info=future.exception())
+
+    async def _flush_pending_edit(self):
+        """
+        :protected:
+        予約済みの編集を実行し、結果を待機中の呼び出し元に渡す
+        """
+        future = self._pending_edit
+        if future is None:
+            return
+        priority = self._pending_edit_priority
+        self._pending_edit = None
+        self._pending_edit_priority = EditPriority.CLEANUP
+        if self._pending_edit_handle:
+            self._pending_edit_handle.cancel()
+            self._pending_edit_handle = None
+
+        try:
+            future.set_result(await self._dispatch_edit(self._pending_edit_view, priority))
+        except Exception as e:
+            future.set_exception(e)
+        except BaseException:
+            future.cancel()
+            raise
+
+    async def flush_edits(self):
+        """
+        予約済みのメッセージの編集をすぐに実行し、その結果を取得する
+        """
+        future = self._pending_edit
+        if future is None:
+            return None
+        await self._flush_pending_edit()
+        return await future
+
+    async def sync_message(self, close: bool = False, priority: "EditPriority" = EditPriority.USER):
+        """
+        Viewの状態をメッセージに反映する
+        編集をまとめる設定の場合は編集を予約し、その結果を受け取るFutureを返す
+        :param close: メッセージからコンポーネントを削除するかどうか
+        :param priority: 編集の優先度 タイムアウト時の後片付けなどはEditPriority.CLEANUPを指定する
+        """
+        if not self.message and not self.interaction:
+            return None
+
+        view = None if close else self
+        if self.coalesce_edits:
+            return self._schedule_edit(view, priority)
+        return await self._dispatch_edit(view, priority)
+
+    async def all_disable(self, sync_message: bool = True, priority: "EditPriority" = EditPriority.USER):
         """
         Viewに含まれるすべてのコンポーネントを無効化する
         :param sync_message: Viewを表示するメッセージのコンポーネントを自動で無効化するよう編集するかどうか
+        :param priority: 編集の優先度
         """
+        self.invalidate_components()
         for i in self.children:
             i.disabled = True
 
-        if self.message and sync_message:
-            await self.message.edit(view=self)
-
-        elif self.interaction and sync_message:
-            await self.interaction.edit_original_response(view=self)
-
+        if sync_message:
+            await self.sync_message(priority=priority)
         return self
 
-    async def all_enable(self, sync_message: bool = True):
+    async def all_enable(self, sync_message: bool = True, priority: "EditPriority" = EditPriority.USER):
         """
         Viewに含まれるすべてのコンポーネントを有効化する
         :param sync_message: Viewを表示するメッセージのコンポーネントを自動で有効化するよう編集するかどうか
+        :param priority: 編集の優先度
         """
+        self.invalidate_components()
         for i in self.children:
             i.disabled = False
 
-        if self.message and sync_message:
-            await self.message.edit(view=self)
-
-        elif self.interaction and sync_message:
-            await self.interaction.edit_original_response(view=self)
+        if sync_message:
+            await self.sync_message(priority=priority)
         return self
 
-    async def close_view(self, sync_message: bool = True):
+    async def close_view(self, sync_message: bool = True, priority: "EditPriority" = EditPriority.USER):
         """
         Viewにあるコンポーネントを全て削除する
         :param sync_message: Viewを表示するメッセージのコンポーネントを自動で削除するよう編集するかどうか
+        :param priority: 編集の優先度
         """
-        if self.message and sync_message:
-            await self.message.edit(view=None)
-
-        elif self.interaction and sync_message:
-            await self.interaction.edit_original_response(view=None)
+        if sync_message:
+            await self.sync_message(close=True, priority=priority)
         return self
 
     async def close_view_and_delete(self, sync_message: bool = True):
@@ -247,6 +919,7 @@ class ViewGenerator(View):
         Viewにあるコンポーネントを全て削除してメッセージも削除する
         :param sync_message: Viewを表示するメッセージのコンポーネントを自動で削除するよう編集するかどうか
         """
+        self._delete_state()
         if self.message and sync_message:
             await self.message.delete()
 
@@ -261,6 +934,7 @@ class ViewGenerator(View):
         :param only_one_respond: インタラクションを受け付けるユーザーが一人だけかどうか
         """
         self.only_one_respond = only_one_respond
+        self._save_state()
         return self
 
     def set_used_flag(self, used_flag: "ViewUsedBehaviorType"):
@@ -269,6 +943,7 @@ class ViewGenerator(View):
         :param used_flag: 挙動を示すフラグ
         """
         self.used_flag = used_flag
+        self._save_state()
         return self
 
     def set_respond_flag(self, respond_flag: "RespondTargetType"):
@@ -277,6 +952,7 @@ class ViewGenerator(View):
         :param ターゲットを示すフラグ
         """
         self.respond_flag = respond_flag
+        self._save_state()
         return self
 
     async def send_modal(self, modal: Modal):
@@ -291,11 +967,20 @@ class ViewGenerator(View):
     def set_custom_id_prefix(self, prefix: str, sync_components: bool = True):
         """
         IDにPrefixをセットします。
+        既にPrefixがセットされている場合は古いPrefixを置き換えます。
+        リンクボタンはcustom_idを送信しないため変更しません。
         """
+        old_prefix = self.custom_id_prefix
         self.custom_id_prefix = prefix
+        self.invalidate_components()
         if sync_components:
             for i in self.children:
-                i.custom_id = f"{prefix}-{i.custom_id}"
+                custom_id = getattr(i, "custom_id", None)
+                if not custom_id or getattr(i, "url", None):
+                    continue
+                if old_prefix and custom_id.startswith(f"{old_prefix}-"):
+                    custom_id = custom_id[len(old_prefix) + 1:]
+                i.custom_id = f"{prefix}-{custom_id}" if prefix else custom_id
         return self
 
 
@@ -323,16 +1008,39 @@ class Button(BaseButton):
         self.label = label
         self.style = ButtonStyle.primary if not button_style else button_style
         self.func = func
-        self.parent_view = None
         self.disabled = disabled
         self.emoji = emoji
 
+    @property
+    def func(self) -> Callable:
+        """
+        ボタンを押したときに実行する関数
+        """
+        return self._func
+
+    @func.setter
+    def func(self, func: Callable):
+        self._func = func
+        self._func_is_coroutine = asyncio.iscoroutinefunction(func)
+
+    @property
+    def parent_view(self) -> View:
+        """
+        ボタンが属するView
+        """
+        return self._view
+
+    @parent_view.setter
+    def parent_view(self, view: View):
+        self._view = view
+
     def set_label(self, label: str):
         """
         ボタンのラベルを設定する
         :param label: ボタンのラベル
         """
         self.label = label
+        _invalidate_parent(self)
         return self
 
     def set_url(self, url: str):
@@ -343,6 +1051,7 @@ class Button(BaseButton):
         self.url = url
         self.style = ButtonStyle.link
         self.custom_id = None
+        _invalidate_parent(self)
         return self
 
     def set_emoji(self, emoji: str):
@@ -351,6 +1060,7 @@ class Button(BaseButton):
         :param emoji: ボタンに使用するEmoji
         """
         self.emoji = emoji
+        _invalidate_parent(self)
         return self
 
     def set_style(self, style: discord.ButtonStyle):
@@ -358,6 +1068,7 @@ class Button(BaseButton):
         ボタンのスタイルを設定する
         """
         self.style = style
+        _invalidate_parent(self)
         return self
 
     def on_click(self, function: Callable[[Interaction, ViewGenerator], Any]):
@@ -371,17 +1082,31 @@ class Button(BaseButton):
         """
         ボタンを押したときに実行する関数を実行する
         """
-        if self.func:
-            if asyncio.iscoroutinefunction(self.func):
-                await self.func(interaction, self.parent_view)
-            else:
-                self.func(interaction, self.parent_view)
+        metrics = getattr(self._view, "metrics", None)
+        if metrics is not None:
+            started = metrics.start_callback(self._view.custom_id_prefix, interaction)
+        watchdog = getattr(self._view, "defer_watchdog", None)
+        if watchdog is not None:
+            timer = watchdog.arm(interaction, self._func, self._view.custom_id_prefix)
+        try:
+            func = self._func
+            if func:
+                if self._func_is_coroutine:
+                    await func(interaction, self._view)
+                else:
+                    await call_sync_handler(self._view, func, interaction, self._view)
+        finally:
+            if watchdog is not None:
+                watchdog.disarm(timer)
+            if metrics is not None:
+                metrics.finish(InteractionMetrics.CALLBACK_DURATION, self._view.custom_id_prefix, started)
 
     def set_disabled(self, disabled: bool):
         """
         ボタンを無効化するかどうかを設定する
         """
         self.disabled = disabled
+        _invalidate_parent(self)
         return self
 
     def set_parent_view(self, view: View):
@@ -396,6 +1121,7 @@ class Button(BaseButton):
         ボタンのカスタムIDを設定する
         """
         self.custom_id = custom_id
+        _invalidate_parent(self)
         return self
 
 
@@ -425,13 +1151,35 @@ class Select(BaseSelect):
             self.options = []
         self.placeholder = placeholder
         self.disabled = disabled
-        self.parent_view = None
         self.event_handlers = {}
         self.func = func
         self.trigger_type = SelectTriggerType.ALWAYS
         self.min_values = min_values
         self.max_values = max_values
 
+    @property
+    def func(self) -> Callable:
+        """
+        セレクターを選択したときに実行する関数
+        """
+        return self._func
+
+    @func.setter
+    def func(self, func: Callable):
+        self._func = func
+        self._func_is_coroutine = asyncio.iscoroutinefunction(func)
+
+    @property
+    def parent_view(self) -> View:
+        """
+        セレクターが属するView
+        """
+        return self._view
+
+    @parent_view.setter
+    def parent_view(self, view: View):
+        self._view = view
+
     def add_option(self, option: "SelectOption", **kwargs):
         """
         セレクターのオプションを追加する
@@ -439,9 +1187,8 @@ class Select(BaseSelect):
         """
         self.options.append(option)
         if option.func:
-            self.event_handlers[option.value] = option.func
-        else:
-            self.event_handlers[option.value] = None
+            self.event_handlers[option.value] = option
+        _invalidate_parent(self)
         return self
 
     def add_options(self, options: List["SelectOption"]):
@@ -459,6 +1206,7 @@ class Select(BaseSelect):
         :param placeholder: セレクターのプレースホルダー
         """
         self.placeholder = placeholder
+        _invalidate_parent(self)
         return self
 
     def set_parent_view(self, view: View):
@@ -475,6 +1223,7 @@ class Select(BaseSelect):
         :param disabled: セレクターを無効化するかどうか
         """
         self.disabled = disabled
+        _invalidate_parent(self)
         return self
 
     def on_select(self, function: Callable[[Interaction, ViewGenerator], Any]):
@@ -489,42 +1238,53 @@ class Select(BaseSelect):
         """
         セレクターを選択したときに実行する関数を実行する
         """
+        metrics = getattr(self._view, "metrics", None)
+        if metrics is not None:
+            started = metrics.start_callback(self._view.custom_id_prefix, interaction)
+        watchdog = getattr(self._view, "defer_watchdog", None)
+        if watchdog is not None:
+            timer = watchdog.arm(interaction, self._func, self._view.custom_id_prefix)
         try:
-            if self.func:
-                if self.trigger_type == SelectTriggerType.ALWAYS:
-                    if asyncio.iscoroutinefunction(self.func):
-                        await self.func(interaction, self.parent_view)
-                    else:
-                        self.func(interaction, self.parent_view)
-
-                elif self.trigger_type == SelectTriggerType.MIN_AND_MAX and self.min_values == len(
-                        self.values) == self.max_values:
-                    if asyncio.iscoroutinefunction(self.func):
-                        await self.func(interaction, self.parent_view)
-                    else:
-                        self.func(interaction, self.parent_view)
-
-                elif self.trigger_type == SelectTriggerType.ONLY_MAX and self.max_values == len(
-                        self.values):
-                    if asyncio.iscoroutinefunction(self.func):
-                        await self.func(interaction, self.parent_view)
-                    else:
-                        self.func(interaction, self.parent_view)
-
-            event_func = self.event_handlers[self.values[len(self.values) - 1]]
-            if event_func:
-                if asyncio.iscoroutinefunction(event_func):
-                    await event_func(interaction, self.parent_view)
+            func = self._func
+            if func and self._is_triggered():
+                if self._func_is_coroutine:
+                    await func(interaction, self._view)
                 else:
-                    event_func(interaction, self.parent_view)
+                    await call_sync_handler(self._view, func, interaction, self._view)
+
+            option = self.event_handlers.get(self.values[-1])
+            if option:
+                if option.func_is_coroutine:
+                    await option.func(interaction, self._view)
+                else:
+                    await call_sync_handler(self._view, option.func, interaction, self._view)
         except Exception as e:
             print(e)
+        finally:
+            if watchdog is not None:
+                watchdog.disarm(timer)
+            if metrics is not None:
+                metrics.finish(InteractionMetrics.CALLBACK_DURATION, self._view.custom_id_prefix, started)
+
+    def _is_triggered(self) -> bool:
+        """
+        :protected:
+        現在の選択数がトリガータイプの条件を満たしているかどうかを判断する
+        """
+        if self.trigger_type == SelectTriggerType.ALWAYS:
+            return True
+        if self.trigger_type == SelectTriggerType.MIN_AND_MAX:
+            return self.min_values == len(self.values) == self.max_values
+        if self.trigger_type == SelectTriggerType.ONLY_MAX:
+            return self.max_values == len(self.values)
+        return False
 
     def set_min_values(self, min_values: int):
         """
         セレクターの最小選択数を設定する
         """
         self.min_values = min_values
+        _invalidate_parent(self)
         return self
 
     def set_max_values(self, max_values: int):
@@ -532,10 +1292,12 @@ class Select(BaseSelect):
         セレクターの最大選択数を設定する
         """
         self.max_values = max_values
+        _invalidate_parent(self)
         return self
 
 
 class SelectOption(BaseSelectOption):
+    __slots__ = ("parent_view", "_func", "func_is_coroutine")
 
     def __init__(self,
                  label: str = None,
@@ -563,6 +1325,18 @@ class SelectOption(BaseSelectOption):
         self.func = func
         self.default = default
 
+    @property
+    def func(self) -> Callable:
+        """
+        セレクターのオプションを選択したときに実行する関数
+        """
+        return self._func
+
+    @func.setter
+    def func(self, func: Callable):
+        self._func = func
+        self.func_is_coroutine = asyncio.iscoroutinefunction(func)
+
     def set_label(self, label: str):
         """
         セレクターのオプションのラベルを設定する
@@ -617,31 +1391,26 @@ class SelectOption(BaseSelectOption):
         return self
 
 
-class SelectTriggerType:
-    """
-    セレクターのトリガータイプ
-    """
-    ALWAYS = auto()
-    ONLY_MAX = auto()
-    MIN_AND_MAX = auto()
-
-
-class ViewUsedBehaviorType:
+def _invalidate_parent(item: Union[Button, Select]):
     """
-    Viewの使用方法
+    コンポーネントの属性を変更したときに、属するViewの変換済みのコンポーネントを破棄する
+    :param item: 変更したコンポーネント
     """
-    VIEW_CLOSE = auto()
-    MESSAGE_DELETE = auto()
-    NOTHING = auto()
-    DISABLE_ITEMS = auto()
+    view = item._view
+    if isinstance(view, ViewGenerator):
+        view.invalidate_components()
 
 
-class RespondTargetType:
+def _flag_name(flag_type: type, value: Any) -> Optional[str]:
     """
-    レスポンスするターゲットタイプ
+    フラグの値からフラグ名を取得する
+    :param flag_type: フラグのクラス
+    :param value: フラグの値
     """
-    ONLY_AUTHOR = auto()
-    ALL_USERS = auto()
+    for name, flag in vars(flag_type).items():
+        if flag is value:
+            return name
+    return None
 
 
 class ComponentsUtils:
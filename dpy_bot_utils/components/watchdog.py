@@ -0,0 +1,168 @@
+import asyncio
+import functools
+from typing import TYPE_CHECKING, Any, Callable, Dict, Optional, Set
+
+import discord
+
+from .metrics import InteractionMetrics
+
+if TYPE_CHECKING:
+    from discord.interactions import Interaction
+
+
+class _WatchdogTimer:
+    __slots__ = ("handle",)
+
+    def __init__(self, handle: asyncio.TimerHandle):
+        self.handle = handle
+
+
+class _DeferGuard:
+    """
+    DeferWatchdogのdeferが完了するまで、コールバックからの応答を待機させるInteractionResponseの代わり
+    deferが成功した後のコールバックの応答はInteractionRespondedになる
+    """
+    __slots__ = ("_response", "_deferring")
+
+    def __init__(self, response, deferring: asyncio.Future):
+        self._response = response
+        self._deferring = deferring
+
+    def __getattr__(self, name: str):
+        return getattr(self._response, name)
+
+    async def _after_defer(self, name: str, args, kwargs):
+        # コールバックがキャンセルされてもdeferは中断しない
+        await asyncio.shield(self._deferring)
+        return await getattr(self._response, name)(*args, **kwargs)
+
+    def defer(self, *args, **kwargs):
+        return self._after_defer("defer", args, kwargs)
+
+    def send_message(self, *args, **kwargs):
+        return self._after_defer("send_message", args, kwargs)
+
+    def edit_message(self, *args, **kwargs):
+        return self._after_defer("edit_message", args, kwargs)
+
+    def send_modal(self, *args, **kwargs):
+        return self._after_defer("send_modal", args, kwargs)
+
+
+def _callback_label(callback: Optional[Callable[..., Any]]) -> Optional[str]:
+    """
+    コールバックの回数を記録するためのラベルを取得する
+    custom_idはViewごとに生成されるため、関数の名前で集計して記録するキーの数を抑える
+    """
+    if callback is None:
+        return None
+    label = getattr(callback, "__qualname__", None)
+    if label is None:
+        return type(callback).__qualname__
+    return label
+
+
+class DeferWatchdog:
+
+    def __init__(self,
+                 budget: float = 2.0,
+                 thinking: bool = False,
+                 ephemeral: bool = False,
+                 metrics: InteractionMetrics = None,
+                 ):
+        """
+        コールバックが時間内に応答しなかったインタラクションを自動でdeferする
+        Discordの3秒の応答期限を過ぎてインタラクションが失敗するのを防ぐ
+        deferされた後のコールバックはfollowupまたはedit_original_responseで応答する
+        同期関数のコールバックはイベントループを止めるため、Executorで実行する場合のみ監視できる
+        :param budget: deferするまでの待ち時間(秒) 3秒より短くする
+        :param thinking: 考え中の表示を出すかどうか
+        :param ephemeral: 考え中の表示を本人にのみ表示するかどうか
+        :param metrics: 遅延・deferの回数を記録するInteractionMetrics
+        late_countsとdeferred_countsにはコンポーネントごとではなくコールバックの関数名(__qualname__)ごとの回数を記録する
+        同じ関数をコールバックにしている複数のコンポーネントは1つの回数を共有する
+        deferの送信中はinteraction.responseでの応答をdeferの完了まで待機させ、二重に応答するのを防ぐ
+        deferが成功した場合、その後のinteraction.responseでの応答はInteractionRespondedになる
+        """
+        self.budget = budget
+        self.thinking = thinking
+        self.ephemeral = ephemeral
+        self.metrics = metrics
+        self.late_counts: Dict[Optional[str], int] = {}
+        self.deferred_counts: Dict[Optional[str], int] = {}
+        self._deferring: Set[asyncio.Task] = set()
+
+    def arm(self,
+            interaction: "Interaction",
+            callback: Optional[Callable[..., Any]],
+            prefix: Optional[str] = None,
+            ) -> _WatchdogTimer:
+        """
+        コールバックの監視を開始する
+        :param interaction: 監視するインタラクション
+        :param callback: 監視するコールバック関数 関数名を回数の記録に使用する
+        :param prefix: custom_idのPrefix InteractionMetricsへの記録に使用する
+        """
+        loop = asyncio.get_running_loop()
+        return _WatchdogTimer(loop.call_later(self.budget, self._expire, interaction, callback, prefix))
+
+    @staticmethod
+    def disarm(timer: _WatchdogTimer):
+        """
+        コールバックの監視を終了する
+        :param timer: armで取得した値
+        """
+        timer.handle.cancel()
+
+    def _expire(self, interaction: "Interaction", callback: Optional[Callable[..., Any]], prefix: Optional[str]):
+        """
+        :protected:
+        待ち時間を過ぎても実行中のコールバックを記録し、未応答の場合はdeferする
+        """
+        label = _callback_label(callback)
+        self.late_counts[label] = self.late_counts.get(label, 0) + 1
+        if self.metrics is not None:
+            self.metrics.increment(InteractionMetrics.LATE_CALLBACKS, prefix)
+        response = interaction.response
+        if response.is_done():
+            return
+        task = asyncio.ensure_future(self._defer(response, label, prefix))
+        # deferのHTTPリクエストが完了するまでis_doneはFalseのままなので、コールバックの応答をdeferの後に並べる
+        guard = _DeferGuard(response, task)
+        interaction._cs_response = guard
+        self._deferring.add(task)
+        task.add_done_callback(self._deferring.discard)
+        task.add_done_callback(functools.partial(self._release, interaction, response, guard))
+
+    @staticmethod
+    def _release(interaction: "Interaction", response, guard: _DeferGuard, _task: asyncio.Task):
+        """
+        :protected:
+        deferの完了後、インタラクションの応答を元に戻す
+        """
+        if interaction._cs_response is guard:
+            interaction._cs_response = response
+
+    async def _defer(self, response, label: Optional[str], prefix: Optional[str]):
+        """
+        :protected:
+        インタラクションをdeferする コールバックが先に応答した場合は何もしない
+        """
+        try:
+            if self.thinking:
+                await response.defer(thinking=True, ephemeral=self.ephemeral)
+            else:
+                await response.defer()
+        except (discord.InteractionResponded, discord.HTTPException):
+            return
+        self.deferred_counts[label] = self.deferred_counts.get(label, 0) + 1
+        if self.metrics is not None:
+            self.metrics.increment(InteractionMetrics.DEFERRED_INTERACTIONS, prefix)
+
+    def reset(self):
+        """
+        記録した回数を全て破棄する
+        """
+        self.late_counts.clear()
+        self.deferred_counts.clear()
+        return self
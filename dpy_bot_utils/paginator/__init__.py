@@ -0,0 +1 @@
+from .paginator import Paginator
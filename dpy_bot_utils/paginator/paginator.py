@@ -0,0 +1,254 @@
+import asyncio
+import logging
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Union
+
+import discord
+from discord.interactions import Interaction
+
+from ..components.view import ViewGenerator, Button, ButtonStyle
+
+Page = Union[discord.Embed, str, Dict[str, Any]]
+
+_log = logging.getLogger(__name__)
+
+
+class Paginator(ViewGenerator):
+    # ViewGeneratorと同様に、既定値の設定はインスタンスの属性を増やさないようクラスで共有する
+    cache_size: int = 16
+    prefetch: bool = True
+    current_page: int = 0
+
+    def __init__(self,
+                 page_source: Callable[[int], Union[Page, Awaitable[Page]]] = None,
+                 page_count: int = 0,
+                 cache_size: int = 16,
+                 prefetch: bool = True,
+                 author: discord.User = None,
+                 timeout: int = None,
+                 prefix: str = None,
+                 ):
+        """
+        ページを必要になった時点で生成するページネーター
+        :param page_source: ページ番号を受け取りページ(Embed, 文字列, message.editの引数の辞書)を返す関数
+        :param page_count: ページの総数
+        :param cache_size: 生成済みのページを保持する最大数 先読みする場合は表示中と前後の3ページ以上を保持する
+        :param prefetch: 表示中のページの前後を裏で生成しておくかどうか
+        :param author: インタラクションを操作できるユーザー
+        :param timeout: Viewを閉じるまでのタイムアウト
+        :param prefix: custom_idのPrefix
+        """
+        super().__init__(author=author, timeout=timeout, prefix=prefix)
+        self.page_source = page_source
+        self.page_count = page_count
+        if cache_size != Paginator.cache_size:
+            self.cache_size = cache_size
+        if prefetch != Paginator.prefetch:
+            self.prefetch = prefetch
+        self.page_cache: "OrderedDict[int, Page]" = OrderedDict()
+        self.pending_pages: Dict[int, asyncio.Task] = {}
+
+        self.previous_button = Button(label="<", button_style=ButtonStyle.secondary).on_click(self._on_previous)
+        self.indicator_button = Button(label=self._indicator_label(), button_style=ButtonStyle.secondary,
+                                       disabled=True)
+        self.next_button = Button(label=">", button_style=ButtonStyle.secondary).on_click(self._on_next)
+        self.add_components([self.previous_button, self.indicator_button, self.next_button])
+        self._update_buttons()
+
+    def set_page_source(self, page_source: Callable[[int], Union[Page, Awaitable[Page]]], page_count: int = None):
+        """
+        ページを生成する関数を設定する
+        :param page_source: ページ番号を受け取りページを返す関数
+        :param page_count: ページの総数
+        """
+        self.page_source = page_source
+        if page_count is not None:
+            self.page_count = page_count
+        self.clear_cache()
+        return self
+
+    def set_cache_size(self, cache_size: int):
+        """
+        生成済みのページを保持する最大数を設定する
+        :param cache_size: 生成済みのページを保持する最大数
+        """
+        self.cache_size = cache_size
+        self._trim_cache()
+        return self
+
+    def set_prefetch(self, prefetch: bool):
+        """
+        表示中のページの前後を裏で生成しておくかどうかを設定する
+        :param prefetch: 前後のページを生成しておくかどうか
+        """
+        self.prefetch = prefetch
+        return self
+
+    def clear_cache(self):
+        """
+        生成済みのページを破棄する
+        """
+        self.page_cache.clear()
+        for task in self.pending_pages.values():
+            task.cancel()
+        self.pending_pages.clear()
+        return self
+
+    async def get_page(self, index: int) -> Page:
+        """
+        ページを取得する。キャッシュにない場合のみ生成する
+        :param index: ページ番号
+        """
+        if not 0 <= index < self.page_count:
+            raise IndexError("ページが存在しません")
+
+        if index in self.page_cache:
+            self.page_cache.move_to_end(index)
+            return self.page_cache[index]
+
+        task = self.pending_pages.get(index)
+        if task is None:
+            task = self._start_render(index)
+        return await asyncio.shield(task)
+
+    def _start_render(self, index: int) -> asyncio.Task:
+        """
+        :protected:
+        ページの生成を開始する 誰も結果を待たなかった場合も例外を回収する
+        :param index: ページ番号
+        """
+        task = asyncio.ensure_future(self._render_page(index))
+        task.add_done_callback(self._on_render_done)
+        self.pending_pages[index] = task
+        return task
+
+    @staticmethod
+    def _on_render_done(task: asyncio.Task):
+        """
+        :protected:
+        ページの生成に失敗した場合は記録する 失敗したページは次に表示するときに生成し直す
+        """
+        if not task.cancelled() and task.exception() is not None:
+            _log.debug("ページの生成に失敗しました", exc_info=task.exception())
+
+    async def _render_page(self, index: int) -> Page:
+        """
+        :protected:
+        ページを生成してキャッシュに追加する
+        :param index: ページ番号
+        """
+        try:
+            page = self.page_source(index)
+            if asyncio.iscoroutine(page):
+                page = await page
+            self.page_cache[index] = page
+            self._trim_cache()
+            return page
+        finally:
+            self.pending_pages.pop(index, None)
+
+    def _trim_cache(self):
+        """
+        :protected:
+        最大数を超えた古いページをキャッシュから削除する
+        """
+        # 先読みしたページで表示中のページが押し出されないよう、表示中と前後のページは必ず保持する
+        while len(self.page_cache) > max(self.cache_size, 3 if self.prefetch else 1):
+            self.page_cache.popitem(last=False)
+
+    def _prefetch_around(self, index: int):
+        """
+        :protected:
+        前後のページを裏で生成する
+        :param index: 表示中のページ番号
+        """
+        if not self.prefetch:
+            return
+        for i in (index + 1, index - 1):
+            if 0 <= i < self.page_count and i not in self.page_cache and i not in self.pending_pages:
+                self._start_render(i)
+
+    def _indicator_label(self) -> str:
+        """
+        :protected:
+        現在のページ番号を表すラベルを取得する
+        """
+        return f"{self.current_page + 1}/{max(self.page_count, 1)}"
+
+    def _update_buttons(self):
+        """
+        :protected:
+        現在のページ番号に合わせてボタンの状態を更新する
+        """
+        self.previous_button.disabled = self.current_page <= 0
+        self.next_button.disabled = self.current_page >= self.page_count - 1
+        self.indicator_button.label = self._indicator_label()
+
+    @staticmethod
+    def _page_to_kwargs(page: Page) -> Dict[str, Any]:
+        """
+        :protected:
+        ページを送信・編集用の引数に変換する
+        :param page: ページ
+        """
+        if isinstance(page, discord.Embed):
+            return {"content": None, "embed": page}
+        if isinstance(page, dict):
+            return page
+        return {"content": str(page), "embed": None}
+
+    async def start(self, destination: Union[Interaction, discord.abc.Messageable]):
+        """
+        最初のページを送信する
+        :param destination: 送信先のインタラクションまたはチャンネル
+        """
+        if self.page_count < 1:
+            raise ValueError("page_countは1以上にしてください")
+        page = await self.get_page(self.current_page)
+        kwargs = self._page_to_kwargs(page)
+        kwargs = {k: v for k, v in kwargs.items() if v is not None}
+        self._update_buttons()
+
+        if isinstance(destination, Interaction):
+            self.set_interaction(destination)
+            await destination.response.send_message(view=self, **kwargs)
+        else:
+            self.set_message(await destination.send(view=self, **kwargs))
+
+        self._prefetch_around(self.current_page)
+        return self
+
+    async def show_page(self, interaction: Interaction, index: int):
+        """
+        指定したページを表示する
+        :param interaction: ボタンを押したときのインタラクション
+        :param index: 表示するページ番号
+        """
+        page = await self.get_page(index)
+        self.current_page = index
+        self._update_buttons()
+        await interaction.response.edit_message(view=self, **self._page_to_kwargs(page))
+        self._prefetch_around(index)
+        return self
+
+    async def _on_previous(self, interaction: Interaction, view: ViewGenerator):
+        """
+        :protected:
+        前のページを表示する
+        """
+        await self.show_page(interaction, self.current_page - 1)
+
+    async def _on_next(self, interaction: Interaction, view: ViewGenerator):
+        """
+        :protected:
+        次のページを表示する
+        """
+        await self.show_page(interaction, self.current_page + 1)
+
+    def stop(self, delete_state: bool = True):
+        """
+        Viewを停止し、生成済みのページを破棄する
+        :param delete_state: 保存した状態を削除するかどうか
+        """
+        self.clear_cache()
+        super().stop(delete_state=delete_state)
@@ -4,6 +4,6 @@ setup(
     name="dpy-bot-utils",
     version="2.0.7",
     author="Saroniii",
-    packages=["dpy_bot_utils", "dpy_bot_utils.components"],
+    packages=["dpy_bot_utils", "dpy_bot_utils.components", "dpy_bot_utils.paginator"],
     description="Easy to use components for discord.py",
 )
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# テストでもベンチマークと同じDiscordオブジェクトの代用品を使う
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
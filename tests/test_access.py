@@ -0,0 +1,77 @@
+import time
+import unittest
+
+import discord
+from fakes import FakeBot, FakeGuild, FakeInteraction, FakeMember, FakeMessage, FakeRole
+
+from dpy_bot_utils import AccessRule, Button, ViewGenerator
+
+
+class AccessRuleTest(unittest.IsolatedAsyncioTestCase):
+
+    def test_users_roles_and_deny_list(self):
+        rule = AccessRule(user_ids=[1], role_ids=[10], deny_user_ids=[2])
+        self.assertTrue(rule.allows(FakeMember(1)))
+        self.assertTrue(rule.allows(FakeMember(3, role_ids=[10])))
+        self.assertFalse(rule.allows(FakeMember(2, role_ids=[10])))
+        self.assertFalse(rule.allows(FakeMember(4)))
+        self.assertTrue(AccessRule(deny_user_ids=[2]).allows(FakeMember(5)))
+
+    def test_permissions_prefer_channel_permissions(self):
+        rule = AccessRule(permissions=discord.Permissions(manage_messages=True))
+        member = FakeMember(1, permissions=discord.Permissions(manage_messages=True))
+        self.assertTrue(rule.allows(member))
+        self.assertFalse(rule.allows(member, discord.Permissions.none()))
+        self.assertTrue(rule.allows(FakeMember(2), discord.Permissions(manage_messages=True)))
+
+    def test_decisions_are_cached_until_invalidated(self):
+        rule = AccessRule(role_ids=[10])
+        guild = FakeGuild()
+        member = FakeMember(1, guild=guild)
+        self.assertFalse(rule.allows(member))
+        member.roles.append(FakeRole(10))
+        self.assertFalse(rule.allows(member))
+        AccessRule.invalidate_all(user_id=1, guild_id=guild.id)
+        self.assertTrue(rule.allows(member))
+
+    def test_decisions_expire_after_ttl(self):
+        rule = AccessRule(role_ids=[10], cache_ttl=0.01)
+        member = FakeMember(1)
+        self.assertFalse(rule.allows(member))
+        member.roles.append(FakeRole(10))
+        time.sleep(0.02)
+        self.assertTrue(rule.allows(member))
+
+    def test_cache_is_bounded(self):
+        rule = AccessRule(user_ids=[1], cache_size=2)
+        for user_id in range(5):
+            rule.allows(FakeMember(user_id))
+        self.assertEqual(len(rule.cache), 2)
+
+    async def test_role_update_listener_invalidates_cache(self):
+        bot = FakeBot()
+        AccessRule.register_listeners(bot)
+        rule = AccessRule(role_ids=[10])
+        before = FakeMember(1)
+        self.assertFalse(rule.allows(before))
+        after = FakeMember(1, guild=before.guild, role_ids=[10])
+        await bot.listeners["on_member_update"](before, after)
+        self.assertTrue(rule.allows(after))
+
+    async def test_view_rejects_users_outside_rule(self):
+        clicks = []
+
+        async def on_click(interaction, view):
+            clicks.append(interaction.user.id)
+
+        bot = FakeBot()
+        message = FakeMessage()
+        button = Button(label="button", func=on_click)
+        bot.add_view(ViewGenerator(components=[button], access_rule=AccessRule(user_ids=[1])), message.id)
+        for user_id in (1, 2):
+            await bot.dispatch(FakeInteraction(user=FakeMember(user_id), message=message, custom_id=button.custom_id))
+        self.assertEqual(clicks, [1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+import base64
+import unittest
+
+from fakes import FakeInteraction
+
+from dpy_bot_utils import ComponentRouter, CustomIdCodec
+
+
+class CustomIdCodecTest(unittest.IsolatedAsyncioTestCase):
+
+    def test_round_trip_of_supported_types(self):
+        codec = CustomIdCodec()
+        values = (None, True, False, 0, 1, -1, 2 ** 40, -(2 ** 40), "日本語", b"\x00\xff", 1.5)
+        prefix, decoded = codec.decode(codec.encode("shop", *values))
+        self.assertEqual(prefix, "shop")
+        self.assertEqual(decoded, values)
+
+    def test_prefix_may_contain_separator(self):
+        codec = CustomIdCodec(secret="key")
+        self.assertEqual(codec.decode(codec.encode("shop-cart", 3)), ("shop-cart", (3,)))
+
+    def test_unsupported_type_and_long_custom_id_are_rejected(self):
+        codec = CustomIdCodec()
+        with self.assertRaises(TypeError):
+            codec.encode("shop", [1])
+        with self.assertRaises(ValueError):
+            codec.encode("shop", "x" * 100)
+
+    def test_tampered_payload_is_rejected(self):
+        codec = CustomIdCodec(secret="key")
+        prefix, _, payload = codec.encode("shop", 42).rpartition("-")
+        body = bytearray(base64.b64decode(payload + "=" * (-len(payload) % 4)))
+        body[2] ^= 1
+        tampered = base64.b64encode(bytes(body)).rstrip(b"=").decode()
+        with self.assertRaises(ValueError):
+            codec.decode_payload(prefix, tampered)
+        with self.assertRaises(ValueError):
+            codec.decode_payload("other", payload)
+        with self.assertRaises(ValueError):
+            CustomIdCodec(secret="other").decode(codec.encode("shop", 42))
+
+    def test_other_version_and_broken_payload_are_rejected(self):
+        custom_id = CustomIdCodec(version=1).encode("shop", 1)
+        with self.assertRaises(ValueError):
+            CustomIdCodec(version=2).decode(custom_id)
+        with self.assertRaises(ValueError):
+            CustomIdCodec().decode("shop-!!!")
+        with self.assertRaises(ValueError):
+            CustomIdCodec().decode("shop")
+        with self.assertRaises(ValueError):
+            CustomIdCodec(version=256)
+
+    async def test_router_passes_decoded_state(self):
+        codec = CustomIdCodec(secret="key")
+        calls = []
+        router = ComponentRouter()
+        router.add_route("vote", lambda interaction, state: calls.append(state), codec=codec)
+        self.assertTrue(await router.dispatch(FakeInteraction(custom_id=codec.encode("vote", 7, "yes"))))
+        self.assertFalse(await router.dispatch(FakeInteraction(custom_id="vote-AAAA")))
+        self.assertEqual(calls, [(7, "yes")])
+
+
+if __name__ == "__main__":
+    unittest.main()
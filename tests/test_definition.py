@@ -0,0 +1,108 @@
+import json
+import unittest
+
+from fakes import FakeBot, FakeInteraction, FakeMessage
+
+from dpy_bot_utils import (
+    compile_view, compile_modal, DefinitionError, ButtonStyle, ViewUsedBehaviorType, ViewTemplate, ModalFactory,
+)
+
+
+class CompileViewTest(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.clicks = []
+
+    async def on_ok(self, interaction, view):
+        self.clicks.append(interaction.user.id)
+
+    def definition(self) -> dict:
+        return {
+            "prefix": "menu",
+            "used_flag": "disable_items",
+            "components": [
+                {"type": "button", "label": "OK", "style": "success", "on_click": "ok"},
+                {"type": "button", "label": "Docs", "url": "https://example.com"},
+                {"type": "select", "placeholder": "pick", "options": [{"label": "A", "value": 1}, {"label": "B"}]},
+            ],
+        }
+
+    async def test_compiles_json_into_template(self):
+        template = compile_view(json.dumps(self.definition()), {"ok": self.on_ok})
+        self.assertIsInstance(template, ViewTemplate)
+        view = template.create()
+        ok, docs, select = view.children
+        self.assertEqual(view.used_flag, ViewUsedBehaviorType.DISABLE_ITEMS)
+        self.assertTrue(ok.custom_id.startswith("menu-"))
+        self.assertEqual(ok.style, ButtonStyle.success)
+        self.assertEqual(docs.url, "https://example.com")
+        self.assertEqual(docs.style, ButtonStyle.link)
+        self.assertEqual([option.value for option in select.options], ["1", "B"])
+
+    async def test_compiled_view_dispatches_named_handler(self):
+        bot = FakeBot()
+        message = FakeMessage()
+        view = compile_view(self.definition(), {"ok": self.on_ok}).create(message=message)
+        bot.add_view(view, message.id)
+        interaction = FakeInteraction(message=message, custom_id=view.children[0].custom_id)
+        await bot.dispatch(interaction)
+        self.assertEqual(self.clicks, [interaction.user.id])
+
+    def assert_error(self, definition, handlers=None, message: str = None):
+        with self.assertRaises(DefinitionError) as context:
+            compile_view(definition, handlers)
+        if message:
+            self.assertIn(message, str(context.exception))
+
+    def test_view_errors_name_the_offending_path(self):
+        self.assert_error("{", message="JSON")
+        self.assert_error([], message="辞書")
+        self.assert_error({"colour": 1}, message="colour")
+        self.assert_error({"components": [{"type": "link"}]}, message="view.components[0].type")
+        self.assert_error({"components": [{"type": "button", "on_click": "missing"}]}, message="'missing'")
+        self.assert_error({"components": [{"type": "button", "style": "rainbow"}]}, message="style")
+        self.assert_error({"used_flag": "sometimes"}, message="used_flag")
+        self.assert_error({"components": [{"type": "select", "options": []}]}, message="options")
+        self.assert_error({"components": [{"type": "select", "options": [{"value": 1}]}]},
+                          message="view.components[0].options[0].label")
+        self.assert_error({"components": [{"type": "button", "label": str(i)} for i in range(26)]}, message="25")
+
+
+class CompileModalTest(unittest.IsolatedAsyncioTestCase):
+
+    async def test_compiles_modal_factory_with_validators(self):
+        submitted = []
+
+        async def on_submit(interaction, view, modal):
+            submitted.append(modal)
+
+        factory = compile_modal({
+            "title": "profile",
+            "on_submit": "submit",
+            "inputs": [{"label": "age", "min_value": 0, "max_value": 150, "integer": True, "default": "200"}],
+        }, {"submit": on_submit})
+        self.assertIsInstance(factory, ModalFactory)
+        modal = factory.create()
+        self.assertIsNot(modal, factory.create())
+        interaction = FakeInteraction()
+        await modal.on_submit(interaction)
+        self.assertEqual(submitted, [])
+        self.assertEqual(len(interaction.response.messages), 1)
+
+    def test_modal_errors(self):
+        for definition, message in (
+            ({"inputs": [{}]}, "modal.title"),
+            ({"title": "t", "inputs": []}, "modal.inputs"),
+            ({"title": "t", "inputs": [{}] * 6}, "modal.inputs"),
+            ({"title": "t", "inputs": [{"pattern": "("}]}, "modal.inputs[0].pattern"),
+            ({"title": "t", "inputs": [{"style": "huge"}]}, "modal.inputs[0].style"),
+            ({"title": "t", "inputs": [{"colour": 1}]}, "colour"),
+            ({"title": "t", "on_submit": "missing", "inputs": [{}]}, "'missing'"),
+        ):
+            with self.assertRaises(DefinitionError) as context:
+                compile_modal(definition)
+            self.assertIn(message, str(context.exception))
+
+
+if __name__ == "__main__":
+    unittest.main()
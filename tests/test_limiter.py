@@ -0,0 +1,70 @@
+import asyncio
+import unittest
+
+from fakes import FakeBot, FakeInteraction, FakeMessage, FakeUser
+
+from dpy_bot_utils import ViewGenerator, Button, ClickThrottle, ConcurrencyLimiter, DropPolicyType, RespondTargetType
+
+
+class ConcurrencyLimiterTest(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.bot = FakeBot()
+        self.message = FakeMessage()
+        self.started = asyncio.Event()
+        self.release = asyncio.Event()
+
+    async def on_click(self, interaction, view):
+        self.started.set()
+        await self.release.wait()
+
+    def click(self, user: FakeUser, button: Button) -> FakeInteraction:
+        return FakeInteraction(user=user, message=self.message, custom_id=button.custom_id)
+
+    async def test_rejected_interactions_do_not_take_slots(self):
+        author = FakeUser()
+        limiter = ConcurrencyLimiter(max_concurrency=1, max_queue=0, drop_policy=DropPolicyType.NOTICE)
+        button = Button(label="button", func=self.on_click)
+        view = ViewGenerator(
+            components=[button], author=author, respond_flag=RespondTargetType.ONLY_AUTHOR, concurrency_limiter=limiter
+        )
+        self.bot.add_view(view, self.message.id)
+
+        running = asyncio.ensure_future(self.bot.dispatch(self.click(author, button)))
+        await self.started.wait()
+        rejected = self.click(FakeUser(), button)
+        await self.bot.dispatch(rejected)
+        self.assertEqual(limiter.dropped, 0)
+        self.assertEqual(rejected.response.messages, [])
+
+        dropped = self.click(author, button)
+        await self.bot.dispatch(dropped)
+        self.assertEqual(limiter.dropped, 1)
+        self.assertEqual(dropped.response.messages, [limiter.drop_message])
+
+        self.release.set()
+        await running
+
+    async def test_throttle_rejects_before_limiter_queues(self):
+        user = FakeUser()
+        limiter = ConcurrencyLimiter(max_concurrency=1, max_queue=0, drop_policy=DropPolicyType.NOTICE)
+        throttle = ClickThrottle(per_user=1, burst=1, deny_policy=DropPolicyType.NOTICE)
+        button = Button(label="button", func=self.on_click)
+        view = ViewGenerator(components=[button], concurrency_limiter=limiter, click_throttle=throttle)
+        self.bot.add_view(view, self.message.id)
+
+        running = asyncio.ensure_future(self.bot.dispatch(self.click(user, button)))
+        await self.started.wait()
+        throttled = self.click(user, button)
+        await self.bot.dispatch(throttled)
+        self.assertEqual(throttle.throttled, 1)
+        self.assertEqual(limiter.dropped, 0)
+        self.assertEqual(len(throttled.response.messages), 1)
+        self.assertNotEqual(throttled.response.messages[0], limiter.drop_message)
+
+        self.release.set()
+        await running
+
+
+if __name__ == "__main__":
+    unittest.main()
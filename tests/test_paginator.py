@@ -0,0 +1,74 @@
+import asyncio
+import unittest
+
+from fakes import FakeBot, FakeChannel, FakeInteraction
+
+from dpy_bot_utils.paginator import Paginator
+
+
+class PaginatorTest(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.rendered = []
+
+    async def page_source(self, index: int) -> str:
+        self.rendered.append(index)
+        return f"page {index}"
+
+    async def settle(self):
+        for _ in range(3):
+            await asyncio.sleep(0)
+
+    async def test_pages_are_rendered_once_and_cached(self):
+        paginator = Paginator(page_source=self.page_source, page_count=5, prefetch=False)
+        self.assertEqual(await paginator.get_page(2), "page 2")
+        self.assertEqual(await paginator.get_page(2), "page 2")
+        self.assertEqual(self.rendered, [2])
+        with self.assertRaises(IndexError):
+            await paginator.get_page(5)
+
+    async def test_start_prefetches_neighbours_and_next_button_uses_cache(self):
+        bot = FakeBot()
+        paginator = Paginator(page_source=self.page_source, page_count=5)
+        await paginator.start(FakeChannel())
+        await self.settle()
+        self.assertEqual(sorted(self.rendered), [0, 1])
+        bot.add_view(paginator, paginator.message.id)
+
+        await bot.dispatch(FakeInteraction(message=paginator.message, custom_id=paginator.next_button.custom_id))
+        await self.settle()
+        self.assertEqual(paginator.current_page, 1)
+        self.assertEqual(self.rendered.count(1), 1)
+        self.assertIn(2, paginator.page_cache)
+        self.assertFalse(paginator.previous_button.disabled)
+
+    async def test_cache_keeps_current_page_and_neighbours(self):
+        paginator = Paginator(page_source=self.page_source, page_count=10, cache_size=1)
+        for index in range(4):
+            await paginator.get_page(index)
+        self.assertEqual(len(paginator.page_cache), 3)
+        paginator.set_prefetch(False).set_cache_size(1)
+        self.assertEqual(list(paginator.page_cache), [3])
+
+    async def test_failed_prefetch_is_rendered_again(self):
+        failures = {1}
+
+        async def page_source(index: int) -> str:
+            if index in failures:
+                failures.discard(index)
+                raise RuntimeError("render")
+            return f"page {index}"
+
+        paginator = Paginator(page_source=page_source, page_count=3)
+        await paginator.start(FakeChannel())
+        await self.settle()
+        self.assertNotIn(1, paginator.page_cache)
+        self.assertEqual(await paginator.get_page(1), "page 1")
+
+    async def test_start_requires_pages(self):
+        with self.assertRaises(ValueError):
+            await Paginator(page_source=self.page_source, page_count=0).start(FakeChannel())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+import unittest
+
+from fakes import FakeBot, FakeInteraction
+
+from dpy_bot_utils import ComponentRouter
+
+
+class ComponentRouterTest(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.calls = []
+        self.router = ComponentRouter()
+
+    async def record(self, interaction, key):
+        self.calls.append(key)
+
+    async def test_dispatch_passes_custom_id_without_prefix(self):
+        self.router.add_route("shop", self.record)
+        self.assertTrue(await self.router.dispatch(FakeInteraction(custom_id="shop-item-42")))
+        self.assertEqual(self.calls, ["item-42"])
+
+    async def test_longest_prefix_wins(self):
+        self.router.add_route("shop", self.record)
+        self.router.add_route("shop-cart", lambda interaction, key: self.calls.append(("cart", key)))
+        await self.router.dispatch(FakeInteraction(custom_id="shop-cart-1"))
+        await self.router.dispatch(FakeInteraction(custom_id="shop-item-1"))
+        self.assertEqual(self.calls, [("cart", "1"), "item-1"])
+        self.assertEqual(self.router.resolve("shop-cart-1")[1:], ("shop-cart", "1"))
+
+    async def test_unknown_and_removed_prefixes_are_not_dispatched(self):
+        self.router.add_route("shop", self.record)
+        self.assertFalse(await self.router.dispatch(FakeInteraction(custom_id="shopping-1")))
+        self.assertIsNone(self.router.resolve("other-1"))
+        self.router.remove_route("shop")
+        self.assertFalse(await self.router.dispatch(FakeInteraction(custom_id="shop-1")))
+        self.assertEqual(self.calls, [])
+
+    async def test_route_decorator_and_bot_listener(self):
+        bot = FakeBot()
+        self.router.set_bot(bot)
+
+        @self.router.route("vote")
+        def on_vote(interaction, key):
+            self.calls.append(key)
+
+        await bot.dispatch(FakeInteraction(custom_id="vote-yes"))
+        self.assertEqual(self.calls, ["yes"])
+
+    async def test_namespaced_prefixes_resolve_to_deepest_route(self):
+        self.router.add_route("shop", lambda interaction, key: self.calls.append(("shop", key)))
+        self.router.add_route("shop:cart", lambda interaction, key: self.calls.append(("cart", key)))
+        self.router.group("shop").group("cart").add_route("add", self.record)
+        await self.router.dispatch(FakeInteraction(custom_id="shop:cart:add-7"))
+        await self.router.dispatch(FakeInteraction(custom_id="shop:cart-7"))
+        await self.router.dispatch(FakeInteraction(custom_id="shop-7"))
+        self.assertEqual(self.calls, ["7", ("cart", "7"), ("shop", "7")])
+        self.assertIsNone(self.router.resolve("shop:cart:remove-7"))
+
+    async def test_exact_namespaced_prefix_and_group_decorator(self):
+        group = self.router.group("admin")
+
+        @group.route("panel")
+        async def on_panel(interaction, key):
+            self.calls.append(key)
+
+        await self.router.dispatch(FakeInteraction(custom_id="admin:panel"))
+        self.assertEqual(self.calls, [""])
+        self.assertIsNone(self.router.resolve("admin:other-1"))
+
+    def test_removing_route_prunes_empty_namespaces(self):
+        self.router.add_route("a:b:c", self.record)
+        self.router.add_route("a:x", self.record)
+        self.router.remove_route("a:b:c")
+        self.assertNotIn("b", self.router._root.children["a"].children)
+        self.assertIsNotNone(self.router.resolve("a:x-1"))
+        self.router.remove_route("a:x")
+        self.assertEqual(self.router._root.children, {})
+
+    def test_invalid_separators_are_rejected(self):
+        with self.assertRaises(ValueError):
+            ComponentRouter(separator="")
+        with self.assertRaises(ValueError):
+            ComponentRouter(separator=":", namespace_separator=":")
+        with self.assertRaises(ValueError):
+            self.router.add_route("", self.record)
+
+
+if __name__ == "__main__":
+    unittest.main()
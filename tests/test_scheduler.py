@@ -0,0 +1,64 @@
+import asyncio
+import time
+import unittest
+
+from dpy_bot_utils import EditScheduler, EditPriority
+
+
+class EditSchedulerTest(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.calls = []
+
+    def edit(self, name: str):
+        async def func():
+            self.calls.append((name, time.monotonic()))
+            return name
+
+        return func
+
+    async def test_user_edits_run_before_cleanup_edits(self):
+        scheduler = EditScheduler(rate=5, per=1.0)
+        futures = [
+            scheduler.submit(1, "a", self.edit("cleanup a"), EditPriority.CLEANUP),
+            scheduler.submit(1, "b", self.edit("cleanup b"), EditPriority.CLEANUP),
+            scheduler.submit(1, "c", self.edit("user c"), EditPriority.USER),
+        ]
+        await asyncio.gather(*futures)
+        self.assertEqual([name for name, _ in self.calls], ["user c", "cleanup a", "cleanup b"])
+
+    async def test_edits_wait_for_rate_window(self):
+        scheduler = EditScheduler(rate=2, per=0.1)
+        futures = [scheduler.submit(1, key, self.edit(key)) for key in ("a", "b", "c")]
+        await asyncio.gather(*futures)
+        first, _, third = (at for _, at in self.calls)
+        self.assertGreaterEqual(third - first, 0.09)
+
+    async def test_buckets_are_independent(self):
+        scheduler = EditScheduler(rate=1, per=0.2)
+        started = time.monotonic()
+        await asyncio.gather(scheduler.submit(1, "a", self.edit("a")), scheduler.submit(2, "b", self.edit("b")))
+        self.assertLess(time.monotonic() - started, 0.1)
+
+    async def test_pending_edit_is_superseded_by_latest(self):
+        scheduler = EditScheduler()
+        first = scheduler.submit(1, "a", self.edit("old"), EditPriority.CLEANUP)
+        second = scheduler.submit(1, "a", self.edit("new"), EditPriority.USER)
+        self.assertIs(first, second)
+        self.assertEqual(await first, "new")
+        self.assertEqual([name for name, _ in self.calls], ["new"])
+        self.assertEqual(scheduler.superseded_count, 1)
+
+    async def test_failed_edit_is_set_on_future(self):
+        scheduler = EditScheduler()
+
+        async def fail():
+            raise RuntimeError("edit")
+
+        with self.assertRaises(RuntimeError):
+            await scheduler.submit(1, "a", fail)
+        self.assertEqual(await scheduler.submit(1, "b", self.edit("b")), "b")
+
+
+if __name__ == "__main__":
+    unittest.main()
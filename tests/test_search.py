@@ -0,0 +1,91 @@
+import unittest
+
+from fakes import FakeBot, FakeInteraction, FakeMessage
+
+from dpy_bot_utils import ViewGenerator, ComponentRouter, SearchableSelect, SelectOption
+from dpy_bot_utils.components.search import OptionIndex
+
+
+class OptionIndexTest(unittest.TestCase):
+
+    def build_index(self) -> OptionIndex:
+        index = OptionIndex()
+        for position, label in enumerate(["Apple Pie", "apricot", "Banana", "Green Apple"]):
+            index.add(position, label, f"value-{position}")
+        return index
+
+    def test_search_matches_label_and_words_by_prefix(self):
+        positions, has_next = self.build_index().search("ap")
+        self.assertEqual(sorted(positions), [0, 1, 3])
+        self.assertFalse(has_next)
+
+    def test_search_is_case_insensitive_and_matches_values(self):
+        index = self.build_index()
+        self.assertEqual(index.search("BANANA")[0], [2])
+        self.assertEqual(index.search("value-3")[0], [3])
+        self.assertEqual(index.search("cherry"), ([], False))
+
+    def test_search_pages_without_duplicates(self):
+        index = self.build_index()
+        first, has_next = index.search("ap", limit=2)
+        second, has_more = index.search("ap", offset=2, limit=2)
+        self.assertTrue(has_next)
+        self.assertFalse(has_more)
+        self.assertEqual(sorted(first + second), [0, 1, 3])
+
+    def test_added_entries_are_searchable_after_build(self):
+        index = self.build_index()
+        index.search("a")
+        index.add(4, "Avocado")
+        self.assertIn(4, index.search("avo")[0])
+
+
+class SearchableSelectTest(unittest.IsolatedAsyncioTestCase):
+
+    def build_select(self, count: int = 60) -> SearchableSelect:
+        return SearchableSelect(options=[SelectOption(label=f"item {i:02}") for i in range(count)])
+
+    def test_pages_through_options(self):
+        select = self.build_select()
+        self.assertEqual(len(select.options), 25)
+        self.assertTrue(select.previous_button.disabled)
+        self.assertFalse(select.next_button.disabled)
+
+        select.set_page(2)
+        self.assertEqual([o.label for o in select.options], [f"item {i}" for i in range(50, 60)])
+        self.assertTrue(select.next_button.disabled)
+
+    def test_search_without_result_disables_select(self):
+        select = self.build_select()
+        select.search("item 1")
+        self.assertEqual([o.label for o in select.options], [f"item {i}" for i in range(10, 20)])
+        select.search("missing")
+        self.assertTrue(select.disabled)
+        self.assertEqual(select.options[0].label, select.no_result_label)
+
+    async def test_prefixed_view_prefixes_select_and_controls(self):
+        select = self.build_select()
+        view = ViewGenerator(prefix="shop", components=[select, *select.controls()])
+        for item in view.children:
+            self.assertTrue(item.custom_id.startswith("shop-"), item.custom_id)
+
+        routed = []
+        router = ComponentRouter()
+        router.add_route("shop", lambda interaction, key: routed.append(key))
+        interaction = FakeInteraction(custom_id=select.custom_id, component_type=3)
+        self.assertTrue(await router.dispatch(interaction))
+        self.assertEqual(routed, [select.custom_id[len("shop-"):]])
+
+    async def test_next_button_changes_page_through_dispatch(self):
+        bot = FakeBot()
+        message = FakeMessage()
+        select = self.build_select()
+        view = ViewGenerator(prefix="shop", components=[select, *select.controls()])
+        bot.add_view(view, message.id)
+        await bot.dispatch(FakeInteraction(message=message, custom_id=select.next_button.custom_id))
+        self.assertEqual(select.page, 1)
+        self.assertEqual(select.options[0].label, "item 25")
+
+
+if __name__ == "__main__":
+    unittest.main()
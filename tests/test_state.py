@@ -0,0 +1,79 @@
+import asyncio
+import os
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from fakes import FakeBot, FakeInteraction, FakeMessage, FakeUser
+
+from dpy_bot_utils import ViewGenerator, Button, ComponentRouter, MemoryStateStore, SQLiteStateStore, StateHydrator, StateStore
+
+
+class StateStoreTest(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.clicks = []
+        self.path = os.path.join(tempfile.mkdtemp(), "state.sqlite3")
+
+    def build_view(self) -> ViewGenerator:
+        async def on_click(interaction, view):
+            self.clicks.append(view.author.id)
+
+        return ViewGenerator(prefix="menu", components=[Button(label="buy", func=on_click).set_custom_id("buy")])
+
+    def test_state_store_is_abstract(self):
+        with self.assertRaises(TypeError):
+            StateStore()
+
+    async def test_stop_deletes_state(self):
+        store = MemoryStateStore()
+        message = FakeMessage()
+        view = self.build_view().set_message(message).set_state_store(store)
+        self.assertIsNotNone(store.load(str(message.id)))
+        view.stop()
+        self.assertIsNone(store.load(str(message.id)))
+
+    async def test_detach_keeps_state(self):
+        store = MemoryStateStore()
+        message = FakeMessage()
+        view = self.build_view().set_message(message).set_state_store(store)
+        ComponentRouter.detach_view(view)
+        self.assertTrue(view.is_finished())
+        self.assertIsNotNone(store.load(str(message.id)))
+        ComponentRouter.detach_view(self.build_view().set_message(message).set_state_store(store), delete_state=True)
+        self.assertIsNone(store.load(str(message.id)))
+
+    def test_memory_store_evicts_expired_on_save(self):
+        store = MemoryStateStore(ttl=10)
+        now = time.monotonic()
+        with mock.patch("dpy_bot_utils.components.state.time.monotonic", return_value=now):
+            store.save("old", {"prefix": "menu"})
+        with mock.patch("dpy_bot_utils.components.state.time.monotonic", return_value=now + 5):
+            store.save("mid", {"prefix": "menu"})
+        with mock.patch("dpy_bot_utils.components.state.time.monotonic", return_value=now + 11):
+            store.save("new", {"prefix": "menu"})
+        self.assertEqual(list(store.states), ["mid", "new"])
+
+    async def test_hydrator_restores_view_on_interaction(self):
+        store = SQLiteStateStore(self.path)
+        message = FakeMessage()
+        user = FakeUser()
+        custom_id = self.build_view().set_author(user).set_message(message).set_state_store(store).children[0].custom_id
+        store.close()
+
+        store = SQLiteStateStore(self.path)
+        bot = FakeBot()
+        StateHydrator(store, bot=bot).add_factory("menu", self.build_view)
+        await asyncio.gather(
+            bot.dispatch(FakeInteraction(user=user, message=message, custom_id=custom_id)),
+            bot.dispatch(FakeInteraction(user=user, message=message, custom_id=custom_id)),
+        )
+        self.assertEqual(self.clicks, [user.id, user.id])
+        views = {item.view for item in bot._connection._view_store._views[message.id].values()}
+        self.assertEqual(len(views), 1)
+        store.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
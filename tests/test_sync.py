@@ -0,0 +1,100 @@
+import asyncio
+import unittest
+
+from fakes import FakeMessage
+
+from dpy_bot_utils import ViewGenerator, Button, ViewTemplate, EditScheduler
+
+
+async def on_click(interaction, view):
+    pass
+
+
+class SyncMessageTest(unittest.IsolatedAsyncioTestCase):
+
+    def build_view(self, **kwargs) -> ViewGenerator:
+        return ViewGenerator(components=[Button(label="button", func=on_click)], **kwargs)
+
+    async def test_unchanged_state_skips_edit(self):
+        view = self.build_view(message=FakeMessage())
+        view.to_components()
+        await view.all_enable()
+        self.assertEqual(view.message.edit_count, 0)
+        self.assertEqual(view.skipped_edits, 1)
+
+    async def test_templated_view_compares_current_state(self):
+        base = self.build_view()
+        view = ViewTemplate(base).create().set_message(FakeMessage())
+        view.to_components()
+        view.children[0].label = "changed"
+        await view.sync_message()
+        self.assertEqual(view.message.edit_count, 1)
+        self.assertEqual(view.message.components[0]["components"][0]["label"], "changed")
+
+    async def test_enable_after_scheduled_close_is_not_skipped(self):
+        view = self.build_view(message=FakeMessage(delay=0.01), edit_scheduler=EditScheduler())
+        view.to_components()
+        close = asyncio.ensure_future(view.close_view())
+        await asyncio.sleep(0)
+        await view.all_enable()
+        await close
+        self.assertEqual(view.skipped_edits, 0)
+        self.assertIsNotNone(view.message.components)
+
+    async def test_failed_edit_rolls_back_fingerprint(self):
+        message = FakeMessage()
+        view = self.build_view(message=message)
+        view.to_components()
+
+        async def fail(**kwargs):
+            raise RuntimeError
+
+        message.edit = fail
+        with self.assertRaises(RuntimeError):
+            await view.close_view()
+        self.assertTrue(view.is_synced())
+        self.assertFalse(view.is_synced(close=True))
+
+
+class CoalescedEditTest(unittest.IsolatedAsyncioTestCase):
+
+    def build_view(self, message: FakeMessage) -> ViewGenerator:
+        return ViewGenerator(
+            components=[Button(label="button", func=on_click)], message=message,
+            coalesce_edits=True, coalesce_window=0.01,
+        )
+
+    async def test_edits_within_window_are_sent_once_with_last_state(self):
+        view = self.build_view(FakeMessage())
+        await view.all_disable()
+        await view.all_enable()
+        await view.all_disable()
+        self.assertEqual(view.message.edit_count, 0)
+        await asyncio.sleep(0.05)
+        self.assertEqual(view.message.edit_count, 1)
+        self.assertTrue(view.message.components[0]["components"][0]["disabled"])
+
+    async def test_flush_edits_sends_immediately(self):
+        view = self.build_view(FakeMessage())
+        future = await view.sync_message(close=True)
+        self.assertIs(await view.flush_edits(), view.message)
+        self.assertTrue(future.done())
+        self.assertEqual(view.message.edit_count, 1)
+        self.assertIsNone(view.message.components)
+        self.assertIsNone(await view.flush_edits())
+
+    async def test_failed_coalesced_edit_is_logged(self):
+        message = FakeMessage()
+
+        async def fail(**kwargs):
+            raise RuntimeError("edit")
+
+        message.edit = fail
+        view = self.build_view(message)
+        with self.assertLogs("dpy_bot_utils.components.view", "ERROR"):
+            await view.all_disable()
+            await asyncio.sleep(0.05)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,133 @@
+import asyncio
+import unittest
+
+from discord.ui.view import View
+from fakes import FakeChannel
+
+from dpy_bot_utils import (
+    ViewGenerator, Button, Select, SelectOption, ViewTemplate, TimeoutWheel, ViewUsedBehaviorType, InteractionMetrics,
+    EditScheduler,
+)
+
+
+async def on_click(interaction, view):
+    pass
+
+
+class ViewTemplateTest(unittest.IsolatedAsyncioTestCase):
+
+    def build_template(self) -> ViewTemplate:
+        view = ViewGenerator(prefix="menu")
+        view.add_components([Button(label=f"button {i}", func=on_click) for i in range(3)])
+        return ViewTemplate(view)
+
+    async def test_created_view_uses_cached_payload(self):
+        template = self.build_template()
+        view = template.create()
+        self.assertIs(view.to_components(), template.to_components())
+
+    async def test_remove_item_and_set_label_invalidate_cached_payload(self):
+        view = self.build_template().create()
+        view.remove_item(view.children[2])
+        view.children[0].set_label("changed")
+        self.assertEqual(view.to_components(), View.to_components(view))
+        self.assertEqual(len(view.to_components()[0]["components"]), 2)
+        self.assertEqual(view.to_components()[0]["components"][0]["label"], "changed")
+
+    async def test_add_and_clear_items_invalidate_cached_payload(self):
+        view = self.build_template().create()
+        view.add_item(Button(label="added", func=on_click))
+        self.assertEqual(len(view.to_components()[0]["components"]), 4)
+        view.clear_items()
+        self.assertEqual(view.to_components(), [])
+
+    async def test_item_changes_do_not_leak_into_template(self):
+        template = self.build_template()
+        view = template.create()
+        view.children[0].set_disabled(True)
+        self.assertFalse(template.create().to_components()[0]["components"][0].get("disabled", False))
+
+    async def test_select_options_do_not_leak_into_template(self):
+        select = Select(placeholder="select").add_option(SelectOption(label="first", value="1", func=on_click))
+        template = ViewTemplate(ViewGenerator(prefix="menu", components=[select]))
+        view = template.create()
+        view.children[0].add_option(SelectOption(label="second", value="2", func=on_click))
+        self.assertEqual(len(select.event_handlers), 1)
+        self.assertEqual(len(template.create().children[0].event_handlers), 1)
+        self.assertEqual(len(view.children[0].event_handlers), 2)
+
+    async def test_create_copies_view_settings(self):
+        metrics = InteractionMetrics()
+        scheduler = EditScheduler()
+        base = ViewGenerator(
+            prefix="menu", timeout=30, metrics=metrics, edit_scheduler=scheduler, serialize_callbacks=True,
+            only_one_respond=True, used_flag=ViewUsedBehaviorType.DISABLE_ITEMS,
+        )
+        base.add_components([Button(label="button", func=on_click)])
+        base.custom_setting = "kept"
+        view = ViewTemplate(base).create(prefix="other")
+        self.assertIs(view.metrics, metrics)
+        self.assertIs(view.edit_scheduler, scheduler)
+        self.assertEqual(view.timeout, 30)
+        self.assertTrue(view.serialize_callbacks)
+        self.assertIsNot(view._callback_lock, base._callback_lock)
+        self.assertTrue(view.only_one_respond)
+        self.assertEqual(view.used_flag, ViewUsedBehaviorType.DISABLE_ITEMS)
+        self.assertEqual(view.custom_setting, "kept")
+        self.assertEqual(view.custom_id_prefix, "other")
+        self.assertNotEqual(view.id, base.id)
+
+    async def test_unsent_template_base_is_not_armed_in_timeout_wheel(self):
+        wheel = TimeoutWheel(tick=0.01)
+        base = ViewGenerator(timeout=0.02, timeout_wheel=wheel, used_flag=ViewUsedBehaviorType.DISABLE_ITEMS)
+        base.add_components([Button(label="button", func=on_click)])
+        template = ViewTemplate(base)
+        self.assertFalse(wheel.is_armed(base))
+
+        await asyncio.sleep(0.05)
+        self.assertFalse(base.is_finished())
+        view = template.create()
+        view.invalidate_components()
+        self.assertFalse(view.children[0].disabled)
+        self.assertFalse(wheel.is_armed(view))
+
+        view.set_message(object())
+        self.assertTrue(wheel.is_armed(view))
+        view.stop()
+
+    async def collect(self, template: ViewTemplate, destinations, **kwargs):
+        return [result async for result in template.send_many(destinations, "hello", **kwargs)]
+
+    async def test_send_many_reports_every_destination(self):
+        template = self.build_template()
+        channels = [FakeChannel() for _ in range(5)]
+        results = await asyncio.wait_for(self.collect(template, channels, concurrency=2), 1)
+        self.assertEqual(sorted(result.index for result in results), list(range(5)))
+        self.assertEqual([result.completed for result in results], list(range(1, 6)))
+        self.assertTrue(all(result.ok and result.view.message is result.message for result in results))
+
+    async def test_send_many_reports_failures_from_create_and_send(self):
+        template = self.build_template()
+        create = template.create
+        calls = []
+
+        def failing_create(**kwargs):
+            calls.append(kwargs)
+            if len(calls) == 1:
+                raise RuntimeError("create")
+            return create(**kwargs)
+
+        class BrokenChannel(FakeChannel):
+            async def send(self, content: str = None, **kwargs):
+                raise RuntimeError("send")
+
+        template.create = failing_create
+        channels = [FakeChannel(), BrokenChannel(), FakeChannel()]
+        results = await asyncio.wait_for(self.collect(template, channels, concurrency=1), 1)
+        errors = sorted(str(result.error) for result in results if not result.ok)
+        self.assertEqual(errors, ["create", "send"])
+        self.assertEqual(len(results), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
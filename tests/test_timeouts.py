@@ -0,0 +1,37 @@
+import asyncio
+import unittest
+import uuid
+
+from dpy_bot_utils import TimeoutWheel
+
+
+class ExpiringView:
+
+    def __init__(self, fail: bool = False):
+        self.id = uuid.uuid4().hex
+        self.fail = fail
+        self.expired = False
+
+    async def expire(self):
+        if self.fail:
+            raise RuntimeError("expire failed")
+        self.expired = True
+
+
+class TimeoutWheelTest(unittest.IsolatedAsyncioTestCase):
+
+    async def test_failed_expire_is_logged_and_others_still_expire(self):
+        wheel = TimeoutWheel(tick=0.01)
+        failing, view = ExpiringView(fail=True), ExpiringView()
+        wheel.arm(failing, 0.01).arm(view, 0.01)
+        with self.assertLogs("dpy_bot_utils.components.timeouts", level="ERROR") as logs:
+            await asyncio.sleep(0.05)
+        self.assertTrue(view.expired)
+        self.assertEqual(len(wheel), 0)
+        self.assertEqual(len(logs.records), 1)
+        self.assertIn(failing.id, logs.output[0])
+        self.assertIsInstance(logs.records[0].exc_info[1], RuntimeError)
+
+
+if __name__ == "__main__":
+    unittest.main()
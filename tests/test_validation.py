@@ -0,0 +1,97 @@
+import re
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from fakes import FakeInteraction
+
+from dpy_bot_utils import (
+    ViewGenerator, Modal, TextInput, Validator, RegexValidator, RangeValidator, LengthValidator, ChoiceValidator,
+)
+
+
+class ValidatorTest(unittest.TestCase):
+
+    def test_validator_is_abstract(self):
+        with self.assertRaises(TypeError):
+            Validator()
+
+    def test_regex_validator_matches_whole_value(self):
+        validator = RegexValidator(r"\d{3}", message="bad")
+        self.assertIsNone(validator("123"))
+        self.assertEqual(validator("1234"), "bad")
+        self.assertIsNone(RegexValidator(re.compile("abc", re.I))("ABC"))
+
+    def test_range_validator(self):
+        validator = RangeValidator(0, 150, integer=True)
+        self.assertIsNone(validator("150"))
+        self.assertEqual(validator("151"), "0から150の範囲で入力してください")
+        self.assertEqual(validator("1.5"), "整数を入力してください")
+        self.assertEqual(RangeValidator(0)("nan"), "数値を入力してください")
+        self.assertEqual(RangeValidator(max_value=1)("2"), "1以下の値を入力してください")
+
+    def test_length_and_choice_validators(self):
+        self.assertEqual(LengthValidator(2, 3)("a"), "2文字以上で入力してください")
+        self.assertEqual(LengthValidator(2, 3)("abcd"), "3文字以下で入力してください")
+        self.assertIsNone(ChoiceValidator(["Yes", "No"], case_sensitive=False)("yes"))
+        self.assertIsNotNone(ChoiceValidator(["Yes", "No"])("yes"))
+
+    def test_optional_empty_input_is_not_validated(self):
+        text_input = TextInput(label="age", required=False, pre_fill_value="").set_range(0, 150)
+        self.assertIsNone(text_input.validate())
+
+
+class ModalValidationTest(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.submitted = []
+
+    async def on_submit(self, interaction, view, modal):
+        self.submitted.append(modal)
+
+    def build_modal(self, age: str, name: str, **kwargs) -> Modal:
+        age_input = TextInput(label="age", pre_fill_value=age).set_range(0, 150, integer=True)
+        name_input = TextInput(label="name", pre_fill_value=name).set_pattern(r"[a-z]+", message="lowercase only")
+        return Modal(title="profile", func=self.on_submit, **kwargs).add_components([age_input, name_input])
+
+    async def test_valid_input_calls_submit_handler(self):
+        modal = self.build_modal("20", "alice")
+        await modal.on_submit(FakeInteraction())
+        self.assertEqual(self.submitted, [modal])
+
+    async def test_errors_are_sent_to_user_without_calling_handler(self):
+        modal = self.build_modal("200", "Alice")
+        interaction = FakeInteraction()
+        await modal.on_submit(interaction)
+        self.assertEqual(self.submitted, [])
+        message = interaction.response.messages[0]
+        self.assertIn("age: 0から150の範囲で入力してください", message)
+        self.assertIn("name: lowercase only", message)
+
+    async def test_sync_error_handler_receives_errors_by_custom_id(self):
+        received = []
+        modal = self.build_modal("x", "bob", on_validation_error=lambda *args: received.append(args[-1]))
+        await modal.on_submit(FakeInteraction())
+        self.assertEqual(received, [{modal.children[0].custom_id: "整数を入力してください"}])
+        self.assertEqual(self.submitted, [])
+
+    async def test_sync_handler_uses_parent_view_executor(self):
+        threads = []
+        executor = ThreadPoolExecutor(1, thread_name_prefix="modal-test")
+        self.addCleanup(executor.shutdown)
+        parent = ViewGenerator(run_sync_in_executor=True, executor=executor)
+
+        modal = Modal(title="profile", func=lambda *args: threads.append(threading.current_thread().name))
+        modal.set_parent_view(parent)
+        await modal.on_submit(FakeInteraction())
+
+        modal = Modal(title="profile", func=lambda *args: threads.append(threading.current_thread().name))
+        modal.set_parent_view(parent).set_executor(run_sync_in_executor=False)
+        await modal.on_submit(FakeInteraction())
+
+        self.assertTrue(threads[0].startswith("modal-test"))
+        self.assertEqual(threads[1], threading.current_thread().name)
+
+
+if __name__ == "__main__":
+    unittest.main()
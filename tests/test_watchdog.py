@@ -0,0 +1,71 @@
+import asyncio
+import unittest
+
+import discord
+from fakes import FakeBot, FakeInteraction, FakeMessage, FakeResponse
+
+from dpy_bot_utils import ViewGenerator, Button, DeferWatchdog
+
+
+async def slow_click(interaction, view):
+    await asyncio.sleep(0.02)
+
+
+class SlowDeferResponse(FakeResponse):
+
+    def __init__(self, events: list):
+        super().__init__()
+        self.events = events
+
+    async def defer(self, **kwargs):
+        self.events.append("defer started")
+        await asyncio.sleep(0.02)
+        self.events.append("defer done")
+        await super().defer(**kwargs)
+
+    async def send_message(self, content=None, **kwargs):
+        if self._done:
+            raise discord.InteractionResponded(None)
+        await super().send_message(content, **kwargs)
+
+
+class DeferWatchdogTest(unittest.IsolatedAsyncioTestCase):
+
+    async def test_counts_are_keyed_by_callback_not_custom_id(self):
+        bot = FakeBot()
+        watchdog = DeferWatchdog(budget=0.005)
+        for _ in range(5):
+            message = FakeMessage()
+            button = Button(label="button", func=slow_click)
+            bot.add_view(ViewGenerator(components=[button], defer_watchdog=watchdog), message.id)
+            await bot.dispatch(FakeInteraction(message=message, custom_id=button.custom_id))
+        await asyncio.sleep(0)
+        self.assertEqual(watchdog.late_counts, {"slow_click": 5})
+        self.assertEqual(watchdog.deferred_counts, {"slow_click": 5})
+
+    async def test_callback_response_waits_for_inflight_defer(self):
+        events = []
+
+        async def on_click(interaction, view):
+            await asyncio.sleep(0.01)
+            try:
+                await interaction.response.send_message("done")
+            except discord.InteractionResponded:
+                events.append("responded")
+
+        bot = FakeBot()
+        watchdog = DeferWatchdog(budget=0.005)
+        message = FakeMessage()
+        button = Button(label="button", func=on_click)
+        bot.add_view(ViewGenerator(components=[button], defer_watchdog=watchdog), message.id)
+        interaction = FakeInteraction(message=message, custom_id=button.custom_id)
+        interaction._cs_response = response = SlowDeferResponse(events)
+        await bot.dispatch(interaction)
+        self.assertEqual(events, ["defer started", "defer done", "responded"])
+        self.assertEqual(response.messages, [])
+        self.assertIs(interaction.response, response)
+        self.assertEqual(watchdog.deferred_counts, {on_click.__qualname__: 1})
+
+
+if __name__ == "__main__":
+    unittest.main()